@@ -0,0 +1,117 @@
+from typing import List
+
+
+class CatalogChanges:
+    """
+        This class represents what merging the spreadsheet into an existing string catalog changed:
+        the keys added, changed and removed, and how many localizations were added, changed or removed.
+        Keys of the catalog that the spreadsheet doesn't have are kept, and listed as missing, unless the merge
+        removes them.
+    """
+
+    __slots__ = ('_file_name', '_added_keys', '_changed_keys', '_removed_keys', '_missing_keys',
+                 '_unchanged_key_count', '_localizations_added', '_localizations_changed', '_localizations_removed')
+
+    def __init__(self, file_name: str):
+        """Initializes a new CatalogChanges object, without any change.
+
+        Args:
+            file_name (str): The name of the merged catalog, e.g. "Localizable.xcstrings".
+        """
+        self._file_name = file_name
+        self._added_keys: List[str] = []
+        self._changed_keys: List[str] = []
+        self._removed_keys: List[str] = []
+        self._missing_keys: List[str] = []
+        self._unchanged_key_count = 0
+        self._localizations_added = 0
+        self._localizations_changed = 0
+        self._localizations_removed = 0
+
+    @property
+    def file_name(self) -> str:
+        return self._file_name
+
+    @property
+    def added_keys(self) -> List[str]:
+        return self._added_keys
+
+    @property
+    def changed_keys(self) -> List[str]:
+        return self._changed_keys
+
+    @property
+    def removed_keys(self) -> List[str]:
+        return self._removed_keys
+
+    @property
+    def missing_keys(self) -> List[str]:
+        return self._missing_keys
+
+    @property
+    def unchanged_key_count(self) -> int:
+        return self._unchanged_key_count
+
+    @property
+    def localizations_added(self) -> int:
+        return self._localizations_added
+
+    @property
+    def localizations_changed(self) -> int:
+        return self._localizations_changed
+
+    @property
+    def localizations_removed(self) -> int:
+        return self._localizations_removed
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self._added_keys or self._changed_keys or self._removed_keys)
+
+    def add_key(self, localized_key: str, localizations: int):
+        self._added_keys.append(localized_key)
+        self._localizations_added += localizations
+
+    def change_key(self, localized_key: str, added: int, changed: int, removed: int):
+        self._changed_keys.append(localized_key)
+        self._localizations_added += added
+        self._localizations_changed += changed
+        self._localizations_removed += removed
+
+    def remove_key(self, localized_key: str):
+        self._removed_keys.append(localized_key)
+
+    def keep_missing_key(self, localized_key: str):
+        self._missing_keys.append(localized_key)
+
+    def keep_key(self):
+        self._unchanged_key_count += 1
+
+    def report(self, max_listed: int = 10) -> str:
+        """Formats the changes, listing the keys added, changed, removed and missing from the spreadsheet.
+
+        :param max_listed:
+            The maximum number of keys listed per kind of change, the others are only counted.
+
+        :return str:
+            The report, one kind of change per line.
+        """
+        lines = [repr(self)]
+
+        for title, localized_keys in (('Added', self._added_keys), ('Changed', self._changed_keys),
+                                      ('Removed', self._removed_keys),
+                                      ('Kept, not in the spreadsheet', self._missing_keys)):
+            if not localized_keys:
+                continue
+            listed = ", ".join(localized_keys[:max_listed])
+            more = f' and {len(localized_keys) - max_listed} more' if len(localized_keys) > max_listed else ''
+            lines.append(f'  {title}: {listed}{more}')
+
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return (f'{self._file_name}: {len(self._added_keys)} keys added, {len(self._changed_keys)} changed, '
+                f'{len(self._removed_keys)} removed, {self._unchanged_key_count} unchanged, '
+                f'{len(self._missing_keys)} not in the spreadsheet '
+                f'(localizations: {self._localizations_added} added, {self._localizations_changed} changed, '
+                f'{self._localizations_removed} removed)')
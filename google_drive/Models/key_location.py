@@ -0,0 +1,35 @@
+class KeyLocation:
+    """
+        This class represents where a localized key is defined in the spreadsheet: the worksheet,
+        the row, and which languages have a value in that row.
+    """
+
+    __slots__ = ('_sheet_name', '_row', '_languages')
+
+    def __init__(self, sheet_name: str, row: int, languages: int):
+        """Initializes a new KeyLocation object.
+
+        Args:
+            sheet_name (str): The title of the worksheet the key is defined in.
+            row (int): The row number of the key, as displayed in the spreadsheet (starting at 1).
+            languages (int): A bitmap of the languages with a value in the row, bit N set for
+                             the Nth language of the KeyIndex.
+        """
+        self._sheet_name = sheet_name
+        self._row = row
+        self._languages = languages
+
+    @property
+    def sheet_name(self) -> str:
+        return self._sheet_name
+
+    @property
+    def row(self) -> int:
+        return self._row
+
+    @property
+    def languages(self) -> int:
+        return self._languages
+
+    def __repr__(self) -> str:
+        return f'{self._sheet_name} row {self._row}'
@@ -11,6 +11,8 @@ class LocalizedColumn:
         translated string value and an optional comment.
    """
 
+    __slots__ = ('_language_code', '_language', '_language_name', '_strings')
+
     def __init__(self,language_code: str,  language: str, language_name: str, strings: List[LocalizedString]):
         """Initializes a new LocalizedColumn object.
 
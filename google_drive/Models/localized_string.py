@@ -5,6 +5,8 @@ class LocalizedString:
         associated with the string.
     """
 
+    __slots__ = ('_localized_key', '_localized_value', '_comment')
+
     def __init__(self, localized_key: str, localized_value: str, comment: str):
         """Initializes a new LocalizedString object.
 
@@ -4,6 +4,8 @@ from Models.localized_column import LocalizedColumn
 
 class Sheet:
 
+    __slots__ = ('_name', '_columns')
+
     def __init__(self, name: str, columns: List[LocalizedColumn]):
         self._name = name
         self._columns = columns
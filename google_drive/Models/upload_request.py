@@ -0,0 +1,42 @@
+from io import BytesIO
+from typing import List, Union
+
+
+class UploadRequest:
+    """
+        This class represents a single file to be saved to Google Drive, including
+        its content, name, MIME type and the folder path it is saved to.
+    """
+
+    __slots__ = ('_file', '_file_name', '_mime_type', '_folder_structure')
+
+    def __init__(self, file: Union[str, BytesIO], file_name: str, mime_type: str, folder_structure: List[str]):
+        """Initializes a new UploadRequest object.
+
+        Args:
+            file (str or BytesIO): The content of the file, or the content already encoded.
+            file_name (str): The name of the file (e.g., "Localizable.json").
+            mime_type (str): The MIME type of the file (e.g., "application/json").
+            folder_structure List[str]: The path of folders from the root of the drive
+                                        to the folder where the file is saved.
+        """
+        self._file = file
+        self._file_name = file_name
+        self._mime_type = mime_type
+        self._folder_structure = folder_structure
+
+    @property
+    def file(self) -> Union[str, BytesIO]:
+        return self._file
+
+    @property
+    def file_name(self) -> str:
+        return self._file_name
+
+    @property
+    def mime_type(self) -> str:
+        return self._mime_type
+
+    @property
+    def folder_structure(self) -> List[str]:
+        return self._folder_structure
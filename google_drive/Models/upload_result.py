@@ -0,0 +1,75 @@
+from typing import Optional
+
+
+class UploadResult:
+    """
+        This class represents the outcome of saving a single file to Google Drive.
+        It contains the ID of the saved file, the number of bytes sent, how long the
+        upload took and whether the file was created, updated, left unchanged or failed.
+    """
+
+    __slots__ = ('_file_id', '_file_name', '_size', '_latency', '_status', '_error')
+
+    CREATED = "created"
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    FAILED = "failed"
+
+    def __init__(
+            self,
+            file_id: Optional[str],
+            file_name: str,
+            size: int,
+            latency: float,
+            status: str,
+            error: Optional[Exception] = None
+    ):
+        """Initializes a new UploadResult object.
+
+        Args:
+            file_id (str): The ID of the saved file, None if the upload failed.
+            file_name (str): The name of the file.
+            size (int): The number of bytes sent, 0 when the upload was skipped.
+            latency (float): The time the whole operation took, in seconds.
+            status (str): One of CREATED, UPDATED, UNCHANGED or FAILED.
+            error (Exception): The error that made the upload fail, if any.
+        """
+        self._file_id = file_id
+        self._file_name = file_name
+        self._size = size
+        self._latency = latency
+        self._status = status
+        self._error = error
+
+    @property
+    def file_id(self) -> Optional[str]:
+        return self._file_id
+
+    @property
+    def file_name(self) -> str:
+        return self._file_name
+
+    @property
+    def size(self) -> int:
+        """Gets the number of bytes sent to Google Drive.
+
+        :return int:
+            The size of the uploaded content, 0 when the upload was skipped or failed.
+        """
+        return self._size
+
+    @property
+    def latency(self) -> float:
+        return self._latency
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @property
+    def error(self) -> Optional[Exception]:
+        return self._error
+
+    def __repr__(self) -> str:
+        return (f"UploadResult(file_id={self._file_id!r}, file_name={self._file_name!r}, size={self._size}, "
+                f"latency={self._latency:.3f}, status={self._status!r})")
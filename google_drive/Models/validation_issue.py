@@ -0,0 +1,71 @@
+class ValidationIssue:
+    """
+        This class represents a problem found in a single translation: its location in the spreadsheet,
+        the check that failed and how severe it is.
+    """
+
+    __slots__ = ('_severity', '_check', '_sheet_name', '_row', '_localized_key', '_language_code', '_message')
+
+    ERROR = "error"
+    WARNING = "warning"
+
+    def __init__(
+            self,
+            severity: str,
+            check: str,
+            sheet_name: str,
+            row: int,
+            localized_key: str,
+            language_code: str,
+            message: str
+    ):
+        """Initializes a new ValidationIssue object.
+
+        Args:
+            severity (str): ERROR for translations that would break the app, WARNING otherwise.
+            check (str): The name of the failed check (e.g., "placeholders", "length", "empty").
+            sheet_name (str): The title of the worksheet.
+            row (int): The row number of the translation, as displayed in the spreadsheet (starting at 1).
+            localized_key (str): The key of the translation.
+            language_code (str): The language code of the translation (e.g., "fr").
+            message (str): A description of the problem.
+        """
+        self._severity = severity
+        self._check = check
+        self._sheet_name = sheet_name
+        self._row = row
+        self._localized_key = localized_key
+        self._language_code = language_code
+        self._message = message
+
+    @property
+    def severity(self) -> str:
+        return self._severity
+
+    @property
+    def check(self) -> str:
+        return self._check
+
+    @property
+    def sheet_name(self) -> str:
+        return self._sheet_name
+
+    @property
+    def row(self) -> int:
+        return self._row
+
+    @property
+    def localized_key(self) -> str:
+        return self._localized_key
+
+    @property
+    def language_code(self) -> str:
+        return self._language_code
+
+    @property
+    def message(self) -> str:
+        return self._message
+
+    def __repr__(self) -> str:
+        return (f'{self._sheet_name} row {self._row} [{self._language_code}] '
+                f'"{self._localized_key}": {self._message}')
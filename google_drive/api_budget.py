@@ -0,0 +1,76 @@
+import multiprocessing
+import threading
+import time
+
+from instrumentation import Metrics
+from typing import Optional
+
+
+# noinspection PyCompatibility
+class RateLimiter:
+    """
+        A class for spacing out requests so that all the processes sharing it stay within one request rate.
+
+        The time the next request may start is kept in shared memory, every process reserves the next
+        slot under a shared lock and then waits for it outside of the lock.
+    """
+
+    def __init__(self, requests_per_minute: float):
+        """Initializes a new RateLimiter object.
+
+        Args:
+            requests_per_minute (float): The number of requests allowed per minute across every process.
+        """
+        self._interval = 60.0 / requests_per_minute
+        self._next_slot = multiprocessing.Value('d', 0.0)
+
+    def acquire(self):
+        """Blocks until the calling process may send its next request."""
+        with self._next_slot.get_lock():
+            now = time.monotonic()
+            slot = max(now, self._next_slot.value)
+            self._next_slot.value = slot + self._interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# noinspection PyCompatibility
+class ApiBudget:
+    """
+        A class for counting the Google API requests made by the current process, and for holding them
+        back to a shared request rate when a RateLimiter is installed (as the batch build does).
+    """
+
+    _rate_limiter: Optional[RateLimiter] = None
+    _request_count: int = 0
+    _count_lock = threading.Lock()
+
+    @staticmethod
+    def install(rate_limiter: Optional[RateLimiter]):
+        """Makes every following request of the current process wait for the given rate limiter.
+
+        :param rate_limiter:
+            The rate limiter shared with the other processes, None to remove the limit.
+        """
+        ApiBudget._rate_limiter = rate_limiter
+
+    @staticmethod
+    def spend():
+        """Counts one request, waiting for the installed rate limiter first. Call it right before each API request."""
+        if ApiBudget._rate_limiter is not None:
+            ApiBudget._rate_limiter.acquire()
+
+        with ApiBudget._count_lock:
+            ApiBudget._request_count += 1
+
+        Metrics.count('api_requests')
+
+    @staticmethod
+    def request_count() -> int:
+        """Gets the number of API requests made by the current process so far.
+
+        :return int:
+            The number of requests.
+        """
+        return ApiBudget._request_count
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+
+from api_budget import ApiBudget, RateLimiter
+from concurrent.futures import ProcessPoolExecutor
+from file_manager import FileManager
+from instrumentation import Metrics
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+
+
+# noinspection PyCompatibility
+class BatchBuild:
+    """
+        A class for generating the translation files of several apps, each with its own spreadsheet.
+
+        The apps are listed in a JSON manifest:
+        {
+          "apps": [
+            {
+              "name": "APP_NAME",
+              "spreadsheet": "SPREADSHEET_URL_KEY_OR_TITLE",
+              "platforms": ["ios", "android"],
+              "output_dirs": {"ios": "LOCAL_DIRECTORY", "android": "LOCAL_DIRECTORY"},
+              "drive_folder": ["Translations", "APP_NAME"],
+              "save_to_drive": true,
+              "workbook": "EXPORTED_WORKBOOK_PATH",
+              "workbook_sha256": "CHECKSUM",
+              "validation": "warn",
+              "merge": false,
+              "remove_missing_keys": false
+            }
+          ]
+        }
+
+        "workbook" reads the app's translations from an exported workbook instead of its spreadsheet,
+        see FileSource, optionally pinned to the "workbook_sha256" checksum. Every app has either a
+        "spreadsheet" or a "workbook".
+
+        Every app is fetched, parsed and generated in its own worker process. The credentials are
+        refreshed once by the parent process and handed to the workers, and every worker waits for
+        the same RateLimiter so that all of them together stay within one request rate.
+    """
+
+    def __init__(
+            self,
+            credentials: Credentials,
+            scopes: List[str],
+            max_workers: Optional[int] = None,
+            requests_per_minute: float = 60.0,
+            cache_dir: Optional[str] = None
+    ):
+        """Initializes a new BatchBuild object.
+
+        Args:
+            credentials (Credentials): Valid credentials, shared with every worker process.
+            scopes List[str]: The scopes of the credentials.
+            max_workers (int): The maximum number of apps built at the same time, the number of CPUs by default.
+            requests_per_minute (float): The number of Google API requests allowed per minute across every worker.
+            cache_dir (str): The directory of the snapshot and Drive folder caches, shared by every worker.
+        """
+        self._credentials = credentials
+        self._scopes = scopes
+        self._max_workers = max_workers
+        self._requests_per_minute = requests_per_minute
+        self._cache_dir = cache_dir
+
+    @staticmethod
+    def load_manifest(manifest_file: str) -> List[Dict[str, Any]]:
+        """Reads the apps of a manifest file, filling in the defaults of the optional fields.
+
+        :param manifest_file:
+            The path of the JSON manifest.
+
+        :return List[Dict[str, Any]]:
+            The configuration of every app.
+
+        :raises ValueError:
+            If an app has both a spreadsheet and a workbook, or neither.
+        """
+        with open(manifest_file) as manifest:
+            apps = json.load(manifest)['apps']
+
+        for app in apps:
+            if ('spreadsheet' in app) == ('workbook' in app):
+                raise ValueError(f"App '{app.get('name')}' of {manifest_file} needs either a spreadsheet or a workbook")
+
+            app.setdefault('platforms', ['ios'])
+            app.setdefault('output_dirs', {})
+            app.setdefault('drive_folder', ['Translations', app['name']])
+            app.setdefault('save_to_drive', True)
+            app.setdefault('validation', 'warn')
+            app.setdefault('merge', False)
+            app.setdefault('remove_missing_keys', False)
+
+        return apps
+
+    def run(self, apps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Builds every app, in parallel worker processes.
+
+        :param apps:
+            The configuration of every app, as returned by `load_manifest`.
+
+        :return List[Dict[str, Any]]:
+            The summary of every app: its name, status, duration, API request count, saved files
+            and the metrics recorded while building it.
+        """
+        self._prepare_drive_folders(apps)
+
+        rate_limiter = RateLimiter(requests_per_minute=self._requests_per_minute)
+        credentials_info = self._credentials.to_json()
+
+        with ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                initializer=ApiBudget.install,
+                initargs=(rate_limiter,)
+        ) as executor:
+            futures = [
+                executor.submit(_build_app, app, credentials_info, self._scopes, self._cache_dir)
+                for app in apps
+            ]
+            return [future.result() for future in futures]
+
+    def _prepare_drive_folders(self, apps: List[Dict[str, Any]]):
+        """Resolves the Drive folder of every app up front, so worker processes never race to create
+        the folders they have in common (e.g. "Translations").
+
+        :param apps:
+            The configuration of every app.
+        """
+        from google_services import GoogleServices
+
+        drive_service = GoogleServices.drive_service(self._credentials)
+
+        for app in apps:
+            if app['save_to_drive']:
+                FileManager.resolve_folder_path(drive_service=drive_service, folder_structure=app['drive_folder'])
+
+    @staticmethod
+    def format_summary(summaries: List[Dict[str, Any]]) -> str:
+        """Formats the summaries of a batch build as a table.
+
+        :param summaries:
+            The summary of every app, as returned by `run`.
+
+        :return str:
+            The table, one row per app.
+        """
+        header = ("App", "Status", "Seconds", "API requests", "Files")
+        rows = [header] + [
+            (
+                summary['name'],
+                summary['status'],
+                f"{summary['seconds']:.2f}",
+                str(summary['api_requests']),
+                str(summary['files']),
+            )
+            for summary in summaries
+        ]
+        widths = [max(len(row[column]) for row in rows) for column in range(len(header))]
+
+        lines = ["  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip() for row in rows]
+        lines.insert(1, "  ".join("-" * width for width in widths))
+
+        return "\n".join(lines)
+
+
+def _build_app(app: Dict[str, Any], credentials_info: str, scopes: List[str], cache_dir: Optional[str]) -> Dict[str, Any]:
+    """Fetches, parses and generates the translation files of a single app, in a worker process.
+
+    :param app:
+        The configuration of the app.
+
+    :param credentials_info:
+        The credentials refreshed by the parent process, serialized as JSON.
+
+    :param scopes:
+        The scopes of the credentials.
+
+    :param cache_dir:
+        The directory of the snapshot and Drive folder caches.
+
+    :return Dict[str, Any]:
+        The summary of the app.
+    """
+    from file_source import FileSource
+    from google.oauth2.credentials import Credentials
+    from generate_translations_main import platforms
+    from Models.upload_result import UploadResult
+    from translation_runner import TranslationRunner
+    from translation_validator import TranslationValidationError
+
+    # Worker processes are reused across apps, every app starts with fresh metrics
+    Metrics.reset()
+
+    start_time = time.perf_counter()
+    start_request_count = ApiBudget.request_count()
+
+    summary: Dict[str, Any] = {'name': app['name'], 'status': 'ok', 'files': 0}
+
+    try:
+        credentials = Credentials.from_authorized_user_info(json.loads(credentials_info), scopes)
+
+        if cache_dir:
+            FileManager.load_folder_cache(os.path.join(cache_dir, "drive_folders.json"))
+
+        translation = platforms[app['platforms'][0]](
+            credentials=credentials,
+            cache_dir=cache_dir,
+            spreadsheet=app.get('spreadsheet'),
+            drive_folder=app['drive_folder'],
+            data_source=FileSource(path=app['workbook'], sha256=app.get('workbook_sha256')) if 'workbook' in app else None
+        )
+        runner = TranslationRunner(
+            translation=translation,
+            platforms=[platforms[name] for name in app['platforms']],
+            validation=app['validation'],
+            merge=app['merge'],
+            remove_missing_keys=app['remove_missing_keys']
+        )
+        upload_results = runner.generate(output_dirs=app['output_dirs'], save_to_drive=app['save_to_drive'])
+
+        summary['files'] = len(upload_results)
+        if any(upload_result.status == UploadResult.FAILED for upload_result in upload_results):
+            summary['status'] = 'failed uploads'
+    except TranslationValidationError as error:
+        summary['status'] = f'invalid: {len(error.issues)} issues'
+    except Exception as error:
+        # One failing app doesn't stop the others, the error is reported in the summary
+        summary['status'] = f'error: {error}'
+
+    summary['seconds'] = time.perf_counter() - start_time
+    summary['api_requests'] = ApiBudget.request_count() - start_request_count
+    summary['metrics'] = Metrics.snapshot()
+
+    return summary
@@ -0,0 +1,84 @@
+"""
+    Measures how long importing the command line entry point takes, using `python -X importtime`.
+
+    Run from the `google_drive` directory:
+        python -m benchmarks.import_time [--runs 5] [--max-ms 150]
+
+    Prints a JSON object with the median cumulative import time of the entry point and the
+    slowest imported modules, and exits with an error when the time exceeds `--max-ms`.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from typing import Dict, List, Tuple
+
+# Directory containing the entry point module, the parent of this benchmarks directory
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module: str) -> Dict[str, int]:
+    """Imports a module in a fresh interpreter and collects the cumulative import time of every module.
+
+    :param module:
+        The name of the module to import.
+
+    :return Dict[str, int]:
+        The cumulative import time in microseconds, keyed by module name.
+    """
+    completed_process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    timings: Dict[str, int] = {}
+
+    # Lines look like "import time:       self [us] |  cumulative | imported package"
+    for line in completed_process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative)
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the import time of the command line entry point.")
+    parser.add_argument("--module", default="generate_translations_main", help="The module to import.")
+    parser.add_argument("--runs", type=int, default=5, help="The number of fresh interpreters to measure.")
+    parser.add_argument("--top", type=int, default=10, help="The number of slowest modules to report.")
+    parser.add_argument("--max-ms", type=float, help="Fail when the median import time exceeds this value.")
+    args = parser.parse_args()
+
+    runs = [measure_import(args.module) for _ in range(args.runs)]
+    total_ms = statistics.median(run[args.module] for run in runs) / 1000
+
+    # Report the slowest third-party or project modules of the median run
+    median_run = sorted(runs, key=lambda run: run[args.module])[len(runs) // 2]
+    slowest: List[Tuple[str, int]] = sorted(
+        ((name, time) for name, time in median_run.items() if name != args.module and "." not in name),
+        key=lambda item: item[1],
+        reverse=True
+    )[:args.top]
+
+    print(json.dumps({
+        "metric": "import_time",
+        "module": args.module,
+        "runs": args.runs,
+        "median_ms": round(total_ms, 2),
+        "slowest_ms": {name: round(time / 1000, 2) for name, time in slowest},
+    }, indent=2))
+
+    if args.max_ms is not None and total_ms > args.max_ms:
+        sys.exit(f"Import time of {args.module} is {total_ms:.1f} ms, above the {args.max_ms:.1f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+    Measures the memory held by the parsed sheets of a synthetic workbook, with the slotted models
+    and interned keys and language codes, and with the models as they were before: one `__dict__`
+    per LocalizedString, LocalizedColumn and Sheet, and no interning.
+
+    Run from the `google_drive` directory:
+        python -m benchmarks.memory [--keys 25000] [--languages 12] [--tabs 5] [--output results.json]
+
+    Prints a JSON object with the memory allocated by parsing (measured with tracemalloc), still
+    held once the sheets are parsed and at its peak, for both models and the reduction between them.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import platform
+import sys
+import tracemalloc
+
+import generate_translations_base
+
+from benchmarks.synthetic_workbook import synthetic_workbook
+from data_source import InMemorySource
+from generate_translations_ios import IOSTranslation
+from typing import Any, Dict, Iterator, List
+
+
+class _DictLocalizedString:
+    """LocalizedString before __slots__."""
+
+    def __init__(self, localized_key: str, localized_value: str, comment: str):
+        self._localized_key = localized_key
+        self._localized_value = localized_value
+        self._comment = comment
+
+
+class _DictLocalizedColumn:
+    """LocalizedColumn before __slots__."""
+
+    def __init__(self, language_code: str, language: str, language_name: str, strings: List[_DictLocalizedString]):
+        self._language_code = language_code
+        self._language = language
+        self._language_name = language_name
+        self._strings = strings
+
+
+class _DictSheet:
+    """Sheet before __slots__."""
+
+    def __init__(self, name: str, columns: List[_DictLocalizedColumn]):
+        self._name = name
+        self._columns = columns
+
+
+class _NoIntern:
+    """Stands in for the `sys` module of the parser, without interning."""
+
+    @staticmethod
+    def intern(value: str) -> str:
+        return value
+
+
+@contextlib.contextmanager
+def dict_models() -> Iterator[None]:
+    """Parses with the models as they were before __slots__ and interning, while in the context."""
+    replaced = {
+        "LocalizedString": _DictLocalizedString,
+        "LocalizedColumn": _DictLocalizedColumn,
+        "Sheet": _DictSheet,
+        "sys": _NoIntern,
+    }
+    originals = {name: getattr(generate_translations_base, name) for name in replaced}
+
+    for name, replacement in replaced.items():
+        setattr(generate_translations_base, name, replacement)
+    try:
+        yield
+    finally:
+        for name, original in originals.items():
+            setattr(generate_translations_base, name, original)
+
+
+def measure_parse(worksheets: Dict[str, List[List[str]]]) -> Dict[str, int]:
+    """Parses a workbook and measures the memory it allocates.
+
+    :param worksheets:
+        The rows of every worksheet keyed by title.
+
+    :return Dict[str, int]:
+        The bytes still held once the sheets are parsed, and the peak while parsing.
+    """
+    gc.collect()
+    tracemalloc.start()
+
+    sheets = IOSTranslation(data_source=InMemorySource(worksheets)).sheets
+
+    gc.collect()
+    held_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # The sheets are only released once measured
+    del sheets
+
+    return {"held_bytes": held_bytes, "peak_bytes": peak_bytes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the memory held by the parsed sheets.")
+    parser.add_argument("--keys", type=int, default=25000, help="The number of localized strings.")
+    parser.add_argument("--languages", type=int, default=12, help="The number of language columns.")
+    parser.add_argument("--tabs", type=int, default=5, help="The number of worksheets.")
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    # A JSON round trip gives every cell its own string object, like a Sheets API response does
+    worksheets = json.loads(json.dumps(synthetic_workbook(keys=args.keys, languages=args.languages, tabs=args.tabs)))
+
+    slotted = measure_parse(worksheets)
+    with dict_models():
+        dictionaries = measure_parse(worksheets)
+
+    report: Dict[str, Any] = {
+        "benchmark": "memory",
+        "python": platform.python_version(),
+        "size": {"keys": args.keys, "languages": args.languages, "tabs": args.tabs},
+        "slotted": slotted,
+        "dict": dictionaries,
+        "reduction": {
+            measurement: f"{(dictionaries[measurement] - slotted[measurement]) / dictionaries[measurement] * 100:.1f}%"
+            for measurement in ("held_bytes", "peak_bytes")
+        },
+    }
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+    Benchmarks the parse, xcstrings emit and upload stages of the pipeline offline, on synthetic
+    workbooks served by an InMemorySource and uploaded to an InMemoryDrive.
+
+    Run from the `google_drive` directory:
+        python -m benchmarks.pipeline [--keys 1000 10000 100000] [--runs 5] [--output results.json]
+
+    Prints a JSON object with the median and minimum time of every stage and size. Pass the results
+    of another commit with `--compare` to report the relative change of every median.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.synthetic_workbook import synthetic_workbook
+from data_source import InMemorySource
+from file_manager import FileManager
+from generate_translations_ios import IOSTranslation
+from in_memory_drive import InMemoryDrive
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional
+from xcstrings_writer import XCStringsWriter
+
+
+def measure(function: Callable[[], Any], runs: int) -> Dict[str, float]:
+    """Calls a function several times and reports its wall time.
+
+    :param function:
+        The function to measure, called without arguments.
+
+    :param runs:
+        The number of calls.
+
+    :return Dict[str, float]:
+        The median and minimum wall time of a call, in seconds.
+    """
+    timings: List[float] = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start_time)
+
+    return {"median_s": round(statistics.median(timings), 6), "min_s": round(min(timings), 6)}
+
+
+def benchmark_size(keys: int, languages: int, tabs: int, runs: int) -> List[Dict[str, Any]]:
+    """Benchmarks every stage on a workbook of the given size.
+
+    :return List[Dict[str, Any]]:
+        One result per stage.
+    """
+    source = InMemorySource(synthetic_workbook(keys=keys, languages=languages, tabs=tabs))
+
+    def parse():
+        # A new generator parses every worksheet again
+        return IOSTranslation(data_source=source).sheets
+
+    sheets = parse()
+
+    catalog = BytesIO()
+
+    def emit_xcstrings():
+        catalog.seek(0)
+        catalog.truncate()
+        XCStringsWriter(sheets).write(catalog)
+
+    emit_xcstrings()
+
+    def upload():
+        # Every upload goes to an empty drive, so the file is always created
+        drive = InMemoryDrive()
+        FileManager.invalidate_folder_cache()
+        FileManager.save_to_google_drive(
+            drive_service=drive,
+            file=catalog,
+            file_name="Localizable.json",
+            mime_type="application/json",
+            folder_structure=['Translations', 'iOS']
+        )
+
+    size = {"keys": keys, "languages": languages, "tabs": tabs}
+
+    return [
+        dict(stage="parse", **size, **measure(parse, runs)),
+        dict(stage="emit_xcstrings", **size, bytes=catalog.getbuffer().nbytes, **measure(emit_xcstrings, runs)),
+        dict(stage="upload", **size, bytes=catalog.getbuffer().nbytes, **measure(upload, runs)),
+    ]
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any]) -> Dict[str, str]:
+    """Reports the relative change of every median compared to the results of another run.
+
+    :return Dict[str, str]:
+        The change of every stage and size found in both runs, e.g. "-12.5%" for a faster stage.
+    """
+    baseline_medians = {(result["stage"], result["keys"]): result["median_s"] for result in baseline["results"]}
+
+    changes: Dict[str, str] = {}
+    for result in results:
+        baseline_median = baseline_medians.get((result["stage"], result["keys"]))
+        if baseline_median:
+            change = (result["median_s"] - baseline_median) / baseline_median * 100
+            changes[f"{result['stage']}@{result['keys']}"] = f"{change:+.1f}%"
+
+    return changes
+
+
+def current_commit() -> Optional[str]:
+    completed_process = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    return completed_process.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parse, emit and upload stages offline.")
+    parser.add_argument("--keys", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="The workbook sizes to benchmark, in localized strings.")
+    parser.add_argument("--languages", type=int, default=10, help="The number of language columns.")
+    parser.add_argument("--tabs", type=int, default=5, help="The number of worksheets.")
+    parser.add_argument("--runs", type=int, default=5, help="The number of measured calls of every stage.")
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    parser.add_argument("--compare", help="The JSON results of another run to compare the medians with.")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    for keys in args.keys:
+        results.extend(benchmark_size(keys=keys, languages=args.languages, tabs=args.tabs, runs=args.runs))
+
+    report: Dict[str, Any] = {
+        "benchmark": "pipeline",
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "runs": args.runs,
+        "results": results,
+    }
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            report["change"] = compare(results, json.load(baseline_file))
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
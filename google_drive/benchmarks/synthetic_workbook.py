@@ -0,0 +1,129 @@
+"""
+    Generates synthetic Translations workbooks with the same layout as the real spreadsheet,
+    for benchmarks and fixtures:
+
+        row 0    language codes      (column A is the comment column, column B the base language)
+        row 1    languages
+        row 2    language names
+        rows 3-5 unused
+        row 6+   one localized string per row: comment, key (base language value), translations
+
+    Run from the `google_drive` directory to write a workbook as JSON:
+        python -m benchmarks.synthetic_workbook --keys 10000 --languages 10 --tabs 5 > workbook.json
+"""
+import argparse
+import json
+import random
+import sys
+
+from typing import Dict, List
+
+# Data rows start at this index, like in the real spreadsheet
+DATA_START_ROW = 6
+
+LANGUAGES = [
+    ("en", "English", "English"),
+    ("fr", "French", "Français"),
+    ("de", "German", "Deutsch"),
+    ("es", "Spanish", "Español"),
+    ("it", "Italian", "Italiano"),
+    ("pt-BR", "Portuguese (Brazil)", "Português (Brasil)"),
+    ("ja", "Japanese", "日本語"),
+    ("zh-Hans", "Chinese, Simplified", "简体中文"),
+    ("ko", "Korean", "한국어"),
+    ("ar", "Arabic", "العربية"),
+    ("ru", "Russian", "Русский"),
+    ("nl", "Dutch", "Nederlands"),
+]
+
+WORDS = ["account", "settings", "save", "cancel", "photo", "message", "profile", "network", "error", "welcome"]
+FORMAT_SPECIFIERS = ["%@", "%d", "%1$@", "%2$d", "%.2f", "%lld"]
+
+
+def synthetic_workbook(keys: int, languages: int = 10, tabs: int = 5, seed: int = 0) -> Dict[str, List[List[str]]]:
+    """Generates the worksheets of a synthetic workbook.
+
+    The keys are spread evenly over the tabs. A few rows are section comments ("//" keys), some
+    strings have format specifiers, comments or escaped characters, and some translations are missing.
+
+    :param keys:
+        The total number of localized strings, across every tab.
+
+    :param languages:
+        The number of language columns, the base language included (at most 12).
+
+    :param tabs:
+        The number of worksheets.
+
+    :param seed:
+        The seed of the random generator, the same arguments always give the same workbook.
+
+    :return Dict[str, List[List[str]]]:
+        The rows of every worksheet keyed by title, in workbook order.
+    """
+    if not 1 <= languages <= len(LANGUAGES):
+        raise ValueError(f"languages must be between 1 and {len(LANGUAGES)}")
+
+    random_generator = random.Random(seed)
+    columns = LANGUAGES[:languages]
+
+    header_rows = [
+        ["Comments"] + [code for code, _, _ in columns],
+        [""] + [language for _, language, _ in columns],
+        [""] + [language_name for _, _, language_name in columns],
+    ] + [[""] * (languages + 1) for _ in range(DATA_START_ROW - 3)]
+
+    worksheets: Dict[str, List[List[str]]] = {}
+    key_index = 0
+
+    for tab in range(tabs):
+        # Spread the remainder over the first tabs
+        tab_keys = keys // tabs + (1 if tab < keys % tabs else 0)
+        rows = [list(row) for row in header_rows]
+
+        for _ in range(tab_keys):
+            rows.append(_synthetic_row(random_generator, key_index, columns))
+            key_index += 1
+
+        worksheets[f"Tab {tab + 1}"] = rows
+
+    return worksheets
+
+
+def _synthetic_row(random_generator: random.Random, key_index: int, columns: list) -> List[str]:
+    # Every 50th row is a section comment
+    if key_index % 50 == 0:
+        return ["", f"// Section {key_index // 50}"] + [""] * (len(columns) - 1)
+
+    words = random_generator.sample(WORDS, k=random_generator.randint(2, 5))
+    key = f"{'_'.join(words)}_{key_index}"
+    comment = f"Shown on the {words[0]} screen" if random_generator.random() < 0.3 else ""
+
+    text = " ".join(words).capitalize()
+    if random_generator.random() < 0.2:
+        text += f" {random_generator.choice(FORMAT_SPECIFIERS)}"
+    if random_generator.random() < 0.05:
+        text += " \"quoted\" & <tagged>\nnext line"
+
+    translations = [
+        f"[{code}] {text}" if random_generator.random() < 0.95 else ""
+        for code, _, _ in columns[1:]
+    ]
+
+    return [comment, key] + translations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Translations workbook as JSON.")
+    parser.add_argument("--keys", type=int, default=1000, help="The total number of localized strings.")
+    parser.add_argument("--languages", type=int, default=10, help="The number of language columns.")
+    parser.add_argument("--tabs", type=int, default=5, help="The number of worksheets.")
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the random generator.")
+    args = parser.parse_args()
+
+    json.dump(synthetic_workbook(keys=args.keys, languages=args.languages, tabs=args.tabs, seed=args.seed),
+              sys.stdout, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import re
+
+from abc import ABC, abstractmethod
+from api_budget import ApiBudget
+from google_services import GoogleServices
+from instrumentation import Metrics
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    import gspread
+
+    from google.oauth2.credentials import Credentials
+
+
+# noinspection PyCompatibility
+class DataSource(ABC):
+    """
+        An abstract base class for the workbooks the translations are read from, subclass it to read from
+        another backend than Google Sheets.
+
+        A data source lists the titles of its worksheets and returns the raw cell values of each
+        worksheet as rows of strings, padded to a rectangular grid like gspread's `get_all_values()`.
+    """
+
+    _fetch_count: int = 0
+
+    @property
+    @abstractmethod
+    def source_id(self) -> str:
+        """Gets a stable identifier of the workbook, e.g. the spreadsheet ID, used to key its snapshot.
+
+        :return str:
+            The identifier of the workbook.
+        """
+        raise NotImplementedError
+
+    @property
+    def fetch_count(self) -> int:
+        """Gets the number of requests made to retrieve worksheet values.
+
+        :return int:
+            The number of fetches made by this data source.
+        """
+        return self._fetch_count
+
+    @abstractmethod
+    def worksheet_titles(self) -> List[str]:
+        """Reloads the list of worksheets of the workbook.
+
+        :return List[str]:
+            The titles of the worksheets, in the order of the workbook.
+        """
+        raise NotImplementedError
+
+    def revision(self) -> Optional[Dict[str, str]]:
+        """Retrieves metadata identifying the current revision of the workbook, which changes with its content.
+
+        :return Optional[Dict[str, str]]:
+            The revision metadata, None when the data source can't tell, which disables the snapshot cache.
+        """
+        return None
+
+    @abstractmethod
+    def fetch_values(self, titles: List[str]) -> List[List[List[str]]]:
+        """Retrieves the raw cell values of the given worksheets.
+
+        :param titles:
+            The titles of the worksheets, as returned by `worksheet_titles`.
+
+        :return List[List[List[str]]]:
+            The rows of every worksheet, in the same order as provided.
+        """
+        raise NotImplementedError
+
+    def iter_values(self, titles: List[str]) -> Iterator[List[List[str]]]:
+        """Retrieves the raw cell values of the given worksheets one worksheet at a time.
+        Data sources able to read worksheets separately override it, so that only the worksheet
+        being parsed is kept in memory.
+
+        :param titles:
+            The titles of the worksheets, as returned by `worksheet_titles`.
+
+        :return Iterator[List[List[str]]]:
+            The rows of every worksheet, in the same order as provided.
+        """
+        return iter(self.fetch_values(titles))
+
+
+# noinspection PyCompatibility
+class GoogleSheetsSource(DataSource):
+    """
+        A data source reading a spreadsheet from Google Sheets, through the `gspread` library.
+    """
+
+    # Upper bound of grid cells requested in a single `values:batchGet` call,
+    # tabs beyond this budget are fetched in a follow-up batch
+    _MAX_CELLS_PER_BATCH: int = 500_000
+
+    # Spreadsheet keys are long URL-safe identifiers, unlike typical spreadsheet titles
+    _SPREADSHEET_KEY_PATTERN = re.compile(r'^[A-Za-z0-9_-]{40,}$')
+
+    def __init__(self, credentials: Credentials, spreadsheet: str = "Translations", batch_fetch: bool = True):
+        """Initializes a new GoogleSheetsSource object, opening the spreadsheet.
+
+        Args:
+            credentials (Credentials): The authorized credentials used for the Google Sheets API.
+            spreadsheet (str): The URL, key or title of the spreadsheet. Opening by URL or key saves
+                the Drive search needed to find a spreadsheet by its title.
+            batch_fetch (bool): When True, the values of every worksheet are pulled with as few `values:batchGet`
+                requests as possible instead of one `get_all_values()` call per worksheet.
+        """
+        # Reuse the authorized client (and its HTTP session) of every generator using these credentials
+        spreadsheet_service: gspread.Client = GoogleServices.spreadsheet_client(credentials)
+
+        with Metrics.stage('open_spreadsheet'):
+            self._spreadsheet: gspread.Spreadsheet = self._open_spreadsheet(spreadsheet_service, spreadsheet)
+
+        self._batch_fetch = batch_fetch
+        self._worksheets: Dict[str, gspread.Worksheet] = {}
+
+    @classmethod
+    def _open_spreadsheet(cls, spreadsheet_service: gspread.Client, spreadsheet: str) -> gspread.Spreadsheet:
+        """
+            Opens a spreadsheet by its URL, its key, or its title if it's neither.
+
+        :param spreadsheet_service gspread.Client:
+            The authorized client.
+
+        :param spreadsheet str:
+            The URL, key or title of the spreadsheet.
+
+        :return gspread.Spreadsheet:
+            The opened spreadsheet.
+        """
+        ApiBudget.spend()
+
+        if spreadsheet.startswith(("https://", "http://")):
+            return spreadsheet_service.open_by_url(spreadsheet)
+
+        if cls._SPREADSHEET_KEY_PATTERN.match(spreadsheet):
+            return spreadsheet_service.open_by_key(spreadsheet)
+
+        # Open the spreadsheet by its title, which takes a Drive search first
+        ApiBudget.spend()
+        return spreadsheet_service.open(spreadsheet)
+
+    @property
+    def source_id(self) -> str:
+        return self._spreadsheet.id
+
+    def worksheet_titles(self) -> List[str]:
+        ApiBudget.spend()
+        with Metrics.stage('list_worksheets'):
+            self._worksheets = {worksheet.title: worksheet for worksheet in self._spreadsheet.worksheets()}
+        return list(self._worksheets)
+
+    def revision(self) -> Optional[Dict[str, str]]:
+        """
+            Retrieves the Drive metadata identifying the current revision of the spreadsheet.
+            `headRevisionId` is only reported for some files, `modifiedTime` and `version` always are.
+
+        :return Optional[Dict[str, str]]:
+            The revision metadata of the spreadsheet.
+        """
+        from gspread.urls import DRIVE_FILES_API_V3_URL
+
+        ApiBudget.spend()
+        # `Spreadsheet.client` is the authorized HTTPClient, which also sends requests to other APIs
+        response = self._spreadsheet.client.request(
+            "get",
+            f"{DRIVE_FILES_API_V3_URL}/{self._spreadsheet.id}",
+            params={"fields": "modifiedTime,version,headRevisionId", "supportsAllDrives": True}
+        )
+        return {key: str(value) for key, value in response.json().items()}
+
+    def fetch_values(self, titles: List[str]) -> List[List[List[str]]]:
+        """
+            Retrieves the raw cell values of the given worksheets, in the same order as provided.
+            In batch mode the worksheets are grouped so that each `values:batchGet` request stays
+            within `_MAX_CELLS_PER_BATCH` grid cells, which usually means a single request.
+
+        :param titles List[str]:
+            The titles of the worksheets whose values should be fetched.
+
+        :return List[List[List[str]]]:
+            The rows of every worksheet, padded with empty strings to a rectangular grid.
+        """
+        from gspread.utils import absolute_range_name, fill_gaps
+
+        worksheets = [self._worksheets[title] for title in titles]
+        values: List[List[List[str]]] = []
+
+        with Metrics.stage('fetch'):
+            if not self._batch_fetch:
+                for worksheet in worksheets:
+                    ApiBudget.spend()
+                    values.append(worksheet.get_all_values())
+                    self._fetch_count += 1
+            else:
+                for batch in self._split_into_batches(worksheets):
+                    ranges = [absolute_range_name(worksheet.title) for worksheet in batch]
+                    ApiBudget.spend()
+                    response = self._spreadsheet.values_batch_get(ranges)
+                    self._fetch_count += 1
+
+                    for value_range in response.get("valueRanges", []):
+                        # Trailing empty rows and cells are omitted by the API, pad them like `get_all_values()` does
+                        values.append(fill_gaps(value_range.get("values", [])))
+
+        Metrics.count('cells_fetched', sum(len(rows) * len(rows[0]) for rows in values if rows))
+        return values
+
+    def _split_into_batches(self, worksheets: List[gspread.Worksheet]) -> List[List[gspread.Worksheet]]:
+        """
+            Groups worksheets into consecutive batches using their grid size (rows x columns)
+            as an estimate of the response size of a `values:batchGet` request.
+
+        :param worksheets List[gspread.Worksheet]:
+            The worksheets to group.
+
+        :return List[List[gspread.Worksheet]]:
+            The batches of worksheets, a worksheet larger than the budget gets a batch of its own.
+        """
+        batches: List[List[gspread.Worksheet]] = []
+        batch: List[gspread.Worksheet] = []
+        batch_cells = 0
+
+        for worksheet in worksheets:
+            cells = worksheet.row_count * worksheet.col_count
+
+            if batch and batch_cells + cells > self._MAX_CELLS_PER_BATCH:
+                batches.append(batch)
+                batch = []
+                batch_cells = 0
+
+            batch.append(worksheet)
+            batch_cells += cells
+
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+
+# noinspection PyCompatibility
+class InMemorySource(DataSource):
+    """
+        A data source serving worksheets held in memory, for fixtures, benchmarks and for
+        running the generators without access to the Google APIs.
+    """
+
+    def __init__(
+            self,
+            worksheets: Dict[str, List[List[str]]],
+            source_id: str = "in-memory",
+            revision: Optional[Dict[str, str]] = None
+    ):
+        """Initializes a new InMemorySource object.
+
+        Args:
+            worksheets (Dict[str, List[List[str]]]): The rows of every worksheet keyed by title, in workbook order.
+                The dictionary is not copied, changes made to it are seen by the next fetch.
+            source_id (str): The identifier of the workbook.
+            revision (Dict[str, str]): The revision reported for the snapshot cache, None disables the cache.
+        """
+        self._worksheets = worksheets
+        self._source_id = source_id
+        self._revision = revision
+
+    @property
+    def source_id(self) -> str:
+        return self._source_id
+
+    def worksheet_titles(self) -> List[str]:
+        return list(self._worksheets)
+
+    def revision(self) -> Optional[Dict[str, str]]:
+        return self._revision
+
+    def fetch_values(self, titles: List[str]) -> List[List[List[str]]]:
+        self._fetch_count += 1
+
+        # Pad the rows to a rectangular grid like the Google Sheets source does
+        values: List[List[List[str]]] = []
+        for title in titles:
+            rows = self._worksheets[title]
+            width = max((len(row) for row in rows), default=0)
+            values.append([list(row) + [""] * (width - len(row)) for row in rows])
+
+        return values
@@ -1,7 +1,33 @@
-from googleapiclient.http import MediaIoBaseUpload
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from googleapiclient.discovery import build
-from typing import List
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
+from Models.upload_request import UploadRequest
+from Models.upload_result import UploadResult
+from api_budget import ApiBudget
+from instrumentation import Metrics
+
+import contextlib
+import hashlib
+import json
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import build
+    from googleapiclient.errors import HttpError
+    from googleapiclient.http import HttpRequest
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, the folder cache file is merged without locking it
+    fcntl = None
 
 
 # noinspection PyCompatibility
@@ -10,9 +36,318 @@ class FileManager:
        A class for managing file operations related to Google Drive.
 
        This class provides static methods for creating folders, retrieving folder IDs,
-       and saving files to Google Drive.
+       and saving files to Google Drive, or to the local file system.
    """
 
+    # Payloads up to this size are sent in a single multipart request instead of a resumable session
+    _RESUMABLE_UPLOAD_THRESHOLD: int = 5 * 1024 * 1024
+
+    # Retry policy for rate-limited (403/429) and failed (5xx) requests, delays are in seconds
+    _MAX_RETRIES: int = 5
+    _BASE_RETRY_DELAY: float = 1.0
+    _MAX_RETRY_DELAY: float = 32.0
+    _RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+    # Transport errors (timeouts, dropped connections) are retried like server errors
+    _TRANSPORT_ERRORS = (socket.timeout, TimeoutError, ConnectionError)
+
+    # Process-wide cache of folder paths (from the root of the drive) to folder IDs
+    _folder_ids: Dict[Tuple[str, ...], str] = {}
+    _root_folder_id: Optional[str] = None
+    _folder_cache_file: Optional[str] = None
+    _folder_cache_lock = threading.Lock()
+    # One lock per folder path, so concurrent uploads into the same folder, or into sibling folders
+    # sharing a missing parent, share a single lookup and never create the same folder twice
+    _folder_path_locks: Dict[Tuple[str, ...], threading.RLock] = {}
+
+    @staticmethod
+    def load_folder_cache(cache_file: str):
+        """Persist the folder ID cache to a file, loading the folder IDs already stored in it.
+
+        :param cache_file:
+            The path of the JSON file the folder IDs are read from and written to.
+        """
+        with FileManager._folder_cache_lock:
+            FileManager._folder_cache_file = cache_file
+
+            FileManager._folder_ids.update(FileManager._read_folder_cache(cache_file))
+
+    @staticmethod
+    def invalidate_folder_cache(folder_structure: Optional[List[str]] = None):
+        """Discard cached folder IDs, e.g. after folders were moved or deleted outside this script.
+
+        :param folder_structure:
+            The folder path to discard along with every path below it, discards every path when None.
+        """
+        with FileManager._folder_cache_lock:
+            # Every path starts with the empty prefix
+            prefix = tuple(folder_structure or ())
+
+            def is_discarded(folder_path: Tuple[str, ...]) -> bool:
+                return folder_path[:len(prefix)] == prefix
+
+            for folder_path in list(FileManager._folder_ids):
+                if is_discarded(folder_path):
+                    del FileManager._folder_ids[folder_path]
+
+            FileManager._save_folder_cache(is_discarded=is_discarded)
+
+    @staticmethod
+    def _evict_folder_path(folder_structure: List[str]):
+        """Discard the cached IDs of a folder path, its parent folders and every path below it,
+        any of which may be the folder that was deleted.
+
+        :param folder_structure:
+            The folder path whose cached ID no longer exists.
+        """
+        folder_path = tuple(folder_structure)
+
+        def is_discarded(cached_path: Tuple[str, ...]) -> bool:
+            return folder_path[:len(cached_path)] == cached_path or cached_path[:len(folder_path)] == folder_path
+
+        with FileManager._folder_cache_lock:
+            for cached_path in list(FileManager._folder_ids):
+                if is_discarded(cached_path):
+                    del FileManager._folder_ids[cached_path]
+
+            FileManager._save_folder_cache(is_discarded=is_discarded)
+
+    @staticmethod
+    def _in_folder(drive_service: build, folder_structure: List[str], operation: Callable[[str], Any]) -> Any:
+        """Run requests against the folder of a path, resolving the path again when its cached ID,
+        or the one of a parent folder, was deleted outside this script since it was cached.
+
+        :param drive_service:
+            An instance of the Google Drive API service object.
+
+        :param folder_structure:
+            The path of folders from the root of the drive.
+
+        :param operation:
+            Called with the ID of the folder, it may be called a second time with a new ID.
+
+        :return:
+            The result of the operation.
+        """
+        from googleapiclient.errors import HttpError
+
+        folder_path = tuple(folder_structure)
+        with FileManager._folder_cache_lock:
+            from_cache = any(folder_path[:depth] in FileManager._folder_ids for depth in range(1, len(folder_path) + 1))
+
+        try:
+            return operation(FileManager.resolve_folder_path(drive_service=drive_service, folder_structure=folder_structure))
+        except HttpError as error:
+            if not from_cache or int(error.resp.status) != 404:
+                raise
+
+        # The cached folder is gone, look it up (or create it) again
+        FileManager._evict_folder_path(folder_structure)
+        Metrics.count('folder_cache_evictions')
+
+        return operation(FileManager.resolve_folder_path(drive_service=drive_service, folder_structure=folder_structure))
+
+    @staticmethod
+    def _save_folder_cache(is_discarded: Optional[Callable[[Tuple[str, ...]], bool]] = None):
+        """Save the cached folder IDs, merged with the IDs other processes sharing the file saved to it.
+        Expects `_folder_cache_lock` to be held by the caller.
+
+        :param is_discarded:
+            Whether a folder path saved to the file was discarded by this process, and isn't kept.
+        """
+        if FileManager._folder_cache_file is None:
+            return
+
+        directory = os.path.dirname(FileManager._folder_cache_file) or '.'
+        os.makedirs(directory, exist_ok=True)
+
+        # Batch builds save the file from several processes, merge under a file lock so none of their IDs are lost
+        with FileManager._locked(f'{FileManager._folder_cache_file}.lock'):
+            for folder_path, folder_id in FileManager._read_folder_cache(FileManager._folder_cache_file):
+                if folder_path not in FileManager._folder_ids and not (is_discarded and is_discarded(folder_path)):
+                    FileManager._folder_ids[folder_path] = folder_id
+
+            # Replace the file atomically so it's never read half written
+            file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(file_descriptor, 'w') as folder_cache:
+                    json.dump(
+                        [[list(path), folder_id] for path, folder_id in FileManager._folder_ids.items()],
+                        folder_cache
+                    )
+                os.replace(temporary_path, FileManager._folder_cache_file)
+            except BaseException:
+                os.remove(temporary_path)
+                raise
+
+    @staticmethod
+    def _read_folder_cache(cache_file: str) -> List[Tuple[Tuple[str, ...], str]]:
+        # The file is replaced atomically, it can be read without the lock
+        if not os.path.exists(cache_file):
+            return []
+
+        with open(cache_file) as folder_cache:
+            return [(tuple(folder_path), folder_id) for folder_path, folder_id in json.load(folder_cache)]
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _locked(lock_file_path: str):
+        # Closing the lock file releases the lock
+        with open(lock_file_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    @staticmethod
+    def _cache_folder_ids(folder_ids: Dict[Tuple[str, ...], str]):
+        with FileManager._folder_cache_lock:
+            FileManager._folder_ids.update(folder_ids)
+            FileManager._save_folder_cache()
+
+    @staticmethod
+    def resolve_folder_path(drive_service: build, folder_structure: List[str]) -> str:
+        """Retrieve the ID of a folder from its path, creating the missing folders along the way.
+
+        Cached paths don't hit the API at all. Otherwise every folder of the remaining path is
+        looked up with a single query, and only the folders that don't exist yet are created.
+
+        :param drive_service:
+            An instance of the Google Drive API service object.
+
+        :param folder_structure:
+            The path of folders from the root of the drive.
+
+        :return str:
+            The ID of the last folder of the path.
+        """
+        folder_path = tuple(folder_structure)
+
+        with FileManager._folder_cache_lock:
+            if folder_path in FileManager._folder_ids:
+                return FileManager._folder_ids[folder_path]
+
+        with FileManager._folder_path_lock(folder_path), Metrics.stage('drive_folders'):
+            with FileManager._folder_cache_lock:
+                # Another thread may have resolved the path while waiting for the lock
+                if folder_path in FileManager._folder_ids:
+                    return FileManager._folder_ids[folder_path]
+
+                # Start from the deepest folder of the path that is already known
+                resolved_depth = 0
+                current_folder_id = 'root'
+                for depth in range(len(folder_path) - 1, 0, -1):
+                    if folder_path[:depth] in FileManager._folder_ids:
+                        resolved_depth = depth
+                        current_folder_id = FileManager._folder_ids[folder_path[:depth]]
+                        break
+
+            resolved_folder_ids: Dict[Tuple[str, ...], str] = {}
+
+            if len(folder_path) - resolved_depth > 1:
+                existing_folder_ids = FileManager._get_folder_path_ids(
+                    drive_service=drive_service,
+                    parent_folder_id=current_folder_id,
+                    folder_names=list(folder_path[resolved_depth:])
+                )
+                for folder_id in existing_folder_ids:
+                    resolved_depth += 1
+                    current_folder_id = folder_id
+                    resolved_folder_ids[folder_path[:resolved_depth]] = folder_id
+
+                if resolved_folder_ids:
+                    FileManager._cache_folder_ids(resolved_folder_ids)
+
+            # Create the folder structure if it doesn't exist
+            for depth in range(resolved_depth, len(folder_path)):
+                folder_prefix = folder_path[:depth + 1]
+
+                # Sibling folders share their missing parents, each folder is created under the lock of its own path
+                with FileManager._folder_path_lock(folder_prefix):
+                    with FileManager._folder_cache_lock:
+                        folder_id = FileManager._folder_ids.get(folder_prefix)
+
+                    # A single missing folder is looked up directly, longer paths were already queried above
+                    if folder_id is None and depth == resolved_depth and not resolved_folder_ids \
+                            and len(folder_path) - depth == 1:
+                        folder_id = FileManager._get_folder_id(
+                            drive_service=drive_service,
+                            parent_folder_id=current_folder_id,
+                            folder_name=folder_path[depth]
+                        )
+                    if folder_id is None:
+                        folder_id = FileManager._create_folder(
+                            drive_service=drive_service,
+                            parent_folder_id=current_folder_id,
+                            folder_name=folder_path[depth]
+                        )
+
+                    current_folder_id = folder_id
+                    FileManager._cache_folder_ids({folder_prefix: folder_id})
+
+            return current_folder_id
+
+    @staticmethod
+    def _folder_path_lock(folder_path: Tuple[str, ...]) -> threading.RLock:
+        # Reentrant, the lock of a path is taken again when its last folder is created
+        with FileManager._folder_cache_lock:
+            return FileManager._folder_path_locks.setdefault(folder_path, threading.RLock())
+
+    @staticmethod
+    def _get_folder_path_ids(drive_service: build, parent_folder_id: str, folder_names: List[str]) -> List[str]:
+        """Retrieve the IDs of the existing folders of a path with a single query.
+
+        :param drive_service:
+            An instance of the Google Drive API service object.
+
+        :param parent_folder_id:
+            The ID of the folder the path starts from, `root` for the root of the drive.
+
+        :param folder_names:
+            The names of the nested folders, from the outermost to the innermost.
+
+        :return List[str]:
+            The IDs of the folders of the path that exist, stops at the first missing folder.
+        """
+        if parent_folder_id == 'root':
+            # Parents are reported with the actual ID of the root folder, not its alias
+            if FileManager._root_folder_id is None:
+                FileManager._root_folder_id = FileManager.execute(
+                    drive_service.files().get(fileId='root', fields='id')
+                )['id']
+            parent_folder_id = FileManager._root_folder_id
+
+        names_query = ' or '.join(
+            f"name = '{FileManager._escape_query_value(folder_name)}'" for folder_name in set(folder_names)
+        )
+        query = f"mimeType = 'application/vnd.google-apps.folder' and trashed = false and ({names_query})"
+
+        folders: List[dict] = []
+        page_token = None
+        while True:
+            results = FileManager.execute(drive_service.files().list(
+                q=query,
+                fields="nextPageToken, files(id, name, parents)",
+                pageToken=page_token
+            ))
+            folders.extend(results.get('files', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+
+        folder_ids: List[str] = []
+        current_folder_id = parent_folder_id
+        for folder_name in folder_names:
+            folder_id = next(
+                (folder['id'] for folder in folders
+                 if folder['name'] == folder_name and current_folder_id in folder.get('parents', [])),
+                None
+            )
+            if folder_id is None:
+                break
+            folder_ids.append(folder_id)
+            current_folder_id = folder_id
+
+        return folder_ids
+
     @staticmethod
     def _create_folder(drive_service: build, parent_folder_id: str, folder_name: str):
         """Create a new folder in Google Drive.
@@ -34,7 +369,7 @@ class FileManager:
             'mimeType': 'application/vnd.google-apps.folder',
             'parents': [parent_folder_id]
         }
-        folder = drive_service.files().create(body=file_metadata, fields='id').execute()
+        folder = FileManager.execute(drive_service.files().create(body=file_metadata, fields='id'))
         return folder.get('id')
 
     @staticmethod
@@ -53,8 +388,9 @@ class FileManager:
         :return  str or None:
             The ID of the folder if found, otherwise None.
         """
-        query = f"'{parent_folder_id}' in parents and name = '{folder_name}' and mimeType = 'application/vnd.google-apps.folder'"
-        results = drive_service.files().list(q=query, fields="nextPageToken, files(id, name)").execute()
+        query = (f"'{parent_folder_id}' in parents and name = '{FileManager._escape_query_value(folder_name)}' "
+                 f"and mimeType = 'application/vnd.google-apps.folder' and trashed = false")
+        results = FileManager.execute(drive_service.files().list(q=query, fields="nextPageToken, files(id, name)"))
         folders = results.get('files', [])
         if folders:
             return folders[0]['id']
@@ -62,34 +398,372 @@ class FileManager:
             return None
 
     @staticmethod
-    def save_to_google_drive(drive_service: build, file: str, file_name: str, mime_type: str, folder_structure: List[str]):
+    def _get_file(drive_service: build, parent_folder_id: str, file_name: str) -> Optional[dict]:
+        """Retrieve an existing file in a Google Drive folder.
 
-        # Get the root folder ID
-        root_folder_id = 'root'
-        current_folder_id = root_folder_id
+        :param drive_service:
+            An instance of the Google Drive API service object.
 
-        # Create the folder structure if it doesn't exist
-        for folder_name in folder_structure:
-            folder_id = FileManager._get_folder_id(
+        :param parent_folder_id:
+            The ID of the folder where the file is located.
+
+        :param file_name:
+            The name of the file to retrieve.
+
+        :return dict or None:
+            The `id` and `md5Checksum` of the file if found, otherwise None.
+        """
+        query = (f"'{parent_folder_id}' in parents and name = '{FileManager._escape_query_value(file_name)}' "
+                 f"and mimeType != 'application/vnd.google-apps.folder' and trashed = false")
+        results = FileManager.execute(drive_service.files().list(q=query, fields="files(id, md5Checksum)"))
+        files = results.get('files', [])
+        if files:
+            return files[0]
+        else:
+            return None
+
+    @staticmethod
+    def _escape_query_value(value: str) -> str:
+        return value.replace('\\', '\\\\').replace("'", "\\'")
+
+    @staticmethod
+    def execute(request: HttpRequest) -> Any:
+        """Execute a Google Drive API request, retrying with exponential backoff and jitter
+        when the request is rate limited, fails on the server side or times out.
+        Every Drive API request goes through it, so that it's counted against the `ApiBudget`.
+
+        :param request:
+            The request to execute.
+
+        :return:
+            The response of the request.
+        """
+        from googleapiclient.errors import HttpError
+
+        attempt = 0
+        while True:
+            ApiBudget.spend()
+            try:
+                return request.execute()
+            except HttpError as error:
+                if attempt >= FileManager._MAX_RETRIES or not FileManager._is_retryable(error):
+                    raise
+            except FileManager._TRANSPORT_ERRORS:
+                if attempt >= FileManager._MAX_RETRIES:
+                    raise
+
+            delay = min(FileManager._MAX_RETRY_DELAY, FileManager._BASE_RETRY_DELAY * 2 ** attempt)
+            time.sleep(random.uniform(0, delay))
+            attempt += 1
+            Metrics.count('api_retries')
+
+    @staticmethod
+    def _is_retryable(error: HttpError) -> bool:
+        status = int(error.resp.status)
+        if status == 429 or status >= 500:
+            return True
+        if status == 403:
+            reasons = [detail.get('reason') for detail in error.error_details or [] if isinstance(detail, dict)]
+            return any(reason in FileManager._RATE_LIMIT_REASONS for reason in reasons)
+        return False
+
+    @staticmethod
+    def save_many(
+            drive_service_factory: Callable[[], build],
+            uploads: List[UploadRequest],
+            max_workers: int = 4
+    ) -> List[UploadResult]:
+        """Save several files to Google Drive concurrently.
+
+        The service objects of the Google API client are not thread-safe, every worker thread
+        creates its own through `drive_service_factory`. A file that fails to upload doesn't stop
+        the others, its result has the FAILED status and the error that caused it.
+
+        :param drive_service_factory:
+            A callable returning a new instance of the Google Drive API service object.
+
+        :param uploads:
+            The files to save.
+
+        :param max_workers:
+            The maximum number of files uploaded at the same time.
+
+        :return List[UploadResult]:
+            The result of every upload, in the same order as `uploads`.
+        """
+        thread_state = threading.local()
+
+        def upload(upload_request: UploadRequest) -> UploadResult:
+            if not hasattr(thread_state, 'drive_service'):
+                thread_state.drive_service = drive_service_factory()
+
+            start_time = time.perf_counter()
+            try:
+                return FileManager.save_to_google_drive(
+                    drive_service=thread_state.drive_service,
+                    file=upload_request.file,
+                    file_name=upload_request.file_name,
+                    mime_type=upload_request.mime_type,
+                    folder_structure=upload_request.folder_structure
+                )
+            except Exception as error:
+                return UploadResult(
+                    file_id=None,
+                    file_name=upload_request.file_name,
+                    size=0,
+                    latency=time.perf_counter() - start_time,
+                    status=UploadResult.FAILED,
+                    error=error
+                )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(upload, uploads))
+
+    @staticmethod
+    def save_to_local_file(file: Union[str, BytesIO], file_path: str) -> UploadResult:
+        """Save a file to the local file system, creating its directory if it doesn't exist.
+
+        The file is written to a temporary file next to it and renamed into place, so readers never
+        see a partially written file. An existing file with identical content is left untouched,
+        which keeps its modification time for incremental builds.
+
+        :param file:
+            The content of the file, either as a string or already encoded in a BytesIO.
+
+        :param file_path:
+            The path of the file.
+
+        :return UploadResult:
+            The path of the saved file, the number of bytes written and the time it took.
+        """
+        with Metrics.stage('write_local'):
+            upload_result = FileManager._write_local_file(file=file, file_path=file_path)
+
+        Metrics.count('bytes_written', upload_result.size)
+        return upload_result
+
+    @staticmethod
+    def _write_local_file(file: Union[str, BytesIO], file_path: str) -> UploadResult:
+        start_time = time.perf_counter()
+
+        stream = file if isinstance(file, BytesIO) else BytesIO(file.encode())
+        with stream.getbuffer() as content:
+            size = content.nbytes
+            checksum = hashlib.sha256(content).hexdigest()
+
+        file_exists = os.path.exists(file_path)
+
+        # Skip the write if the content didn't change
+        if file_exists and os.path.getsize(file_path) == size and FileManager._file_checksum(file_path) == checksum:
+            return UploadResult(
+                file_id=file_path,
+                file_name=os.path.basename(file_path),
+                size=0,
+                latency=time.perf_counter() - start_time,
+                status=UploadResult.UNCHANGED
+            )
+
+        directory = os.path.dirname(file_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as temporary_file:
+                with stream.getbuffer() as content:
+                    temporary_file.write(content)
+                temporary_file.flush()
+                os.fsync(temporary_file.fileno())
+            # Temporary files are only readable by their owner, keep the permissions of a regular file instead
+            os.chmod(temporary_path, os.stat(file_path).st_mode & 0o777 if file_exists else 0o644)
+            os.replace(temporary_path, file_path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+        return UploadResult(
+            file_id=file_path,
+            file_name=os.path.basename(file_path),
+            size=size,
+            latency=time.perf_counter() - start_time,
+            status=UploadResult.UPDATED if file_exists else UploadResult.CREATED
+        )
+
+    @staticmethod
+    def _file_checksum(file_path: str) -> str:
+        checksum = hashlib.sha256()
+        with open(file_path, 'rb') as existing_file:
+            for chunk in iter(lambda: existing_file.read(1024 * 1024), b''):
+                checksum.update(chunk)
+        return checksum.hexdigest()
+
+    @staticmethod
+    def load_from_google_drive(drive_service: build, file_name: str, folder_structure: List[str]) -> Optional[bytes]:
+        """Download the content of a file previously saved to Google Drive.
+
+        :param drive_service:
+            An instance of the Google Drive API service object.
+
+        :param file_name:
+            The name of the file.
+
+        :param folder_structure:
+            The path of folders from the root of the drive to the folder where the file is saved.
+
+        :return bytes or None:
+            The content of the file, None if there is no such file.
+        """
+        def download(folder_id: str) -> Optional[bytes]:
+            existing_file = FileManager._get_file(
                 drive_service=drive_service,
-                parent_folder_id=current_folder_id,
-                folder_name=folder_name
+                parent_folder_id=folder_id,
+                file_name=file_name
+            )
+            if not existing_file:
+                return None
+
+            return FileManager.execute(drive_service.files().get_media(fileId=existing_file['id']))
+
+        with Metrics.stage('download'):
+            content = FileManager._in_folder(
+                drive_service=drive_service,
+                folder_structure=folder_structure,
+                operation=download
             )
-            if folder_id:
-                current_folder_id = folder_id
-            else:
-                current_folder_id = FileManager._create_folder(
-                    drive_service=drive_service,
-                    parent_folder_id=current_folder_id,
-                    folder_name=folder_name
-                )
 
-        file_metadata = {'name': file_name, 'parents': [current_folder_id]}
-        media = MediaIoBaseUpload(BytesIO(file.encode()), mimetype= mime_type, resumable=True)
-        file = drive_service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields='id'
-        ).execute()
+        if content is not None:
+            Metrics.count('bytes_downloaded', len(content))
+        return content
+
+    @staticmethod
+    def save_to_google_drive(
+            drive_service: build,
+            file: Union[str, BytesIO],
+            file_name: str,
+            mime_type: str,
+            folder_structure: List[str]
+    ) -> UploadResult:
+        """Save a file to Google Drive, creating the folder structure if it doesn't exist.
+
+        A file with the same name in the target folder is updated in place, and left untouched
+        when its content is identical to the new one.
+
+        :param drive_service:
+            An instance of the Google Drive API service object.
+
+        :param file:
+            The content of the file, either as a string or already encoded in a BytesIO,
+            which is uploaded as is without copying it.
+
+        :param file_name:
+            The name of the file.
+
+        :param mime_type:
+            The MIME type of the file.
+
+        :param folder_structure:
+            The path of folders from the root of the drive to the folder where the file is saved.
+
+        :return UploadResult:
+            The ID of the saved file, the number of bytes sent and the time the upload took.
+        """
+        with Metrics.stage('upload'):
+            upload_result = FileManager._upload_file(
+                drive_service=drive_service,
+                file=file,
+                file_name=file_name,
+                mime_type=mime_type,
+                folder_structure=folder_structure
+            )
+
+        Metrics.count('bytes_uploaded', upload_result.size)
+        return upload_result
+
+    @staticmethod
+    def _upload_file(
+            drive_service: build,
+            file: Union[str, BytesIO],
+            file_name: str,
+            mime_type: str,
+            folder_structure: List[str]
+    ) -> UploadResult:
+        start_time = time.perf_counter()
+
+        stream = file if isinstance(file, BytesIO) else BytesIO(file.encode())
+        with stream.getbuffer() as content:
+            size = content.nbytes
+            md5_checksum = hashlib.md5(content).hexdigest()
+
+        # Get the ID of the target folder, creating the folder structure if it doesn't exist
+        return FileManager._in_folder(
+            drive_service=drive_service,
+            folder_structure=folder_structure,
+            operation=lambda folder_id: FileManager._upload_to_folder(
+                drive_service=drive_service,
+                folder_id=folder_id,
+                stream=stream,
+                size=size,
+                md5_checksum=md5_checksum,
+                file_name=file_name,
+                mime_type=mime_type,
+                start_time=start_time
+            )
+        )
+
+    @staticmethod
+    def _upload_to_folder(
+            drive_service: build,
+            folder_id: str,
+            stream: BytesIO,
+            size: int,
+            md5_checksum: str,
+            file_name: str,
+            mime_type: str,
+            start_time: float
+    ) -> UploadResult:
+        from googleapiclient.http import MediaIoBaseUpload
+
+        existing_file = FileManager._get_file(
+            drive_service=drive_service,
+            parent_folder_id=folder_id,
+            file_name=file_name
+        )
+
+        # Skip the upload if the content didn't change
+        if existing_file and existing_file.get('md5Checksum') == md5_checksum:
+            return UploadResult(
+                file_id=existing_file['id'],
+                file_name=file_name,
+                size=0,
+                latency=time.perf_counter() - start_time,
+                status=UploadResult.UNCHANGED
+            )
+
+        stream.seek(0)
+        media = MediaIoBaseUpload(
+            stream,
+            mimetype=mime_type,
+            resumable=size > FileManager._RESUMABLE_UPLOAD_THRESHOLD
+        )
+
+        if existing_file:
+            # Replace the content of the existing file instead of adding a duplicate
+            file = FileManager.execute(drive_service.files().update(
+                fileId=existing_file['id'],
+                media_body=media,
+                fields='id'
+            ))
+        else:
+            file_metadata = {'name': file_name, 'parents': [folder_id]}
+            file = FileManager.execute(drive_service.files().create(
+                body=file_metadata,
+                media_body=media,
+                fields='id'
+            ))
 
-        print(f'File ID: {file.get("id")}')
\ No newline at end of file
+        return UploadResult(
+            file_id=file.get('id'),
+            file_name=file_name,
+            size=size,
+            latency=time.perf_counter() - start_time,
+            status=UploadResult.UPDATED if existing_file else UploadResult.CREATED
+        )
\ No newline at end of file
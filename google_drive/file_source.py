@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import csv
+import datetime
+import glob
+import hashlib
+import os
+import zipfile
+
+from data_source import DataSource
+from instrumentation import Metrics
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.etree.ElementTree import Element, iterparse
+
+
+# noinspection PyCompatibility
+class FileSource(DataSource):
+    """
+        A data source reading a workbook exported from Google Sheets, without any access to the Google APIs:
+        an XLSX or ODS file, a directory with one CSV file per worksheet, or a single CSV file.
+
+        Worksheets are streamed row by row (openpyxl's read-only mode for XLSX, an incremental XML
+        parse for ODS) and fetched one at a time, so only the rows of the worksheet being parsed are
+        kept in memory. Cells are read as displayed, like the values returned by the Google Sheets API.
+    """
+
+    _ODS_TABLE_NAMESPACE = 'urn:oasis:names:tc:opendocument:xmlns:table:1.0'
+    _ODS_TEXT_NAMESPACE = 'urn:oasis:names:tc:opendocument:xmlns:text:1.0'
+    _ODS_TABLE = f'{{{_ODS_TABLE_NAMESPACE}}}table'
+    _ODS_TABLE_ROW = f'{{{_ODS_TABLE_NAMESPACE}}}table-row'
+    _ODS_TABLE_CELLS = (f'{{{_ODS_TABLE_NAMESPACE}}}table-cell', f'{{{_ODS_TABLE_NAMESPACE}}}covered-table-cell')
+    _ODS_PARAGRAPH = f'{{{_ODS_TEXT_NAMESPACE}}}p'
+
+    def __init__(self, path: str, sha256: Optional[str] = None):
+        """Initializes a new FileSource object.
+
+        Args:
+            path (str): The path of the .xlsx, .ods or .csv file, or of a directory of .csv files
+                named after their worksheet.
+            sha256 (str): The expected SHA-256 checksum of the export, in hexadecimal. The workbook is
+                rejected when its content doesn't match, e.g. to build a release from a pinned export.
+        """
+        self._path = path
+        self._format = self._detect_format(path)
+        self._checksum = self._compute_checksum()
+
+        if sha256 is not None and sha256.lower() != self._checksum:
+            raise ValueError(f"The checksum of {path} is {self._checksum}, expected {sha256.lower()}")
+
+    @property
+    def source_id(self) -> str:
+        return os.path.abspath(self._path)
+
+    @property
+    def checksum(self) -> str:
+        """Gets the SHA-256 checksum of the export, of every CSV file in name order for a directory.
+
+        :return str:
+            The checksum in hexadecimal.
+        """
+        return self._checksum
+
+    def worksheet_titles(self) -> List[str]:
+        if self._format == 'xlsx':
+            workbook = self._open_xlsx()
+            try:
+                return list(workbook.sheetnames)
+            finally:
+                workbook.close()
+
+        if self._format == 'ods':
+            return [title for title, _ in self._iter_ods_tables(titles=set())]
+
+        return list(self._csv_files())
+
+    def fetch_values(self, titles: List[str]) -> List[List[List[str]]]:
+        return list(self.iter_values(titles))
+
+    def iter_values(self, titles: List[str]) -> Iterator[List[List[str]]]:
+        if self._format == 'ods':
+            worksheets = self._iter_ods_worksheets(titles)
+        elif self._format == 'xlsx':
+            worksheets = self._iter_xlsx_worksheets(titles)
+        else:
+            worksheets = self._iter_csv_worksheets(titles)
+
+        for rows in worksheets:
+            Metrics.count('cells_fetched', len(rows) * len(rows[0]) if rows else 0)
+            yield rows
+
+    @staticmethod
+    def _detect_format(path: str) -> str:
+        if os.path.isdir(path):
+            return 'csv'
+
+        extension = os.path.splitext(path)[1].lower()
+        if extension in ('.xlsx', '.xlsm'):
+            return 'xlsx'
+        if extension == '.ods':
+            return 'ods'
+        if extension == '.csv':
+            return 'csv'
+
+        raise ValueError(f"Unsupported workbook format: {path}, expected an .xlsx, .ods or .csv file or a directory")
+
+    def _compute_checksum(self) -> str:
+        checksum = hashlib.sha256()
+        paths = list(self._csv_files().values()) if self._format == 'csv' else [self._path]
+
+        for path in paths:
+            with open(path, 'rb') as workbook_file:
+                for chunk in iter(lambda: workbook_file.read(1024 * 1024), b''):
+                    checksum.update(chunk)
+
+        return checksum.hexdigest()
+
+    def _fetch(self, rows: Iterable[Iterable[Any]]) -> List[List[str]]:
+        """Reads the rows of a worksheet like the `values:batchGet` requests of the Google Sheets source:
+        trailing empty rows and cells are dropped, then the rows are padded to a rectangular grid.
+
+        :param rows:
+            The rows of the worksheet, as an iterator of cell values.
+
+        :return List[List[str]]:
+            The rows of the worksheet.
+        """
+        with Metrics.stage('fetch'):
+            values: List[List[str]] = []
+            pending_empty_rows = 0
+
+            for row in rows:
+                cells = [self._cell_text(value) for value in row]
+                while cells and not cells[-1]:
+                    cells.pop()
+
+                # Only keep empty rows followed by a non-empty one
+                if not cells:
+                    pending_empty_rows += 1
+                    continue
+
+                values.extend([] for _ in range(pending_empty_rows))
+                pending_empty_rows = 0
+                values.append(cells)
+
+            self._fetch_count += 1
+
+            width = max((len(row) for row in values), default=0)
+            for row in values:
+                row.extend([""] * (width - len(row)))
+
+            return values
+
+    @staticmethod
+    def _cell_text(value: Any) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, bool):
+            return "TRUE" if value else "FALSE"
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        if isinstance(value, datetime.datetime) and value.time() == datetime.time():
+            return value.date().isoformat()
+        return str(value)
+
+    def _open_xlsx(self):
+        # openpyxl is only needed for XLSX exports, import it when one is read
+        from openpyxl import load_workbook
+
+        return load_workbook(self._path, read_only=True, data_only=True)
+
+    def _iter_xlsx_worksheets(self, titles: List[str]) -> Iterator[List[List[str]]]:
+        workbook = self._open_xlsx()
+        try:
+            for title in titles:
+                yield self._fetch(workbook[title].iter_rows(values_only=True))
+        finally:
+            workbook.close()
+
+    def _csv_files(self) -> Dict[str, str]:
+        """Lists the CSV files of the export, keyed by the title of their worksheet, in name order."""
+        if not os.path.isdir(self._path):
+            return {os.path.splitext(os.path.basename(self._path))[0]: self._path}
+
+        return {
+            os.path.splitext(os.path.basename(path))[0]: path
+            for path in sorted(glob.glob(os.path.join(self._path, '*.csv')))
+        }
+
+    def _iter_csv_worksheets(self, titles: List[str]) -> Iterator[List[List[str]]]:
+        csv_files = self._csv_files()
+
+        for title in titles:
+            with open(csv_files[title], newline='', encoding='utf-8-sig') as csv_file:
+                yield self._fetch(csv.reader(csv_file))
+
+    def _iter_ods_worksheets(self, titles: List[str]) -> Iterator[List[List[str]]]:
+        """Reads the requested tables of the ODS file in a single pass.
+
+        Tables requested in workbook order, as the generators do, are yielded as soon as they are read.
+        Tables requested out of order are kept until their turn comes.
+        """
+        pending: Dict[str, List[List[str]]] = {}
+        next_index = 0
+
+        for title, rows in self._iter_ods_tables(titles=set(titles)):
+            pending[title] = rows
+            while next_index < len(titles) and titles[next_index] in pending:
+                yield pending.pop(titles[next_index])
+                next_index += 1
+
+        if next_index < len(titles):
+            raise KeyError(f"No worksheet titled '{titles[next_index]}' in {self._path}")
+
+    def _iter_ods_tables(self, titles: set) -> Iterator[Tuple[str, List[List[str]]]]:
+        """Streams the tables of the ODS file, parsing the rows of the tables with the given titles only.
+
+        :param titles:
+            The titles of the tables whose rows are read, the rows of the other tables are empty.
+
+        :return Iterator[Tuple[str, List[List[str]]]]:
+            The title and rows of every table, in workbook order.
+        """
+        table_name = f'{{{self._ODS_TABLE_NAMESPACE}}}name'
+        rows_repeated = f'{{{self._ODS_TABLE_NAMESPACE}}}number-rows-repeated'
+
+        with zipfile.ZipFile(self._path) as ods_file, ods_file.open('content.xml') as content:
+            title = None
+            rows: List[Tuple[List[str], int]] = []
+            depth = 0
+
+            for event, element in iterparse(content, events=('start', 'end')):
+                if element.tag == self._ODS_TABLE:
+                    # Nested tables (e.g. inside shapes) belong to the cells of the outer table
+                    depth += 1 if event == 'start' else -1
+                    if event == 'start' and depth == 1:
+                        title = element.get(table_name)
+                        rows = []
+                    elif event == 'end' and depth == 0:
+                        yield title, self._fetch(self._expand_ods_rows(rows)) if title in titles else []
+                        element.clear()
+                elif event == 'end' and element.tag == self._ODS_TABLE_ROW and depth == 1:
+                    if title in titles:
+                        rows.append((self._ods_row_cells(element), int(element.get(rows_repeated, 1))))
+                    element.clear()
+
+    @staticmethod
+    def _expand_ods_rows(rows: List[Tuple[List[str], int]]) -> Iterator[List[str]]:
+        # Trailing empty rows are often repeated up to the last row of the sheet, they're dropped anyway.
+        # Every row before the last non-empty one is expanded, empty ones included, so that rows keep their index.
+        last_index = max((index for index, (cells, _) in enumerate(rows) if any(cells)), default=-1)
+
+        for cells, repeated in rows[:last_index + 1]:
+            for _ in range(repeated):
+                yield cells
+
+    def _ods_row_cells(self, row: Element) -> List[str]:
+        columns_repeated = f'{{{self._ODS_TABLE_NAMESPACE}}}number-columns-repeated'
+
+        cells: List[str] = []
+        pending_empty_cells = 0
+
+        for cell in row:
+            if cell.tag not in self._ODS_TABLE_CELLS:
+                continue
+
+            text = "\n".join(self._ods_paragraph_text(paragraph) for paragraph in cell.findall(self._ODS_PARAGRAPH))
+            repeated = int(cell.get(columns_repeated, 1))
+
+            # Empty cells are repeated up to the last column of the sheet, only keep those followed by a value
+            if not text:
+                pending_empty_cells += repeated
+                continue
+
+            cells.extend([""] * pending_empty_cells)
+            pending_empty_cells = 0
+            cells.extend([text] * repeated)
+
+        return cells
+
+    def _ods_paragraph_text(self, paragraph: Element) -> str:
+        text = [paragraph.text or ""]
+
+        for child in paragraph:
+            tag = child.tag.rsplit('}', 1)[-1]
+            if tag == 's':
+                text.append(" " * int(child.get(f'{{{self._ODS_TEXT_NAMESPACE}}}c', 1)))
+            elif tag == 'tab':
+                text.append("\t")
+            elif tag == 'line-break':
+                text.append("\n")
+            else:
+                text.append(self._ods_paragraph_text(child))
+            text.append(child.tail or "")
+
+        return "".join(text)
@@ -0,0 +1,255 @@
+from concurrent.futures import ThreadPoolExecutor
+from generate_translations_base import GenerateTranslation
+from file_manager import FileManager
+from instrumentation import Metrics
+from io import BytesIO
+from typing import Dict, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape
+from Models.sheet import Sheet
+from Models.upload_request import UploadRequest
+from Models.upload_result import UploadResult
+
+import os
+import re
+
+
+# noinspection PyCompatibility
+class AndroidTranslation(GenerateTranslation):
+
+    """
+    A strings.xml file is generated per language and is mapped using the following properties
+    <resources>
+        <!-- LOCALIZED_STRING.COMMENT -->
+        <string name="LOCALIZED_STRING.LOCALIZED_KEY">LOCALIZED_STRING.LOCALIZED_VALUE</string>
+    </resources>
+
+    The source language (first column) is written to `values/strings.xml` using the keys as values,
+    every other language to `values-<COLUMN_VALUE.LANGUAGE_CODE>/strings.xml`.
+    """
+
+    platform = "android"
+
+    # Maximum number of strings.xml files written at the same time
+    _MAX_WORKERS: int = 8
+
+    # iOS object specifiers (%@, %1$@) are written as Android string specifiers (%s, %1$s)
+    _OBJECT_SPECIFIER_PATTERN = re.compile(r'%(\d+\$)?@')
+    _INVALID_NAME_CHARACTERS_PATTERN = re.compile(r'[^0-9A-Za-z_]+')
+
+    def generate(
+            self,
+            output_dir: Optional[str] = None,
+            save_to_drive: bool = True,
+            merge: bool = False,
+            remove_missing_keys: bool = False
+    ) -> List[UploadResult]:
+        # The strings.xml files only hold what the spreadsheet does, they're always written from scratch
+        sheets = self.sheets
+
+        # Build every strings.xml file, one per language directory
+        with ThreadPoolExecutor(max_workers=self._MAX_WORKERS) as executor:
+            with Metrics.stage('emit.android'):
+                languages = self._collect_languages(sheets)
+                files: Dict[str, BytesIO] = dict(zip(
+                    languages,
+                    executor.map(lambda directory: self._strings_xml(languages[directory]), languages)
+                ))
+            Metrics.count('bytes_emitted', sum(file.getbuffer().nbytes for file in files.values()))
+
+            upload_results: List[UploadResult] = []
+
+            if output_dir:
+                upload_results.extend(executor.map(
+                    lambda directory: FileManager.save_to_local_file(
+                        file=files[directory],
+                        file_path=os.path.join(output_dir, directory, "strings.xml")
+                    ),
+                    files
+                ))
+
+        if save_to_drive:
+            # Resolve the folder every language folder is created in once, before uploading them in parallel
+            FileManager.resolve_folder_path(
+                drive_service=self._drive_service(),
+                folder_structure=self._drive_folder + ['Android']
+            )
+            upload_results.extend(FileManager.save_many(
+                drive_service_factory=self._drive_service,
+                uploads=[
+                    UploadRequest(
+                        file=file,
+                        file_name="strings.xml",
+                        mime_type="text/xml",
+                        folder_structure=self._drive_folder + ['Android', directory]
+                    )
+                    for directory, file in files.items()
+                ],
+                max_workers=self._MAX_WORKERS
+            ))
+
+        return upload_results
+
+    def _collect_languages(self, sheets: List[Sheet]) -> Dict[str, List[Tuple[str, str, str]]]:
+        """
+            Groups the localized strings of every sheet by the resource directory of their language.
+            A key defined more than once keeps the position of its first definition and the value of its last one,
+            like the iOS catalog, an empty value in the last definition leaves the key out of that language.
+
+        :param sheets List[Sheet]:
+            The sheets to collect the localized strings from.
+
+        :return Dict[str, List[Tuple[str, str, str]]]:
+            The (key, value, comment) rows of every resource directory, e.g. "values-fr".
+            Keys starting with "//" are kept as section comments.
+
+        :raises ValueError:
+            If different keys are written as the same resource name, e.g. "a.b" and "a-b".
+        """
+        languages: Dict[str, List[Optional[Tuple[str, str, str]]]] = {}
+        # Position of every key in the rows of each resource directory
+        positions: Dict[str, Dict[str, int]] = {}
+        source_language_code: Optional[str] = None
+
+        for sheet in sheets:
+            for column_index, column_value in enumerate(sheet.columns):
+
+                # First language of the first sheet will be considered the default language
+                if source_language_code is None:
+                    source_language_code = column_value.language_code
+
+                if column_value.language_code == source_language_code:
+                    directory = "values"
+                else:
+                    directory = f"values-{self._resource_qualifier(column_value.language_code)}"
+
+                rows = languages.setdefault(directory, [])
+                key_positions = positions.setdefault(directory, {})
+
+                for localized_string in column_value.strings:
+                    localized_key = localized_string.localized_key
+
+                    # Check if key is not empty
+                    if not localized_key:
+                        continue
+
+                    # The source column holds the keys themselves
+                    localized_value = localized_key if column_index == 0 else localized_string.localized_value
+
+                    # Section comments are written wherever they appear
+                    if localized_key.startswith("//"):
+                        if localized_value:
+                            rows.append((localized_key, localized_value, localized_string.comment))
+                        continue
+
+                    # Check if value is not empty or a comment
+                    if localized_value and not localized_value.startswith("//"):
+                        row = (localized_key, localized_value, localized_string.comment)
+                    else:
+                        row = None
+
+                    position = key_positions.get(localized_key)
+                    if position is not None:
+                        rows[position] = row
+                    elif row is not None:
+                        key_positions[localized_key] = len(rows)
+                        rows.append(row)
+
+        self._check_resource_names(dict.fromkeys(
+            localized_key for key_positions in positions.values() for localized_key in key_positions
+        ))
+
+        return {directory: [row for row in rows if row is not None] for directory, rows in languages.items()}
+
+    @classmethod
+    def _check_resource_names(cls, localized_keys: Iterable[str]):
+        """Checks that different keys aren't written as the same resource name.
+
+        :param localized_keys:
+            Every key written, once.
+
+        :raises ValueError:
+            If some keys are written as the same resource name, listing them.
+        """
+        keys_by_name: Dict[str, List[str]] = {}
+        for localized_key in localized_keys:
+            keys_by_name.setdefault(cls._resource_name(localized_key), []).append(localized_key)
+
+        collisions = [
+            f'{", ".join(repr(localized_key) for localized_key in localized_keys)} -> "{name}"'
+            for name, localized_keys in keys_by_name.items()
+            if len(localized_keys) > 1
+        ]
+        if collisions:
+            raise ValueError(f"Keys written as the same Android resource name: {'; '.join(collisions)}")
+
+    def _strings_xml(self, rows: List[Tuple[str, str, str]]) -> BytesIO:
+        """
+            Writes the strings.xml file of a single language.
+
+        :param rows List[Tuple[str, str, str]]:
+            The (key, value, comment) rows of the language.
+
+        :return BytesIO:
+            The content of the file, encoded in UTF-8.
+        """
+        lines = ['<?xml version="1.0" encoding="utf-8"?>', '<resources>']
+
+        for localized_key, localized_value, comment in rows:
+            if localized_key.startswith("//"):
+                lines.append(f'    <!-- {self._escape_comment(localized_key[2:].strip())} -->')
+                continue
+
+            if comment:
+                lines.append(f'    <!-- {self._escape_comment(comment)} -->')
+
+            lines.append(
+                f'    <string name="{self._resource_name(localized_key)}">{self._escape_value(localized_value)}</string>'
+            )
+
+        lines.append('</resources>')
+
+        return BytesIO(('\n'.join(lines) + '\n').encode())
+
+    @staticmethod
+    def _resource_qualifier(language_code: str) -> str:
+        """Converts a language code to the qualifier of an Android resource directory.
+
+        :param language_code:
+            The language code, e.g. "fr", "pt-BR" or "zh-Hans".
+
+        :return str:
+            The qualifier, e.g. "fr", "pt-rBR" or "b+zh+Hans".
+        """
+        parts = re.split(r'[-_]', language_code)
+
+        if len(parts) == 1:
+            return parts[0]
+
+        if len(parts) == 2 and len(parts[1]) == 2 and parts[1].isalpha():
+            return f"{parts[0]}-r{parts[1].upper()}"
+
+        return "b+" + "+".join(parts)
+
+    @classmethod
+    def _resource_name(cls, localized_key: str) -> str:
+        # Resource names may only contain letters, digits and underscores
+        name = cls._INVALID_NAME_CHARACTERS_PATTERN.sub('_', localized_key.strip()).strip('_')
+        if not name or name[0].isdigit():
+            name = f"_{name}"
+        return name
+
+    @classmethod
+    def _escape_value(cls, localized_value: str) -> str:
+        value = cls._OBJECT_SPECIFIER_PATTERN.sub(lambda match: f"%{match.group(1) or ''}s", localized_value)
+        value = value.replace('\\', '\\\\').replace('"', '\\"').replace("'", "\\'").replace('\n', '\\n')
+
+        # A leading @ or ? would be read as a reference to another resource
+        if value.startswith(('@', '?')):
+            value = f"\\{value}"
+
+        return escape(value)
+
+    @staticmethod
+    def _escape_comment(comment: str) -> str:
+        # "--" isn't allowed inside XML comments
+        return re.sub(r'-(?=-)', '- ', escape(comment))
@@ -1,120 +1,473 @@
-import gspread
+from __future__ import annotations
 
-from pandas import DataFrame
-from google.oauth2.credentials import Credentials
-from typing import List
+import hashlib
+import json
+import sys
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+from Models.catalog_changes import CatalogChanges
 from Models.sheet import Sheet
 from Models.localized_column import LocalizedColumn
 from Models.localized_string import LocalizedString
+from Models.upload_result import UploadResult
+from data_source import DataSource, GoogleSheetsSource
+from google_services import GoogleServices
+from instrumentation import Metrics
+from key_index import KeyIndex, SheetKeys
+from snapshot_cache import SnapshotCache
+
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import Resource
+    from pandas import DataFrame
 
 
 # noinspection PyCompatibility
-class GenerateTranslation:
+class _ParsedWorkbook:
+    """
+        The worksheets of a spreadsheet and what was parsed from them,
+        shared by the generators of every platform created with `GenerateTranslation.from_translation`.
+    """
+
+    __slots__ = ('worksheet_titles', 'parsed_sheets', 'worksheet_hashes', 'sheet_keys', 'key_index')
+
+    def __init__(self, worksheet_titles: List[str]):
+        """Initializes a new _ParsedWorkbook object, with no worksheet parsed yet.
 
-    def __init__(self, credentials: Credentials):
+        Args:
+            worksheet_titles (List[str]): The titles of the worksheets of the spreadsheet, in order.
+        """
+        self.worksheet_titles = worksheet_titles
+        # Parsed worksheets keyed by title, empty worksheets are cached as None
+        self.parsed_sheets: Dict[str, Optional[Sheet]] = {}
+        # Content hash of the raw values each parsed worksheet was created from
+        self.worksheet_hashes: Dict[str, str] = {}
+        # Keys of every parsed worksheet, and their index rebuilt after a worksheet is parsed or discarded
+        self.sheet_keys: Dict[str, SheetKeys] = {}
+        self.key_index: Optional[KeyIndex] = None
+
+
+# noinspection PyCompatibility
+class GenerateTranslation(ABC):
+
+    # Name of the platform a subclass generates translation files for
+    platform: str = ""
+
+    def __init__(
+            self,
+            credentials: Optional[Credentials] = None,
+            batch_fetch: bool = True,
+            cache_dir: Optional[str] = None,
+            spreadsheet: str = "Translations",
+            drive_folder: Optional[List[str]] = None,
+            data_source: Optional[DataSource] = None,
+            drive_service_factory: Optional[Callable[[], Resource]] = None
+    ):
         """ This class serves as a base class for objects responsible for generating translations
             subclass it to generate a translation file to a specific platform.
-            Utilizes the `gspread` library to interact with the Google Sheet API.
-        """
+            Reads the spreadsheet from Google Sheets by default, through a `GoogleSheetsSource`.
+
+        :param credentials:
+            The authorized credentials used for the Google Sheets and Google Drive APIs.
+
+        :param batch_fetch:
+            When True, the values of every worksheet are pulled with as few `values:batchGet`
+            requests as possible instead of one `get_all_values()` call per worksheet.
+
+        :param cache_dir:
+            When set, the raw cell values are kept in a snapshot under this directory and reused
+            as long as the spreadsheet's Drive revision is unchanged.
 
-        spreadsheet_file_name: str = "Translations"
+        :param spreadsheet:
+            The URL, key or title of the spreadsheet. Opening by URL or key saves the Drive search
+            needed to find a spreadsheet by its title.
 
+        :param drive_folder:
+            The Google Drive folder path the generated files are saved under, "Translations" by default.
+            Each platform saves its files to a subfolder of it.
+
+        :param data_source:
+            The workbook to read the translations from instead of the Google Sheets spreadsheet,
+            e.g. an `InMemorySource`. `batch_fetch` and `spreadsheet` are ignored when set.
+
+        :param drive_service_factory:
+            A callable returning the Google Drive API service object the files are saved with,
+            the service of `credentials` by default.
+        """
         self._credentials = credentials
+        self._data_source: DataSource = data_source or GoogleSheetsSource(
+            credentials=credentials,
+            spreadsheet=spreadsheet,
+            batch_fetch=batch_fetch
+        )
+        self._drive_service_factory = drive_service_factory
+        self._drive_folder: List[str] = drive_folder or ['Translations']
+        self._snapshot_cache: Optional[SnapshotCache] = SnapshotCache(cache_dir) if cache_dir else None
+        self._workbook = _ParsedWorkbook(worksheet_titles=self._data_source.worksheet_titles())
+        # Changes made by the last merging `generate` call, None if the files weren't merged
+        self._catalog_changes: Optional[CatalogChanges] = None
+
+    @classmethod
+    def from_translation(cls, translation: GenerateTranslation) -> GenerateTranslation:
+        """
+            Creates a generator that reads from the same spreadsheet as another one, typically for another platform,
+            without authorizing, opening or parsing the spreadsheet again.
+            Both objects share the same data source and parsed worksheets: worksheets parsed, refreshed or invalidated
+            through one are seen by the other. What a merge changed is kept by each generator.
+
+        :param translation GenerateTranslation:
+            The generator to share the spreadsheet and parsed sheets with.
+
+        :return GenerateTranslation:
+            A new generator of this class.
+        """
+        generator = cls.__new__(cls)
+        generator._credentials = translation._credentials
+        generator._data_source = translation._data_source
+        generator._drive_service_factory = translation._drive_service_factory
+        generator._drive_folder = translation._drive_folder
+        generator._snapshot_cache = translation._snapshot_cache
+        generator._workbook = translation._workbook
+        generator._catalog_changes = None
+        return generator
 
-        # Authorize the client using the credentials
-        spreadsheet_service: gspread.Client = gspread.authorize(credentials)
+    @property
+    def spreadsheet_id(self) -> str:
+        """Gets the ID of the spreadsheet the translations are read from.
 
-        # Open the spreadsheet by its title
-        self._worksheets: List[gspread.Worksheet] = spreadsheet_service.open(spreadsheet_file_name).worksheets()
+        :return str:
+            The spreadsheet ID, or the identifier of the data source the translations are read from.
+        """
+        return self._data_source.source_id
 
     @property
     def sheets(self) -> List[Sheet]:
         """
             Retrieves a list of Sheet objects. The Sheet objects are created
-            by calling the `_transform_worksheets` method.
+            by calling the `_transform_worksheets` method the first time they are accessed
+            and are cached afterwards, see `refresh` and `invalidate`.
 
         :return List[Sheet]:
             A list of Sheet objects representing the worksheets in the spreadsheet.
         """
         return self._transform_worksheets()
 
+    @property
+    def key_index(self) -> KeyIndex:
+        """
+            Retrieves the index of the keys of every worksheet, see `KeyIndex`. The keys are collected
+            while the worksheets are parsed, the index is kept until a worksheet is parsed again or discarded.
+
+        :return KeyIndex:
+            The index of the keys of `sheets`.
+        """
+        self._transform_worksheets()
+
+        if self._workbook.key_index is None:
+            with Metrics.stage('index'):
+                sheet_keys = self._workbook.sheet_keys
+                self._workbook.key_index = KeyIndex([
+                    sheet_keys[title] for title in self._workbook.worksheet_titles if title in sheet_keys
+                ])
+
+        return self._workbook.key_index
+
+    @property
+    def catalog_changes(self) -> Optional[CatalogChanges]:
+        """Gets what the last merging `generate` call changed in the previous file of this platform.
+
+        :return Optional[CatalogChanges]:
+            The changes, None if the files weren't merged.
+        """
+        return self._catalog_changes
+
+    @property
+    def fetch_count(self) -> int:
+        """Gets the number of requests made to retrieve worksheet values.
+
+        :return int:
+            The number of `values:batchGet` (or `get_all_values()`) requests made by this object.
+        """
+        return self._data_source.fetch_count
+
+    def refresh(self):
+        """
+            Discards every parsed worksheet and reloads the list of worksheets of the spreadsheet,
+            the next access to `sheets` downloads and parses all of them again.
+        """
+        self._workbook.worksheet_titles = self._data_source.worksheet_titles()
+        self._workbook.parsed_sheets.clear()
+        self._workbook.worksheet_hashes.clear()
+        self._workbook.sheet_keys.clear()
+        self._workbook.key_index = None
+
+    def invalidate(self, title: str):
+        """
+            Discards the parsed worksheet with the given title,
+            the next access to `sheets` downloads and parses only that worksheet again.
+
+        :param title str:
+            The title of the worksheet to discard.
+        """
+        self._workbook.parsed_sheets.pop(title, None)
+        self._workbook.worksheet_hashes.pop(title, None)
+        self._workbook.sheet_keys.pop(title, None)
+        self._workbook.key_index = None
+
+    def refresh_changed(self) -> List[str]:
+        """
+            Reloads the list of worksheets, downloads their values and re-parses only the worksheets
+            whose content changed since they were last parsed. Unchanged worksheets keep their Sheet objects.
+
+        :return List[str]:
+            The titles of the worksheets that were added, changed or removed.
+        """
+        self._workbook.worksheet_titles = self._data_source.worksheet_titles()
+        self._workbook.key_index = None
+
+        changed_titles = [title for title in self._workbook.parsed_sheets if title not in self._workbook.worksheet_titles]
+        for title in changed_titles:
+            self.invalidate(title)
+
+        worksheet_titles = self._workbook.worksheet_titles
+        for title, raw_cells_data in zip(worksheet_titles, self._load_worksheet_values(worksheet_titles)):
+            if self._workbook.worksheet_hashes.get(title) == self._hash_values(raw_cells_data):
+                continue
+
+            self._parse_worksheet(title=title, raw_cells_data=raw_cells_data)
+            changed_titles.append(title)
+
+        return changed_titles
+
+    @abstractmethod
+    def generate(
+            self,
+            output_dir: Optional[str] = None,
+            save_to_drive: bool = True,
+            merge: bool = False,
+            remove_missing_keys: bool = False
+    ) -> List[UploadResult]:
+        """
+            Generates the translation files of a specific platform from `sheets`, subclasses must implement it.
+
+        :param output_dir Optional[str]:
+            The local directory the files are written to, files are only written locally when set.
+
+        :param save_to_drive bool:
+            Whether the files are saved to Google Drive.
+
+        :param merge bool:
+            Whether the files are merged into their previous version instead of being written from scratch,
+            for platforms whose files hold more than the spreadsheet does (see `IOSTranslation`).
+            Other platforms ignore it.
+
+        :param remove_missing_keys bool:
+            Whether merging removes the keys the spreadsheet doesn't have, see `XCStringsMerger`.
+
+        :return List[UploadResult]:
+            The result of saving every generated file.
+        """
+        raise NotImplementedError
+
     def _transform_worksheets(self) -> List[Sheet]:
         """
-            Loops through worksheets in the spreadsheet, creates DataFrames from their cell values,
-            and generates Sheet objects for each worksheet with data.
+            Loops through worksheets in the spreadsheet that were not parsed yet, splits their cell values
+            into columns, and generates Sheet objects for each worksheet with data.
 
         :return List[Sheet]:
             A list of Sheet objects
         """
+        pending_titles = [title for title in self._workbook.worksheet_titles if title not in self._workbook.parsed_sheets]
+
+        for title, raw_cells_data in zip(pending_titles, self._load_worksheet_values(pending_titles)):
+            self._parse_worksheet(title=title, raw_cells_data=raw_cells_data)
+
         sheet: List[Sheet] = []
 
-        for worksheet in self._worksheets:
-            # Get raw values, create DataFrame
-            raw_cells_data = worksheet.get_all_values()
-            local_data_frame = DataFrame(raw_cells_data)
+        for title in self._workbook.worksheet_titles:
+            parsed_sheet = self._workbook.parsed_sheets.get(title)
+            if parsed_sheet is not None:
+                sheet.append(parsed_sheet)
+
+        return sheet
+
+    def _parse_worksheet(self, title: str, raw_cells_data: List[List[str]]):
+        """
+            Splits the cell values of a worksheet into columns and caches the resulting Sheet object,
+            along with the hash of the values it was created from.
+
+        :param title str:
+            The title of the worksheet.
+
+        :param raw_cells_data List[List[str]]:
+            The rows of the worksheet.
+        """
+        with Metrics.stage('parse'):
+            self._workbook.worksheet_hashes[title] = self._hash_values(raw_cells_data)
+            self._workbook.key_index = None
+
+            # Transpose the raw rows once into columns
+            columns = self._transpose(raw_cells_data)
+
+            Metrics.count('worksheets_parsed')
+            Metrics.count('rows', len(raw_cells_data))
+            Metrics.count('columns', len(columns))
 
             # Skip empty worksheets (all rows empty)
-            if local_data_frame.empty:
-                continue
+            if not columns:
+                self._workbook.parsed_sheets[title] = None
+                self._workbook.sheet_keys.pop(title, None)
+                return
+
+            self._workbook.sheet_keys[title] = KeyIndex.scan(sheet_name=title, columns=columns)
 
             # Define a Sheet
-            sheet.append(
-                Sheet(
-                    columns=self._generate_columns(local_data_frame),
-                    name=worksheet.title
-                )
+            self._workbook.parsed_sheets[title] = Sheet(
+                columns=self._generate_columns(columns),
+                name=title
             )
 
-        return sheet
+    @staticmethod
+    def _transpose(raw_cells_data: List[List[str]]) -> List[List[str]]:
+        """
+            Converts the rows of a worksheet into a list of columns.
+            Rows are expected to be padded to the same length, as returned by `get_all_values()`.
+
+        :param raw_cells_data List[List[str]]:
+            The rows of the worksheet.
+
+        :return List[List[str]]:
+            The columns of the worksheet, an empty list when the worksheet has no cells.
+        """
+        return [list(column) for column in zip(*raw_cells_data)]
+
+    def worksheet_data_frame(self, title: str) -> DataFrame:
+        """
+            Retrieves the cell values of a worksheet as a pandas DataFrame, for inspecting a worksheet
+            outside of the generators. pandas is only imported when this method is called.
+
+        :param title str:
+            The title of the worksheet.
+
+        :return DataFrame:
+            A DataFrame with one row per worksheet row.
+        """
+        from pandas import DataFrame
+
+        if title not in self._workbook.worksheet_titles:
+            raise ValueError(f"No worksheet titled '{title}'")
+
+        return DataFrame(next(iter(self._load_worksheet_values([title]))))
+
+    @staticmethod
+    def _hash_values(raw_cells_data: List[List[str]]) -> str:
+        serialized_values = json.dumps(raw_cells_data, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(serialized_values.encode()).hexdigest()
 
-    def _generate_columns(self, data_frame: DataFrame) -> List[LocalizedColumn]:
+    def _load_worksheet_values(self, titles: List[str]) -> Iterable[List[List[str]]]:
         """
-            This function processes a DataFrame (representing a worksheet) to create LocalizedColumn objects.
+            Retrieves the raw cell values of the given worksheets, from the snapshot cache when
+            the workbook hasn't changed since it was stored, otherwise from the data source.
+            Without a snapshot cache the worksheets are read one at a time while they are consumed.
+
+        :param titles List[str]:
+            The titles of the worksheets whose values should be retrieved.
+
+        :return Iterable[List[List[str]]]:
+            The rows of every worksheet, in the same order as provided.
+        """
+        if self._snapshot_cache is None or not titles:
+            return self._data_source.iter_values(titles)
+
+        with Metrics.stage('snapshot_load'):
+            revision = self._data_source.revision()
+            snapshot = None
+            if revision is not None:
+                snapshot = self._snapshot_cache.load(spreadsheet_id=self._data_source.source_id, revision=revision)
+
+        # A data source that can't tell whether its content changed would serve stale snapshots
+        if revision is None:
+            return self._data_source.iter_values(titles)
+
+        if snapshot is None or any(title not in snapshot for title in titles):
+            Metrics.count('snapshot_misses')
+
+            # Download every worksheet so the stored snapshot is complete
+            worksheet_titles = self._workbook.worksheet_titles
+            snapshot = dict(zip(worksheet_titles, self._data_source.fetch_values(worksheet_titles)))
+
+            with Metrics.stage('snapshot_store'):
+                self._snapshot_cache.store(
+                    spreadsheet_id=self._data_source.source_id,
+                    revision=revision,
+                    worksheets=snapshot
+                )
+        else:
+            Metrics.count('snapshot_hits')
+
+        return [snapshot[title] for title in titles]
+
+    def _drive_service(self) -> Resource:
+        """Retrieve the Google Drive API service object the generated files are saved with.
+
+        :return Resource:
+            The service object of `drive_service_factory`, or the one of the credentials.
+        """
+        if self._drive_service_factory is not None:
+            return self._drive_service_factory()
+
+        return GoogleServices.drive_service(self._credentials)
+
+    def _generate_columns(self, columns: List[List[str]]) -> List[LocalizedColumn]:
+        """
+            This function processes the columns of a worksheet to create LocalizedColumn objects.
             It iterates through columns (excluding the first comment column) and creates LocalizedColumn objects
             containing language information and localized strings with comments.
 
-        :param data_frame:
-            A pandas DataFrame representing the data from a worksheet.
+        :param columns:
+            The columns of a worksheet, each one a list of cell values from the first row down.
 
         :return List[LocalizedColumn]:
-            A list of LocalizedColumn objects, one for each column in the DataFrame (excluding the first comment column).
+            A list of LocalizedColumn objects, one for each column in the worksheet (excluding the first comment column).
         """
         # Start at second Column as first column is for comments
         start_column_index = 1
 
-        # Define comments
+        # Define the starting row of localized strings
+        row_start_index = 6
+
+        # A worksheet without a base language column has no localized strings
+        if len(columns) <= start_column_index:
+            return []
+
+        # Define comments, computed once and shared by every column
         comments_start_row = 6  # Comments begin at index row 6 of spreadsheet
-        comments_column_name = data_frame.columns[0]
-        comments_column = data_frame[comments_column_name]
-        comments = [comment for comment in comments_column[comments_start_row:]]
+        comments_column = columns[0]
+        comments = self._splice_and_update_index(start_index=comments_start_row, array=comments_column)
 
         # Define the columns to iterate (using index slicing)
-        columns_to_iterate = data_frame.columns[start_column_index:]
+        columns_to_iterate = columns[start_column_index:]
 
         # Base Language
-        base_language_column_name = data_frame.columns[1]
-        base_language_rows = data_frame[base_language_column_name]
+        base_language_rows = columns[1]
+
+        # Generate the keys once, every column shares the same (interned) key objects
+        keys: List[str] = [
+            sys.intern(key) for key in self._splice_and_update_index(start_index=row_start_index, array=base_language_rows)
+        ]
 
         # Define column object
         localized_columns: List[LocalizedColumn] = []
 
         # Loop through columns starting from column B
-        for column_name in columns_to_iterate:
-            # Get the rows in column
-            rows: List[str] = data_frame[column_name]
-
-            # Define the starting row of localized strings
-            row_stat_index = 6
-
-            # Generate the keys
-            keys: List[str] = self._splice_and_update_index(start_index=row_stat_index, array=base_language_rows)
-
+        for rows in columns_to_iterate:
             # Slice rows and create a new list with index 0
-            row_of_strings = self._splice_and_update_index(start_index=row_stat_index, array=rows)
+            row_of_strings = self._splice_and_update_index(start_index=row_start_index, array=rows)
 
             localized_columns.append(
                 LocalizedColumn(
-                    language_code=rows[0],
+                    language_code=sys.intern(rows[0]),
                     language=rows[1],
                     language_name=rows[2],
                     strings=self._generate_string_rows(keys=keys, rows=row_of_strings, comments=comments)
@@ -131,63 +484,46 @@ class GenerateTranslation:
 
         :param keys List[str]:
         A list of strings representing keys for each localized string. The length of this list
-        should correspond to the number of rows with actual translations
+        should correspond to the number of rows with actual translations, rows past its end get an empty key.
 
         :param rows List[str]:
             A list of strings, where each string represents a row in a column from the worksheet.
 
         :param comments List[str]:
-            A list of strings containing comments for each row (extracted from the comments column).
+            A list of strings containing comments for each row (extracted from the comments column),
+            rows past its end get an empty comment.
 
         :return List[LocalizedString]:
             A list of LocalizedString objects, one for each row in the provided list.
         """
-        localized_strings: List[LocalizedString] = []
-
-        for row_index, row_value in enumerate(rows):
-            if row_index <= len(keys) - 1:
-                localized_strings.append(
-                    LocalizedString(
-                        localized_key=keys[row_index],
-                        localized_value=row_value,
-                        comment=self._get_comments_in_range(index=row_index, comments=comments)
-                    )
-                )
-
-            else:
-                localized_strings.append(
-                    LocalizedString(
-                        localized_key="",
-                        localized_value=row_value,
-                        comment=self._get_comments_in_range(index=row_index, comments=comments)
-                    )
-                )
-
-        return localized_strings
-
-    def _get_comments_in_range(self, index: int, comments: List[str]) -> str:
-        """Retrieves a specific comment from a list of comments based on the provided index.
+        row_count = len(rows)
+
+        return [
+            LocalizedString(localized_key=key, localized_value=row_value, comment=comment)
+            for key, row_value, comment in zip(
+                self._pad_to_length(array=keys, length=row_count),
+                rows,
+                self._pad_to_length(array=comments, length=row_count)
+            )
+        ]
 
-        :param self (object):
-            The object instance itself (usually used in class methods).
-            This function is private and intended for internal use within the class.
+    @staticmethod
+    def _pad_to_length(array: List[str], length: int) -> List[str]:
+        """Pads a list of strings with empty strings up to the given length.
 
-        :param index int:
-            The index of the comment to retrieve. Valid indices range from 0 (first comment)
-            to the length of the list minus 1 (last comment).
+        :param array (List[str]):
+            The list to pad, returned as is when it's already long enough.
 
-        :param comments List[str]:
-            The index of the comment to retrieve.
+        :param length (int):
+            The minimum length of the returned list.
 
-        :return str:
-            The comment string at the specified index if it exists within the valid range.
-            An empty string is returned if the index is out of range.
+        :return List[str]:
+            A list of at least `length` elements.
         """
-        comments_index_length = len(comments) - 1
-        if comments_index_length <= index and index >= 0:
-            return ""
+        if len(array) >= length:
+            return array
 
-        return comments[index]
+        return array + [""] * (length - len(array))
 
     def _splice_and_update_index(self, start_index: int, array: List) -> List:
         """Splices a list starting from a specified index and returns a new list containing the remaining elements.
@@ -1,8 +1,13 @@
 from generate_translations_base import GenerateTranslation
-from googleapiclient.discovery import build
 from file_manager import FileManager
+from instrumentation import Metrics
+from io import BytesIO
+from typing import Any, Dict, List, Optional
+from Models.upload_result import UploadResult
+from xcstrings_merger import XCStringsMerger
+from xcstrings_writer import XCStringsWriter
 
-import json
+import os
 
 
 # noinspection PyCompatibility
@@ -26,78 +31,89 @@ class IOSTranslation(GenerateTranslation):
           },
           "version" : "1.0"
         }
-    """
 
-    def generate(self):
-        dictionary = {
-            "sourceLanguage": "",
-            "strings": {
-            },
-        }
+    When merging, the previous catalog is updated instead, see `XCStringsMerger`.
+    """
 
-        for sheet in self.sheets:
-            for column_index, column_value in enumerate(sheet.columns):
-
-                # First language on the columns list will be considered the default or source language
-                if column_index == 0:
-                    dictionary["sourceLanguage"] = column_value.language_code
-
-                    for localized_string in column_value.strings:
-                        dictionary["strings"].update({
-                            localized_string.localized_key: {}
-                        })
-                else:
-                    for localized_string in column_value.strings:
-
-                        # Append Localization String
-
-                        # Check if key and value is not empty
-                        if not localized_string.localized_key or not localized_string.localized_value:
-                            continue
-
-                        # Check if value is not a comment
-                        if (not localized_string.localized_key.startswith("//") and
-                                localized_string.localized_value.startswith("//")):
-                            continue
-
-                        # Check if field "localizations" exist
-                        if "localizations" not in dictionary["strings"][localized_string.localized_key]:
-                            dictionary["strings"][localized_string.localized_key].update({
-                                "localizations": {
-                                    column_value.language_code: {
-                                        "stringUnit": {
-                                            "state": "translated",
-                                            "value": localized_string.localized_value
-                                        }
-                                    }
-                                }
-                            })
-                            continue
-
-                        # If it already exists only append the localized string in the "localizations" field
-                        dictionary["strings"][localized_string.localized_key]["localizations"].update({
-                            column_value.language_code: {
-                                "stringUnit": {
-                                    "state": "translated",
-                                    "value": localized_string.localized_value
-                                }
-                            }
-                        })
-
-                        # Append Comments on Localization String (if there's any)
-                        if not localized_string.comment:
-                            continue
-
-                        dictionary["strings"][localized_string.localized_key].update({
-                            "comment": localized_string.comment
-                        })
-
-        dictionary["version"] = "1.0"
-
-        FileManager.save_to_google_drive(
-            drive_service=build('drive', 'v3', credentials=self._credentials),
-            file=json.dumps(dictionary, ensure_ascii=False, indent=2),
-            file_name="Localizable.json",
-            mime_type="application/json",
-            folder_structure=['Translations', 'iOS']
-        )
+    platform = "ios"
+
+    # Name of the catalog in the local output directory and on Google Drive
+    _CATALOG_FILE_NAME = "Localizable.xcstrings"
+    _DRIVE_FILE_NAME = "Localizable.json"
+
+    def generate(
+            self,
+            output_dir: Optional[str] = None,
+            save_to_drive: bool = True,
+            merge: bool = False,
+            remove_missing_keys: bool = False
+    ) -> List[UploadResult]:
+        # Write the catalog key by key straight into the buffer that is saved
+        sheets = self.sheets
+        local_file_path = os.path.join(output_dir, self._CATALOG_FILE_NAME) if output_dir else None
+
+        catalog = BytesIO()
+        if merge:
+            previous_catalog = self._load_previous_catalog(local_file_path, save_to_drive)
+            with Metrics.stage('emit.ios'):
+                merger = XCStringsMerger(
+                    XCStringsWriter(sheets),
+                    previous_catalog,
+                    file_name=self._CATALOG_FILE_NAME,
+                    remove_missing_keys=remove_missing_keys
+                )
+                merger.write(catalog)
+            self._catalog_changes = merger.changes
+        else:
+            with Metrics.stage('emit.ios'):
+                XCStringsWriter(sheets).write(catalog)
+            self._catalog_changes = None
+        Metrics.count('bytes_emitted', catalog.getbuffer().nbytes)
+
+        upload_results: List[UploadResult] = []
+
+        if local_file_path:
+            upload_results.append(FileManager.save_to_local_file(
+                file=catalog,
+                file_path=local_file_path
+            ))
+
+        if save_to_drive:
+            upload_results.append(FileManager.save_to_google_drive(
+                drive_service=self._drive_service(),
+                file=catalog,
+                file_name=self._DRIVE_FILE_NAME,
+                mime_type="application/json",
+                folder_structure=self._drive_folder + ['iOS']
+            ))
+
+        return upload_results
+
+    def _load_previous_catalog(self, local_file_path: Optional[str], save_to_drive: bool) -> Optional[Dict[str, Any]]:
+        """
+            Loads the catalog to merge into: the local file, which is the one Xcode edits, or else the one
+            previously saved to Google Drive.
+
+        :param local_file_path Optional[str]:
+            The path of the local catalog, None if it isn't written locally.
+
+        :param save_to_drive bool:
+            Whether the catalog is saved to Google Drive, it's only downloaded then.
+
+        :return Optional[Dict[str, Any]]:
+            The parsed catalog, None if there is no previous catalog.
+        """
+        if local_file_path and os.path.exists(local_file_path):
+            with open(local_file_path, 'rb') as local_file:
+                return XCStringsMerger.load(local_file.read(), source=local_file_path)
+
+        if save_to_drive:
+            content = FileManager.load_from_google_drive(
+                drive_service=self._drive_service(),
+                file_name=self._DRIVE_FILE_NAME,
+                folder_structure=self._drive_folder + ['iOS']
+            )
+            if content is not None:
+                return XCStringsMerger.load(content, source=self._DRIVE_FILE_NAME)
+
+        return None
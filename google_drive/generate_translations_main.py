@@ -1,19 +1,40 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
 import os.path
+import sys
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
+from file_manager import FileManager
+from generate_translations_android import AndroidTranslation
 from generate_translations_ios import IOSTranslation
+from instrumentation import Metrics
+from Models.upload_result import UploadResult
+from Models.validation_issue import ValidationIssue
+from translation_runner import TranslationRunner
+from translation_validator import TranslationValidationError, TranslationValidator
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
 
 # If modifying these scopes, delete the file token.json.
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
 
 # Additional Constants
 credential_file = "client_secret_505442340141-8o06brqss1an7qm46hnvrsqssoh8latg.apps.googleusercontent.com.json"
+snapshot_cache_dir = ".translations_cache"
+platforms = {
+    IOSTranslation.platform: IOSTranslation,
+    AndroidTranslation.platform: AndroidTranslation,
+}
+
 
+def load_credentials() -> Credentials:
+    """Loads the saved user credentials, refreshing them or running the authorization flow when needed."""
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
 
-def main():
-    """Calls the Apps Script API."""
     creds = None
     # The file token.json stores the user's access and refresh tokens, and is
     # created automatically when the authorization flow completes for the first
@@ -25,6 +46,8 @@ def main():
         if creds and creds.expired and creds.refresh_token:
             creds.refresh(Request())
         else:
+            from google_auth_oauthlib.flow import InstalledAppFlow
+
             flow = InstalledAppFlow.from_client_secrets_file(
                 credential_file, SCOPES
             )
@@ -33,8 +56,244 @@ def main():
         with open("token.json", "w") as token:
             token.write(creds.to_json())
 
-    test = IOSTranslation(credentials=creds)
-    test.generate()
+    return creds
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """Creates the command line parser, with one subcommand per mode."""
+    # Options shared by every subcommand
+    common_parser = argparse.ArgumentParser(add_help=False)
+    common_parser.add_argument("--metrics", metavar="PATH",
+                               help="Write the time, API requests and bytes of every stage as JSON to this file, '-' for "
+                                    "stdout, in which case everything else is printed to stderr.")
+    common_parser.add_argument("--profile", metavar="PATH",
+                               help="Profile the run with cProfile and write the stats to this file, see the pstats module.")
+
+    # Options shared by every subcommand reading a spreadsheet
+    source_parser = argparse.ArgumentParser(add_help=False, parents=[common_parser])
+    source_parser.add_argument("--spreadsheet", default="Translations",
+                               help="The URL, key or title of the spreadsheet (default: %(default)s).")
+
+    workbook_parser = argparse.ArgumentParser(add_help=False)
+    workbook_parser.add_argument("--workbook", metavar="PATH",
+                                 help="Read the translations from an exported .xlsx, .ods or .csv file, or a directory "
+                                      "of .csv files, instead of the spreadsheet. Combined with --no-drive, "
+                                      "no Google API is used at all.")
+    workbook_parser.add_argument("--workbook-sha256", metavar="CHECKSUM",
+                                 help="Fail unless the SHA-256 checksum of the exported workbook matches this one.")
+
+    # Options shared by every subcommand generating files
+    output_parser = argparse.ArgumentParser(add_help=False, parents=[source_parser])
+    output_parser.add_argument("--platform", nargs="+", choices=list(platforms), default=[IOSTranslation.platform],
+                               help="The platforms to generate files for, the spreadsheet is only parsed once for all of them.")
+    output_parser.add_argument("--ios-output-dir", "--output-dir", dest="ios_output_dir",
+                               help="Also write the iOS files to this local directory, e.g. the Xcode project's resources.")
+    output_parser.add_argument("--android-output-dir",
+                               help="Also write the Android files to this local directory, e.g. the module's res directory.")
+    output_parser.add_argument("--no-drive", action="store_true",
+                               help="Don't save the files to Google Drive.")
+    output_parser.add_argument("--validation", choices=TranslationValidator.MODES, default="warn",
+                               help="Check the format specifiers, length and emptiness of every translation before "
+                                    "generating: 'error' generates nothing when a specifier doesn't match the base "
+                                    "language, 'warn' only reports it (default: %(default)s).")
+    output_parser.add_argument("--merge", action="store_true",
+                               help="Merge into the previous iOS string catalog (the local one, or else the one on "
+                                    "Google Drive) instead of writing it from scratch: only the translations that "
+                                    "changed are updated, the states and variations edited in Xcode are kept.")
+    output_parser.add_argument("--remove-missing-keys", action="store_true",
+                               help="With --merge, remove the keys of the previous catalog that the spreadsheet "
+                                    "doesn't have, other than the ones Xcode marked with an extraction state. "
+                                    "They're kept by default, the catalog also holds the keys Xcode extracted "
+                                    "from the code.")
+
+    parser = argparse.ArgumentParser(description="Generate localization files from the Translations spreadsheet.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    subparsers.add_parser("generate", parents=[output_parser, workbook_parser],
+                          help="Generate the files once (default).")
+
+    watch_parser = subparsers.add_parser("watch", parents=[output_parser],
+                                         help="Keep running and regenerate the files whenever the spreadsheet changes.")
+    watch_parser.add_argument("--interval", type=float, default=10.0,
+                              help="Seconds between two checks for changes.")
+
+    validate_parser = subparsers.add_parser("validate", parents=[source_parser, workbook_parser],
+                                            help="Report duplicate keys, translations without a key and missing translations.")
+    validate_parser.add_argument("--max-listed", type=int, default=10,
+                                 help="The maximum number of keys listed per issue (default: %(default)s).")
+    validate_parser.add_argument("--strict", action="store_true",
+                                 help="Also fail when translations are missing.")
+
+    batch_parser = subparsers.add_parser("batch", parents=[common_parser],
+                                         help="Generate the files of several apps listed in a JSON manifest, in parallel.")
+    batch_parser.add_argument("manifest",
+                              help="The JSON manifest listing the apps, see BatchBuild for its format.")
+    batch_parser.add_argument("--workers", type=int,
+                              help="The maximum number of apps built at the same time (default: the number of CPUs).")
+    batch_parser.add_argument("--requests-per-minute", type=float, default=60.0,
+                              help="The Google API requests allowed per minute across every app (default: %(default)s).")
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    """Generates the localization files, see `--help` for the available subcommands."""
+    arguments = list(argv if argv is not None else sys.argv[1:])
+
+    # Running the script without a subcommand generates the files once, like it always did
+    if not arguments or (arguments[0].startswith("-") and arguments[0] not in ("-h", "--help")):
+        arguments.insert(0, "generate")
+
+    args = create_parser().parse_args(arguments)
+
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    # The summary of every app built by the batch subcommand, written with its metrics
+    app_summaries: List[Dict[str, Any]] = []
+
+    # Metrics written to stdout have it to themselves, the output meant to be read is printed to stderr
+    output = contextlib.redirect_stdout(sys.stderr) if args.metrics == "-" else contextlib.nullcontext()
+
+    try:
+        with output:
+            run(args, app_summaries)
+    finally:
+        # Also report a failed or interrupted run, it tells where the time went until it stopped
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+        if args.metrics and args.command == "batch":
+            # Each app is built in a worker process, which records its own metrics
+            Metrics.write(args.metrics, {
+                'parent': Metrics.snapshot(),
+                'apps': {summary['name']: summary['metrics'] for summary in app_summaries},
+            })
+        elif args.metrics:
+            Metrics.write(args.metrics)
+
+
+def run(args: argparse.Namespace, app_summaries: Optional[List[Dict[str, Any]]] = None):
+    """Runs the subcommand parsed from the command line.
+
+    :param args:
+        The parsed command line.
+
+    :param app_summaries:
+        The list the summary of every app built by the batch subcommand is added to.
+    """
+    # Reading an exported workbook without saving to Drive works without credentials, e.g. offline
+    workbook = getattr(args, "workbook", None)
+    creds = None
+    if not (workbook and (args.command == "validate" or args.no_drive)):
+        with Metrics.stage('auth'):
+            creds = load_credentials()
+
+    if args.command == "batch":
+        from batch_build import BatchBuild
+
+        FileManager.load_folder_cache(os.path.join(snapshot_cache_dir, "drive_folders.json"))
+        batch_build = BatchBuild(
+            credentials=creds,
+            scopes=SCOPES,
+            max_workers=args.workers,
+            requests_per_minute=args.requests_per_minute,
+            cache_dir=snapshot_cache_dir
+        )
+        summaries = batch_build.run(BatchBuild.load_manifest(args.manifest))
+        if app_summaries is not None:
+            app_summaries.extend(summaries)
+        print(BatchBuild.format_summary(summaries))
+        return
+
+    data_source = None
+    if workbook:
+        from file_source import FileSource
+
+        data_source = FileSource(path=workbook, sha256=args.workbook_sha256)
+
+    if args.command == "validate":
+        # Every platform reads the spreadsheet the same way, nothing is generated
+        translation = IOSTranslation(
+            credentials=creds,
+            cache_dir=snapshot_cache_dir,
+            spreadsheet=args.spreadsheet,
+            data_source=data_source
+        )
+        key_index = translation.key_index
+        with Metrics.stage('validate'):
+            issues = TranslationValidator().validate(translation.sheets)
+
+        print(key_index.report(max_listed=args.max_listed))
+        print(TranslationValidator.format_report(issues, max_listed=args.max_listed))
+
+        has_errors = any(issue.severity == ValidationIssue.ERROR for issue in issues)
+        if has_errors or key_index.duplicates or key_index.orphans or (args.strict and issues):
+            raise SystemExit(1)
+        return
+
+    FileManager.load_folder_cache(os.path.join(snapshot_cache_dir, "drive_folders.json"))
+    translation = platforms[args.platform[0]](
+        credentials=creds,
+        cache_dir=snapshot_cache_dir,
+        spreadsheet=args.spreadsheet,
+        data_source=data_source
+    )
+    runner = TranslationRunner(
+        translation=translation,
+        platforms=[platforms[platform] for platform in args.platform],
+        validation=args.validation,
+        merge=args.merge,
+        remove_missing_keys=args.remove_missing_keys
+    )
+    output_dirs = {
+        IOSTranslation.platform: args.ios_output_dir,
+        AndroidTranslation.platform: args.android_output_dir,
+    }
+
+    if args.command == "watch":
+        from google_services import GoogleServices
+        from translation_watcher import TranslationWatcher
+
+        TranslationWatcher(
+            runner=runner,
+            drive_service=GoogleServices.drive_service(creds),
+            interval=args.interval,
+            output_dirs=output_dirs,
+            save_to_drive=not args.no_drive
+        ).run()
+    else:
+        key_index = translation.key_index
+        if key_index.duplicates or key_index.orphans:
+            print(f'Warning: {len(key_index.duplicates)} duplicate keys and {len(key_index.orphans)} translations '
+                  f'without a key, run the validate subcommand for details')
+
+        try:
+            upload_results = runner.generate(output_dirs=output_dirs, save_to_drive=not args.no_drive)
+        except TranslationValidationError as error:
+            sys.exit(f'Nothing was generated: {error}')
+
+        if runner.validation_issues:
+            print(TranslationValidator.format_report(runner.validation_issues))
+
+        for catalog_changes in runner.catalog_changes:
+            print(catalog_changes.report())
+
+        for upload_result in upload_results:
+            if upload_result.status == UploadResult.FAILED:
+                print(f'Not saved: {upload_result.file_name} ({upload_result.error})')
+            else:
+                print(f'File ID: {upload_result.file_id} ({upload_result.status})')
+
+        # Failed uploads fail the run, like they fail an app of a batch build
+        failed_count = sum(upload_result.status == UploadResult.FAILED for upload_result in upload_results)
+        if failed_count:
+            sys.exit(f'{failed_count} of {len(upload_results)} files were not saved')
 
 
-main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+
+from typing import TYPE_CHECKING, Dict
+
+if TYPE_CHECKING:
+    import gspread
+
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import Resource
+
+
+# noinspection PyCompatibility
+class GoogleServices:
+    """
+        A class for creating the Google API service objects shared by the generators.
+
+        The Google API client libraries are only imported the first time a service is needed,
+        so commands that never reach the APIs don't pay for importing them.
+    """
+
+    # Service objects of the Google API client aren't thread-safe, each thread keeps its own
+    _thread_state = threading.local()
+
+    @staticmethod
+    def drive_service(credentials: Credentials) -> Resource:
+        """Retrieve a Google Drive API service object for the given credentials.
+
+        The service is built once per thread and credentials, from the discovery document bundled
+        with the client library instead of fetching it, and without the discovery file cache.
+
+        :param credentials:
+            The authorized credentials used for the Google Drive API.
+
+        :return Resource:
+            An instance of the Google Drive API service object.
+        """
+        drive_services: Dict[Credentials, Resource] = GoogleServices._thread_services('drive_services')
+
+        if credentials not in drive_services:
+            from googleapiclient.discovery import build
+
+            drive_services[credentials] = build(
+                'drive',
+                'v3',
+                credentials=credentials,
+                static_discovery=True,
+                cache_discovery=False
+            )
+
+        return drive_services[credentials]
+
+    @staticmethod
+    def spreadsheet_client(credentials: Credentials) -> gspread.Client:
+        """Retrieve an authorized gspread client for the given credentials.
+
+        The client is created once per thread and credentials, so every generator and every spreadsheet
+        opened with the same credentials shares one HTTP session, keeping its connections alive and
+        refreshing the access token only once.
+
+        :param credentials:
+            The authorized credentials used for the Google Sheets API.
+
+        :return gspread.Client:
+            The authorized client.
+        """
+        spreadsheet_clients: Dict[Credentials, gspread.Client] = GoogleServices._thread_services('spreadsheet_clients')
+
+        if credentials not in spreadsheet_clients:
+            import gspread
+
+            spreadsheet_clients[credentials] = gspread.authorize(credentials)
+
+        return spreadsheet_clients[credentials]
+
+    @staticmethod
+    def _thread_services(name: str) -> dict:
+        services = getattr(GoogleServices._thread_state, name, None)
+        if services is None:
+            services = {}
+            setattr(GoogleServices._thread_state, name, services)
+        return services
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import re
+import threading
+import time
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from googleapiclient.http import MediaUpload
+
+
+# noinspection PyCompatibility
+class InMemoryDrive:
+    """
+        An in-memory stand-in for the Google Drive API service object, covering the `files()` requests
+        FileManager makes: looking up folders and files, creating folders, uploading and downloading files.
+        Like the API, requests naming a file or folder that doesn't exist, e.g. after `delete`, fail with a 404.
+
+        Files are kept in memory with their content, for fixtures, benchmarks and for running the
+        generators without access to the Google APIs. Pass `lambda: drive` as the generators'
+        `drive_service_factory`.
+    """
+
+    _FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+    _PARENT_PATTERN = re.compile(r"'((?:[^'\\]|\\.)*)' in parents")
+    _NAME_PATTERN = re.compile(r"name = '((?:[^'\\]|\\.)*)'")
+    _UNESCAPE_PATTERN = re.compile(r"\\(.)")
+
+    def __init__(self, latency: float = 0.0):
+        """Initializes a new InMemoryDrive object, with an empty drive.
+
+        Args:
+            latency (float): The time every request takes, in seconds, to simulate network round trips.
+        """
+        self._latency = latency
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._contents: Dict[str, bytes] = {}
+        self._file_ids = itertools.count(1)
+        self._request_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def request_count(self) -> int:
+        """Gets the number of requests executed so far.
+
+        :return int:
+            The number of requests.
+        """
+        return self._request_count
+
+    def files(self) -> InMemoryDrive:
+        return self
+
+    def content(self, file_id: str) -> bytes:
+        """Gets the content of an uploaded file.
+
+        :param file_id:
+            The ID of the file.
+
+        :return bytes:
+            The content of the file.
+        """
+        return self._contents[file_id]
+
+    def delete(self, fileId: str) -> _Request:
+        def delete_file() -> Dict[str, Any]:
+            self._require(fileId)
+            self._delete_file(fileId)
+            return {}
+
+        return _Request(self, delete_file)
+
+    def get(self, fileId: str, fields: Optional[str] = None) -> _Request:
+        def get_file() -> Dict[str, Any]:
+            if fileId == 'root':
+                return {'id': 'root-folder'}
+            self._require(fileId)
+            return {'id': fileId}
+
+        return _Request(self, get_file)
+
+    def get_media(self, fileId: str) -> _Request:
+        def get_content() -> bytes:
+            self._require(fileId)
+            return self._contents[fileId]
+
+        return _Request(self, get_content)
+
+    def list(self, q: str, fields: Optional[str] = None, pageToken: Optional[str] = None) -> _Request:
+        return _Request(self, lambda: {'files': self._query(q)})
+
+    def create(self, body: Dict[str, Any], media_body: Optional[MediaUpload] = None, fields: Optional[str] = None) -> _Request:
+        def create_file() -> Dict[str, Any]:
+            for parent in body.get('parents', []):
+                if parent != 'root':
+                    self._require(parent)
+            file_id = f'file-{next(self._file_ids)}'
+            self._files[file_id] = {
+                'id': file_id,
+                'name': body['name'],
+                'mimeType': body.get('mimeType', 'application/octet-stream'),
+                'parents': ['root-folder' if parent == 'root' else parent for parent in body.get('parents', [])],
+            }
+            if media_body is not None:
+                self._store_content(file_id, media_body)
+            return {'id': file_id}
+
+        return _Request(self, create_file)
+
+    def update(self, fileId: str, media_body: Optional[MediaUpload] = None, fields: Optional[str] = None) -> _Request:
+        def update_file() -> Dict[str, Any]:
+            self._require(fileId)
+            if media_body is not None:
+                self._store_content(fileId, media_body)
+            return {'id': fileId}
+
+        return _Request(self, update_file)
+
+    def _store_content(self, file_id: str, media_body: MediaUpload):
+        content = media_body.getbytes(0, media_body.size())
+        self._contents[file_id] = content
+        self._files[file_id]['md5Checksum'] = hashlib.md5(content).hexdigest()
+
+    def _query(self, query: str) -> List[Dict[str, Any]]:
+        # Only the query forms FileManager builds are supported
+        parent_match = self._PARENT_PATTERN.search(query)
+        parent_id = self._unescape(parent_match.group(1)) if parent_match else None
+        if parent_id == 'root':
+            parent_id = 'root-folder'
+        elif parent_id is not None and parent_id != 'root-folder':
+            self._require(parent_id)
+
+        names = {self._unescape(name) for name in self._NAME_PATTERN.findall(query)}
+        folders_only = f"mimeType = '{self._FOLDER_MIME_TYPE}'" in query
+        files_only = f"mimeType != '{self._FOLDER_MIME_TYPE}'" in query
+
+        matches: List[Dict[str, Any]] = []
+        for file in self._files.values():
+            is_folder = file['mimeType'] == self._FOLDER_MIME_TYPE
+            if (folders_only and not is_folder) or (files_only and is_folder):
+                continue
+            if names and file['name'] not in names:
+                continue
+            if parent_id is not None and parent_id not in file['parents']:
+                continue
+            matches.append(dict(file))
+
+        return matches
+
+    def _delete_file(self, file_id: str):
+        # Deleting a folder deletes everything in it
+        for child_id in [child_id for child_id, file in self._files.items() if file_id in file['parents']]:
+            self._delete_file(child_id)
+
+        del self._files[file_id]
+        self._contents.pop(file_id, None)
+
+    def _require(self, file_id: str):
+        from googleapiclient.errors import HttpError
+        from httplib2 import Response
+
+        if file_id not in self._files and file_id != 'root-folder':
+            raise HttpError(
+                Response({'status': 404, 'reason': 'Not Found'}),
+                json.dumps({'error': {'code': 404, 'message': f'File not found: {file_id}.'}}).encode()
+            )
+
+    def _unescape(self, value: str) -> str:
+        return self._UNESCAPE_PATTERN.sub(r'\1', value)
+
+
+# noinspection PyCompatibility
+class _Request:
+    """A request of the InMemoryDrive, executed under its lock like the API would serialize it."""
+
+    def __init__(self, drive: InMemoryDrive, run: Callable[[], Any]):
+        self._drive = drive
+        self._run = run
+
+    def execute(self) -> Any:
+        if self._drive._latency:
+            time.sleep(self._drive._latency)
+
+        with self._drive._lock:
+            self._drive._request_count += 1
+            return self._run()
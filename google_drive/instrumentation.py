@@ -0,0 +1,104 @@
+import json
+import sys
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+
+# noinspection PyCompatibility
+class Metrics:
+    """
+        A class for recording how long each stage of a build takes and what it transferred.
+
+        Stages are timed with `stage`, e.g. "fetch", "parse", "emit.ios" or "upload", and accumulate
+        their wall time and number of calls. Stages may be nested (the "fetch" of a worksheet happens
+        while its "parse" is pending), and stages running in several threads at once add up their
+        times, so stage times are not meant to sum up to the total.
+        Counters accumulate plain numbers, e.g. "api_requests", "api_retries", "bytes_uploaded" or "rows".
+
+        The metrics are recorded per process, `snapshot` returns them as a JSON-serializable dictionary.
+    """
+
+    _stages: Dict[str, Dict[str, float]] = {}
+    _counters: Dict[str, int] = {}
+    _start_time: float = time.perf_counter()
+    _lock = threading.Lock()
+
+    @staticmethod
+    @contextmanager
+    def stage(name: str) -> Iterator[None]:
+        """Times the enclosed block as one call of the given stage.
+
+        :param name:
+            The name of the stage.
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start_time
+            with Metrics._lock:
+                stage = Metrics._stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+                stage['seconds'] += seconds
+                stage['calls'] += 1
+
+    @staticmethod
+    def count(name: str, amount: int = 1):
+        """Adds an amount to the given counter.
+
+        :param name:
+            The name of the counter.
+
+        :param amount:
+            The amount to add, 1 by default.
+        """
+        with Metrics._lock:
+            Metrics._counters[name] = Metrics._counters.get(name, 0) + amount
+
+    @staticmethod
+    def reset():
+        """Discards every recorded stage and counter, and restarts the total time."""
+        with Metrics._lock:
+            Metrics._stages = {}
+            Metrics._counters = {}
+            Metrics._start_time = time.perf_counter()
+
+    @staticmethod
+    def snapshot() -> Dict[str, Any]:
+        """Retrieves the metrics recorded so far.
+
+        :return Dict[str, Any]:
+            The total time since the last reset, the time and calls of every stage, and every counter.
+        """
+        with Metrics._lock:
+            return {
+                'total_seconds': round(time.perf_counter() - Metrics._start_time, 6),
+                'stages': {
+                    name: {'seconds': round(stage['seconds'], 6), 'calls': int(stage['calls'])}
+                    for name, stage in sorted(Metrics._stages.items())
+                },
+                'counters': dict(sorted(Metrics._counters.items())),
+            }
+
+    @staticmethod
+    def write(file_path: str, metrics: Optional[Any] = None):
+        """Writes metrics as JSON.
+
+        :param file_path:
+            The path of the JSON file, "-" for the standard output.
+
+        :param metrics:
+            The metrics to write, the `snapshot` of the current process by default.
+        """
+        metrics = Metrics.snapshot() if metrics is None else metrics
+
+        if file_path == '-':
+            json.dump(metrics, sys.stdout, indent=2)
+            sys.stdout.write('\n')
+            return
+
+        with open(file_path, 'w') as metrics_file:
+            json.dump(metrics, metrics_file, indent=2)
+            metrics_file.write('\n')
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+from Models.key_location import KeyLocation
+
+
+# noinspection PyCompatibility
+class KeyIndex:
+    """
+        A class indexing every localized key of a spreadsheet, across all of its worksheets.
+
+        Every key maps to the worksheet and row it is defined in, along with a bitmap of the languages
+        that have a value for it, so that looking up a key or a translation takes constant time.
+        The keys of every worksheet are scanned while it is parsed, then merged into the index
+        in a single pass, which also collects:
+        - duplicates: keys defined in more than one row, only the last definition is generated
+          (its empty cells included, nothing is taken from the earlier rows),
+        - orphans: rows with translations but no key in the base language column,
+        - missing translations: keys without a value for some of the languages of the spreadsheet.
+
+        Section comments (keys starting with "//") are not indexed.
+    """
+
+    # Localized strings start at the 7th row of a worksheet (index 6)
+    _DATA_START_INDEX: int = 6
+    _FIRST_ROW_NUMBER: int = _DATA_START_INDEX + 1
+
+    def __init__(self, sheets: List[SheetKeys]):
+        """Initializes a new KeyIndex object.
+
+        Args:
+            sheets List[SheetKeys]: The keys of every worksheet as returned by `scan`, in spreadsheet order.
+        """
+        # Language codes in order of their bit in the bitmaps
+        self._languages: List[str] = []
+        self._language_bits: Dict[str, int] = {}
+        self._locations: Dict[str, KeyLocation] = {}
+        self._duplicates: Dict[str, List[KeyLocation]] = {}
+        self._orphans: List[KeyLocation] = []
+
+        for sheet in sheets:
+            self._add_sheet(sheet)
+
+    def __contains__(self, localized_key: str) -> bool:
+        return localized_key in self._locations
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    @property
+    def languages(self) -> List[str]:
+        """Gets the language codes of the spreadsheet, in the order of their first column.
+
+        :return List[str]:
+            The language codes.
+        """
+        return self._languages
+
+    @property
+    def duplicates(self) -> Dict[str, List[KeyLocation]]:
+        """Gets the keys defined in more than one row.
+
+        :return Dict[str, List[KeyLocation]]:
+            Every location of the duplicated keys, in spreadsheet order, the last one is generated.
+        """
+        return self._duplicates
+
+    @property
+    def orphans(self) -> List[KeyLocation]:
+        """Gets the rows that have translations but no key.
+
+        :return List[KeyLocation]:
+            The location of every orphan row, with the languages that have a value.
+        """
+        return self._orphans
+
+    def get(self, localized_key: str) -> Optional[KeyLocation]:
+        """Gets the location of a key, the last one for duplicated keys.
+
+        :param localized_key:
+            The key to look up.
+
+        :return Optional[KeyLocation]:
+            The location of the key, None if it isn't defined.
+        """
+        return self._locations.get(localized_key)
+
+    def has_translation(self, localized_key: str, language_code: str) -> bool:
+        """Checks whether a key has a value for a language.
+
+        :param localized_key:
+            The key to look up.
+
+        :param language_code:
+            The code of the language, e.g. "fr".
+
+        :return bool:
+            True if the key is defined and has a value for the language.
+        """
+        location = self._locations.get(localized_key)
+        bit = self._language_bits.get(language_code)
+
+        return location is not None and bit is not None and bool(location.languages >> bit & 1)
+
+    def language_codes(self, languages: int) -> List[str]:
+        """Converts a bitmap of languages into their codes.
+
+        :param languages:
+            The bitmap, e.g. `KeyLocation.languages`.
+
+        :return List[str]:
+            The language codes of the set bits.
+        """
+        return [language_code for bit, language_code in enumerate(self._languages) if languages >> bit & 1]
+
+    def missing_translations(self) -> Dict[str, List[str]]:
+        """Collects the keys without a value, for every language of the spreadsheet.
+
+        :return Dict[str, List[str]]:
+            The keys missing a translation keyed by language code, in spreadsheet order.
+            Languages without any missing translation are left out.
+        """
+        all_languages = (1 << len(self._languages)) - 1
+        missing: Dict[str, List[str]] = {}
+
+        for localized_key, location in self._locations.items():
+            missing_languages = all_languages & ~location.languages
+            if not missing_languages:
+                continue
+
+            for language_code in self.language_codes(missing_languages):
+                missing.setdefault(language_code, []).append(localized_key)
+
+        return missing
+
+    def report(self, max_listed: int = 10) -> str:
+        """Formats the duplicates, orphans and missing translations found by the index.
+
+        :param max_listed:
+            The maximum number of keys or rows listed per issue, the others are only counted.
+
+        :return str:
+            The report, one issue per line.
+        """
+        lines = [f'{len(self._locations)} keys in {len(self._languages)} languages']
+
+        if self._duplicates:
+            lines.append(f'Duplicate keys: {len(self._duplicates)}')
+            for localized_key, locations in list(self._duplicates.items())[:max_listed]:
+                lines.append(f'  "{localized_key}" in {", ".join(map(repr, locations))}, {locations[-1]!r} is generated')
+
+        if self._orphans:
+            lines.append(f'Translations without a key: {len(self._orphans)}')
+            for location in self._orphans[:max_listed]:
+                lines.append(f'  {location!r}: {", ".join(self.language_codes(location.languages))}')
+
+        missing = self.missing_translations()
+        if missing:
+            lines.append('Missing translations:')
+            for language_code, localized_keys in missing.items():
+                listed = ", ".join(localized_keys[:max_listed])
+                more = f' and {len(localized_keys) - max_listed} more' if len(localized_keys) > max_listed else ''
+                lines.append(f'  {language_code}: {len(localized_keys)} keys ({listed}{more})')
+
+        return "\n".join(lines)
+
+    @classmethod
+    def scan(cls, sheet_name: str, columns: List[List[str]]) -> SheetKeys:
+        """
+            Collects the keys of a worksheet and the languages with a value in each of their rows,
+            straight from its raw columns while it is parsed, see `GenerateTranslation._parse_worksheet`.
+
+        :param sheet_name:
+            The title of the worksheet.
+
+        :param columns:
+            The columns of the worksheet, the comment column first, then the base language column.
+
+        :return SheetKeys:
+            The keys of the worksheet, to build a KeyIndex with.
+        """
+        language_codes = [column[0] if column else "" for column in columns[1:]]
+        value_columns = [column[cls._DATA_START_INDEX:] for column in columns[1:]]
+        keys = value_columns[0] if value_columns else []
+        row_languages = [0] * len(keys)
+
+        # Set the bit of every language with a value in each row, the base language column holds the keys.
+        # Values starting with "//" are comments, they're not generated
+        for bit, values in enumerate(value_columns):
+            mask = 1 << bit
+            row_languages = [
+                languages | mask if value and value[:2] != "//" else languages
+                for languages, value in zip(row_languages, values)
+            ]
+
+        return SheetKeys(sheet_name=sheet_name, language_codes=language_codes, keys=keys, row_languages=row_languages)
+
+    def _add_sheet(self, sheet_keys: SheetKeys):
+        # Map the bits of the worksheet's languages to the bits of the index
+        bits: List[int] = []
+        for language_code in sheet_keys.language_codes:
+            bit = self._language_bits.get(language_code)
+            if bit is None:
+                bit = self._language_bits[language_code] = len(self._languages)
+                self._languages.append(language_code)
+            bits.append(bit)
+
+        remapped: Dict[int, int] = {}
+        same_bits = bits == list(range(len(bits)))
+
+        for row_index, (localized_key, languages) in enumerate(zip(sheet_keys.keys, sheet_keys.row_languages)):
+            if localized_key.startswith("//"):
+                continue
+
+            if not same_bits:
+                if languages not in remapped:
+                    remapped[languages] = sum(1 << bit for index, bit in enumerate(bits) if languages >> index & 1)
+                languages = remapped[languages]
+
+            location = KeyLocation(sheet_name=sheet_keys.sheet_name, row=row_index + self._FIRST_ROW_NUMBER, languages=languages)
+
+            if not localized_key:
+                if languages:
+                    self._orphans.append(location)
+                continue
+
+            previous_location = self._locations.get(localized_key)
+            if previous_location is not None:
+                self._duplicates.setdefault(localized_key, [previous_location]).append(location)
+
+            self._locations[localized_key] = location
+
+
+# noinspection PyCompatibility
+class SheetKeys:
+    """
+        This class represents the keys of a single worksheet, collected by `KeyIndex.scan`, along with
+        a bitmap per row of the languages that have a value, bit N set for the Nth language column.
+    """
+
+    __slots__ = ('_sheet_name', '_language_codes', '_keys', '_row_languages')
+
+    def __init__(self, sheet_name: str, language_codes: List[str], keys: List[str], row_languages: List[int]):
+        self._sheet_name = sheet_name
+        self._language_codes = language_codes
+        self._keys = keys
+        self._row_languages = row_languages
+
+    @property
+    def sheet_name(self) -> str:
+        return self._sheet_name
+
+    @property
+    def language_codes(self) -> List[str]:
+        return self._language_codes
+
+    @property
+    def keys(self) -> List[str]:
+        return self._keys
+
+    @property
+    def row_languages(self) -> List[int]:
+        return self._row_languages
@@ -0,0 +1,89 @@
+import gzip
+import json
+import os
+import tempfile
+
+from typing import Dict, List, Optional
+
+
+# noinspection PyCompatibility
+class SnapshotCache:
+    """
+        A class for keeping a local copy of the raw cell values of a spreadsheet.
+
+        Every snapshot is stored as a gzipped JSON file per spreadsheet, together with the
+        revision (Drive `modifiedTime` / `version`) it was downloaded at. A snapshot is only
+        returned while the revision it was stored with still matches the spreadsheet.
+    """
+
+    def __init__(self, cache_dir: str):
+        """Initializes a new SnapshotCache object.
+
+        Args:
+            cache_dir (str): The directory where the snapshots are stored, created on the first write.
+        """
+        self._cache_dir = cache_dir
+
+    @property
+    def cache_dir(self) -> str:
+        return self._cache_dir
+
+    def load(self, spreadsheet_id: str, revision: Dict[str, str]) -> Optional[Dict[str, List[List[str]]]]:
+        """Retrieves the snapshot of a spreadsheet if it was stored at the given revision.
+
+        :param spreadsheet_id:
+            The ID of the spreadsheet.
+
+        :param revision:
+            The current revision metadata of the spreadsheet.
+
+        :return Dict[str, List[List[str]]] or None:
+            The raw cell values keyed by worksheet title, or None if there's no up-to-date snapshot.
+        """
+        try:
+            with gzip.open(self._snapshot_path(spreadsheet_id), 'rt', encoding='utf-8') as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except (OSError, ValueError):
+            # Missing or unreadable snapshots are treated the same as outdated ones
+            return None
+
+        if not revision or snapshot.get('revision') != revision:
+            return None
+
+        return snapshot.get('worksheets')
+
+    def store(self, spreadsheet_id: str, revision: Dict[str, str], worksheets: Dict[str, List[List[str]]]):
+        """Stores the snapshot of a spreadsheet, replacing the previous one.
+
+        :param spreadsheet_id:
+            The ID of the spreadsheet.
+
+        :param revision:
+            The revision metadata of the spreadsheet at the time the values were downloaded.
+
+        :param worksheets:
+            The raw cell values keyed by worksheet title.
+        """
+        if not revision:
+            return
+
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+        # Write to a temporary file first so an interrupted run never leaves a truncated snapshot
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self._cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as temporary_file:
+                with gzip.open(temporary_file, 'wt', encoding='utf-8') as snapshot_file:
+                    json.dump(
+                        {'revision': revision, 'worksheets': worksheets},
+                        snapshot_file,
+                        ensure_ascii=False,
+                        separators=(',', ':')
+                    )
+            os.replace(temporary_path, self._snapshot_path(spreadsheet_id))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+    def _snapshot_path(self, spreadsheet_id: str) -> str:
+        return os.path.join(self._cache_dir, f'{spreadsheet_id}.json.gz')
@@ -0,0 +1,20 @@
+from typing import List, Sequence
+
+# The English and localized names of the languages written in the header rows
+_LANGUAGE_NAMES = {
+    "en": ("English", "English"),
+    "fr": ("French", "Français"),
+    "de": ("German", "Deutsch"),
+}
+
+
+def worksheet(rows: List[List[str]], language_codes: Sequence[str] = ("en", "fr")) -> List[List[str]]:
+    """Builds the raw rows of a worksheet: the 6 header rows of the given languages, then the (comment, key,
+    translations...) rows. Languages without a known name are named after their code."""
+    names = [_LANGUAGE_NAMES.get(language_code, (language_code, language_code)) for language_code in language_codes]
+    header_rows = [
+        ["Comments", *language_codes],
+        ["", *(language for language, _ in names)],
+        ["", *(language_name for _, language_name in names)],
+    ] + [[""] * (len(language_codes) + 1) for _ in range(3)]
+    return header_rows + rows
@@ -0,0 +1,49 @@
+import json
+import os
+import tempfile
+import unittest
+
+from batch_build import BatchBuild, _build_app
+from tests.test_file_source import _write_csv
+
+
+# noinspection PyCompatibility
+class ManifestTest(unittest.TestCase):
+
+    def setUp(self):
+        manifest_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(manifest_dir.cleanup)
+        self.manifest_dir = manifest_dir.name
+
+    def _load(self, *apps):
+        manifest_file = os.path.join(self.manifest_dir, "manifest.json")
+        with open(manifest_file, "w") as manifest:
+            json.dump({"apps": list(apps)}, manifest)
+        return BatchBuild.load_manifest(manifest_file)
+
+    def test_app_needs_either_a_spreadsheet_or_a_workbook(self):
+        for app in ({"name": "App"}, {"name": "App", "spreadsheet": "Translations", "workbook": "Translations.xlsx"}):
+            with self.subTest(app=app), self.assertRaises(ValueError):
+                self._load(app)
+
+    def test_app_with_only_a_workbook_is_built(self):
+        workbook = os.path.join(self.manifest_dir, "Tab.csv")
+        _write_csv(workbook)
+        output_dir = os.path.join(self.manifest_dir, "ios")
+
+        app, = self._load({
+            "name": "App",
+            "workbook": workbook,
+            "output_dirs": {"ios": output_dir},
+            "save_to_drive": False,
+        })
+        credentials_info = json.dumps({"refresh_token": "token", "client_id": "client", "client_secret": "secret"})
+
+        summary = _build_app(app, credentials_info, scopes=[], cache_dir=None)
+
+        self.assertEqual((summary["status"], summary["files"]), ("ok", 1))
+        self.assertTrue(os.path.exists(os.path.join(output_dir, "Localizable.xcstrings")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from unittest import mock
+from gspread import Spreadsheet
+from gspread.http_client import HTTPClient
+from gspread.urls import DRIVE_FILES_API_V3_URL
+from api_budget import ApiBudget
+from data_source import GoogleSheetsSource
+
+
+# noinspection PyCompatibility
+class GoogleSheetsRevisionTest(unittest.TestCase):
+
+    @staticmethod
+    def _source(client: HTTPClient) -> GoogleSheetsSource:
+        # Skip opening the spreadsheet, which needs credentials
+        spreadsheet = mock.create_autospec(Spreadsheet, instance=True)
+        spreadsheet.id = "spreadsheet-id"
+        spreadsheet.client = client
+
+        source = GoogleSheetsSource.__new__(GoogleSheetsSource)
+        source._spreadsheet = spreadsheet
+        return source
+
+    @mock.patch.object(ApiBudget, 'spend')
+    def test_revision_is_requested_through_the_spreadsheet_client(self, spend: mock.Mock):
+        client = mock.create_autospec(HTTPClient, instance=True)
+        client.request.return_value.json.return_value = {"modifiedTime": "2026-10-18T10:00:00Z", "version": 42}
+
+        revision = self._source(client).revision()
+
+        self.assertEqual(revision, {"modifiedTime": "2026-10-18T10:00:00Z", "version": "42"})
+        client.request.assert_called_once_with(
+            "get",
+            f"{DRIVE_FILES_API_V3_URL}/spreadsheet-id",
+            params={"fields": "modifiedTime,version,headRevisionId", "supportsAllDrives": True}
+        )
+        spend.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()
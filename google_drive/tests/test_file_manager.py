@@ -0,0 +1,292 @@
+import json
+import os
+import socket
+import tempfile
+import unittest
+
+from io import BytesIO
+from googleapiclient.errors import HttpError
+from httplib2 import Response
+from typing import Any, Dict, List
+from unittest import mock
+from file_manager import FileManager
+from in_memory_drive import InMemoryDrive
+from instrumentation import Metrics
+from Models.upload_request import UploadRequest
+from Models.upload_result import UploadResult
+
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+
+def _http_error(status: int, reason: str = '') -> HttpError:
+    errors = [{'domain': 'usageLimits', 'reason': reason}] if reason else []
+    content = {'error': {'code': status, 'message': reason or 'error', 'errors': errors}}
+    return HttpError(Response({'status': status}), json.dumps(content).encode())
+
+
+# noinspection PyCompatibility
+class _FlakyRequest:
+    """A request failing with the given errors before it succeeds."""
+
+    def __init__(self, errors: List[BaseException]):
+        self._errors = list(errors)
+        self.attempts = 0
+
+    def execute(self) -> Dict[str, Any]:
+        self.attempts += 1
+        if self._errors:
+            raise self._errors.pop(0)
+        return {'id': 'file-id'}
+
+
+# noinspection PyCompatibility
+class _FailingDrive(InMemoryDrive):
+    """An InMemoryDrive whose uploads of one file always fail with the given error."""
+
+    def __init__(self, file_name: str, error: BaseException):
+        super().__init__()
+        self._failing_file_name = file_name
+        self._error = error
+
+    def create(self, body: Dict[str, Any], media_body=None, fields=None):
+        if body['name'] == self._failing_file_name:
+            return _FlakyRequest([self._error] * (FileManager._MAX_RETRIES + 1))
+        return super().create(body=body, media_body=media_body, fields=fields)
+
+
+# noinspection PyCompatibility
+class FileManagerTestCase(unittest.TestCase):
+    """Resets the process-wide folder cache of FileManager around every test."""
+
+    def setUp(self):
+        self._reset_folder_cache()
+        self.addCleanup(self._reset_folder_cache)
+        Metrics.reset()
+        self.drive = InMemoryDrive()
+
+    @staticmethod
+    def _reset_folder_cache():
+        FileManager._folder_ids.clear()
+        FileManager._folder_path_locks.clear()
+        FileManager._root_folder_id = None
+        FileManager._folder_cache_file = None
+
+    def _save(self, content: str, folder_structure=('Translations', 'iOS')) -> UploadResult:
+        return FileManager.save_to_google_drive(
+            drive_service=self.drive,
+            file=content,
+            file_name='Localizable.json',
+            mime_type='application/json',
+            folder_structure=list(folder_structure)
+        )
+
+
+# noinspection PyCompatibility
+class FolderCacheTest(FileManagerTestCase):
+
+    def test_deleted_cached_folder_is_resolved_again(self):
+        self._save('{"version": 1}')
+        stale_folder_id = FileManager._folder_ids[('Translations', 'iOS')]
+        self.drive.files().delete(fileId=stale_folder_id).execute()
+
+        upload_result = self._save('{"version": 2}')
+
+        self.assertEqual(upload_result.status, UploadResult.CREATED)
+        self.assertNotEqual(FileManager._folder_ids[('Translations', 'iOS')], stale_folder_id)
+        self.assertEqual(self.drive.content(upload_result.file_id), b'{"version": 2}')
+        self.assertEqual(Metrics.snapshot()['counters']['folder_cache_evictions'], 1)
+
+    def test_deleted_parent_of_cached_folder_is_resolved_again(self):
+        self._save('{"version": 1}')
+        self.drive.files().delete(fileId=FileManager._folder_ids[('Translations',)]).execute()
+
+        upload_result = self._save('{"version": 2}')
+
+        self.assertEqual(upload_result.status, UploadResult.CREATED)
+        self.assertEqual(self.drive.content(upload_result.file_id), b'{"version": 2}')
+
+    def test_stale_persisted_cache_is_rewritten(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_file = os.path.join(cache_dir, 'drive_folders.json')
+            FileManager.load_folder_cache(cache_file)
+            self._save('{"version": 1}')
+            self.drive.files().delete(fileId=FileManager._folder_ids[('Translations', 'iOS')]).execute()
+
+            # A later run only knows the folder IDs from the cache file
+            self._reset_folder_cache()
+            FileManager.load_folder_cache(cache_file)
+            self._save('{"version": 2}')
+
+            with open(cache_file) as folder_cache:
+                cached_ids = {tuple(path): folder_id for path, folder_id in json.load(folder_cache)}
+            self.assertEqual(cached_ids, FileManager._folder_ids)
+
+    def test_folder_ids_saved_by_other_processes_are_kept(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_file = os.path.join(cache_dir, 'drive_folders.json')
+            FileManager.load_folder_cache(cache_file)
+            FileManager._cache_folder_ids({('Translations', 'iOS'): 'ios-folder-id'})
+
+            # Another batch worker loaded the file before the first one saved to it
+            FileManager._folder_ids.clear()
+            FileManager._cache_folder_ids({('Translations', 'Android'): 'android-folder-id'})
+            FileManager.invalidate_folder_cache(['Translations', 'Web'])
+
+            with open(cache_file) as folder_cache:
+                cached_ids = {tuple(path): folder_id for path, folder_id in json.load(folder_cache)}
+            self.assertEqual(cached_ids, {
+                ('Translations', 'iOS'): 'ios-folder-id',
+                ('Translations', 'Android'): 'android-folder-id',
+            })
+
+            # Discarded paths aren't merged back from the file
+            FileManager.invalidate_folder_cache(['Translations', 'iOS'])
+            with open(cache_file) as folder_cache:
+                cached_ids = {tuple(path): folder_id for path, folder_id in json.load(folder_cache)}
+            self.assertEqual(cached_ids, {('Translations', 'Android'): 'android-folder-id'})
+
+
+    def test_sibling_folders_share_their_missing_parents(self):
+        drive = InMemoryDrive(latency=0.01)
+        languages = ['values', 'values-fr', 'values-de', 'values-es', 'values-it', 'values-ja']
+
+        upload_results = FileManager.save_many(
+            drive_service_factory=lambda: drive,
+            uploads=[
+                UploadRequest(
+                    file='<resources/>',
+                    file_name='strings.xml',
+                    mime_type='text/xml',
+                    folder_structure=['Translations', 'Android', language]
+                )
+                for language in languages
+            ],
+            max_workers=len(languages)
+        )
+
+        self.assertEqual([upload_result.status for upload_result in upload_results], [UploadResult.CREATED] * 6)
+        for folder_name in ['Translations', 'Android'] + languages:
+            with self.subTest(folder_name=folder_name):
+                folders = drive.files().list(q=f"name = '{folder_name}' and mimeType = '{FOLDER_MIME_TYPE}'").execute()
+                self.assertEqual(len(folders['files']), 1)
+
+
+
+# noinspection PyCompatibility
+@mock.patch('file_manager.time.sleep')
+class ExecuteRetryTest(FileManagerTestCase):
+
+    def test_server_and_transport_errors_are_retried_with_backoff(self, sleep: mock.Mock):
+        request = _FlakyRequest([_http_error(503), socket.timeout(), ConnectionResetError(), TimeoutError()])
+
+        with mock.patch('file_manager.random.uniform', side_effect=lambda low, high: high):
+            self.assertEqual(FileManager.execute(request), {'id': 'file-id'})
+
+        self.assertEqual(request.attempts, 5)
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [1.0, 2.0, 4.0, 8.0])
+        self.assertEqual(Metrics.snapshot()['counters']['api_retries'], 4)
+
+    def test_retries_stop_after_the_maximum(self, sleep: mock.Mock):
+        request = _FlakyRequest([ConnectionError()] * (FileManager._MAX_RETRIES + 1))
+
+        with self.assertRaises(ConnectionError):
+            FileManager.execute(request)
+
+        self.assertEqual(request.attempts, FileManager._MAX_RETRIES + 1)
+
+    def test_only_rate_limited_403_is_retried(self, sleep: mock.Mock):
+        for reason in FileManager._RATE_LIMIT_REASONS:
+            request = _FlakyRequest([_http_error(403, reason)])
+            self.assertEqual(FileManager.execute(request), {'id': 'file-id'})
+            self.assertEqual(request.attempts, 2)
+
+        for reason in ('insufficientFilePermissions', ''):
+            request = _FlakyRequest([_http_error(403, reason)])
+            with self.assertRaises(HttpError):
+                FileManager.execute(request)
+            self.assertEqual(request.attempts, 1)
+
+    def test_client_errors_are_not_retried(self, sleep: mock.Mock):
+        request = _FlakyRequest([_http_error(404)])
+
+        with self.assertRaises(HttpError):
+            FileManager.execute(request)
+
+        self.assertEqual(request.attempts, 1)
+        sleep.assert_not_called()
+
+
+# noinspection PyCompatibility
+@mock.patch('file_manager.time.sleep')
+class SaveManyTest(FileManagerTestCase):
+
+    def _save_many(self, drive: InMemoryDrive) -> List[UploadResult]:
+        return FileManager.save_many(
+            drive_service_factory=lambda: drive,
+            uploads=[
+                UploadRequest(file=f'<resources>{index}</resources>', file_name=f'strings-{index}.xml',
+                              mime_type='text/xml', folder_structure=['Translations', 'Android'])
+                for index in range(4)
+            ],
+            max_workers=2
+        )
+
+    def test_failed_uploads_do_not_stop_the_others(self, sleep: mock.Mock):
+        for error in (_http_error(400), ConnectionError('connection reset'), socket.timeout('timed out'),
+                      OSError('network unreachable')):
+            with self.subTest(error=error):
+                self._reset_folder_cache()
+                upload_results = self._save_many(_FailingDrive(file_name='strings-2.xml', error=error))
+
+                self.assertEqual([upload_result.file_name for upload_result in upload_results],
+                                 [f'strings-{index}.xml' for index in range(4)])
+                self.assertEqual([upload_result.status for upload_result in upload_results],
+                                 [UploadResult.CREATED, UploadResult.CREATED, UploadResult.FAILED, UploadResult.CREATED])
+                self.assertIsNone(upload_results[2].file_id)
+                self.assertIs(upload_results[2].error, error)
+
+    def test_unchanged_files_are_not_uploaded_again(self, sleep: mock.Mock):
+        drive = InMemoryDrive()
+        self._save_many(drive)
+        request_count = drive.request_count
+
+        upload_results = self._save_many(drive)
+
+        self.assertTrue(all(upload_result.status == UploadResult.UNCHANGED for upload_result in upload_results))
+        self.assertEqual(drive.request_count - request_count, 4)
+
+
+# noinspection PyCompatibility
+class LocalFileTest(unittest.TestCase):
+
+    def setUp(self):
+        output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(output_dir.cleanup)
+        self.file_path = os.path.join(output_dir.name, 'values-fr', 'strings.xml')
+
+        upload_result = FileManager._write_local_file(file='<resources>un</resources>', file_path=self.file_path)
+        self.assertEqual(upload_result.status, UploadResult.CREATED)
+        # Date the file back, a rewrite would show up in its modification time
+        os.utime(self.file_path, (1_000_000, 1_000_000))
+        os.chmod(self.file_path, 0o600)
+
+    def test_unchanged_content_is_not_written_again(self):
+        upload_result = FileManager._write_local_file(file=BytesIO(b'<resources>un</resources>'), file_path=self.file_path)
+
+        self.assertEqual((upload_result.status, upload_result.size), (UploadResult.UNCHANGED, 0))
+        self.assertEqual(os.stat(self.file_path).st_mtime, 1_000_000)
+
+    def test_changed_content_of_the_same_size_is_written(self):
+        upload_result = FileManager._write_local_file(file='<resources>uN</resources>', file_path=self.file_path)
+
+        self.assertEqual((upload_result.status, upload_result.size), (UploadResult.UPDATED, 25))
+        self.assertNotEqual(os.stat(self.file_path).st_mtime, 1_000_000)
+        self.assertEqual(os.stat(self.file_path).st_mode & 0o777, 0o600)
+        with open(self.file_path) as strings_file:
+            self.assertEqual(strings_file.read(), '<resources>uN</resources>')
+        # The temporary file it was written to was renamed into place
+        self.assertEqual(os.listdir(os.path.dirname(self.file_path)), ['strings.xml'])
+
+if __name__ == '__main__':
+    unittest.main()
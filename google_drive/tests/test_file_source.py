@@ -0,0 +1,143 @@
+import csv
+import os
+import tempfile
+import unittest
+import zipfile
+
+from itertools import groupby
+from typing import Any, List, Tuple
+from xml.sax.saxutils import escape
+from file_source import FileSource
+from generate_translations_ios import IOSTranslation
+from Models.sheet import Sheet
+
+# The same worksheet in every format, with empty rows inside the header and between the strings
+ROWS = [
+    ["Comments", "en", "fr"],
+    ["", "English", "French"],
+    ["", "English", "Français"],
+    ["", "", ""],
+    ["", "", ""],
+    ["", "", ""],
+    ["Greeting", "hello", "bonjour"],
+    ["", "", ""],
+    ["", "", ""],
+    ["", "// Section", ""],
+    ["", "bye", "au revoir"],
+    ["Last row", "thanks", "merci & bienvenue"],
+]
+
+
+def _write_csv(path: str):
+    with open(path, "w", newline="", encoding="utf-8") as csv_file:
+        csv.writer(csv_file).writerows(ROWS)
+
+
+def _write_xlsx(path: str):
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.title = "Tab"
+    for row in ROWS:
+        worksheet.append([cell or None for cell in row])
+    workbook.save(path)
+
+
+def _write_ods(path: str):
+    """Writes the rows like LibreOffice and Google Sheets do: identical rows and empty cells are repeated
+    with number-rows-repeated and number-columns-repeated, up to the last row and column of the sheet."""
+    table_rows = []
+    for row, repeated_rows in groupby(ROWS):
+        cells = "".join(
+            f"<table:table-cell office:value-type=\"string\"><text:p>{escape(cell)}</text:p></table:table-cell>"
+            if cell else "<table:table-cell/>"
+            for cell in row
+        )
+        table_rows.append(
+            f'<table:table-row table:number-rows-repeated="{len(list(repeated_rows))}">'
+            f'{cells}<table:table-cell table:number-columns-repeated="1021"/></table:table-row>'
+        )
+    table_rows.append(
+        '<table:table-row table:number-rows-repeated="1048564">'
+        '<table:table-cell table:number-columns-repeated="1024"/></table:table-row>'
+    )
+
+    content = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+        'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" '
+        'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0">'
+        '<office:body><office:spreadsheet><table:table table:name="Tab">'
+        f'{"".join(table_rows)}'
+        '</table:table></office:spreadsheet></office:body></office:document-content>'
+    )
+
+    with zipfile.ZipFile(path, "w") as ods_file:
+        ods_file.writestr("mimetype", "application/vnd.oasis.opendocument.spreadsheet")
+        ods_file.writestr("content.xml", content)
+
+
+def _describe(sheets: List[Sheet]) -> List[Tuple[str, List[Any]]]:
+    return [
+        (sheet.name, [
+            (
+                column.language_code,
+                column.language_name,
+                [(string.localized_key, string.localized_value, string.comment) for string in column.strings]
+            )
+            for column in sheet.columns
+        ])
+        for sheet in sheets
+    ]
+
+
+# noinspection PyCompatibility
+class FileSourceFormatTest(unittest.TestCase):
+
+    def setUp(self):
+        export_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(export_dir.cleanup)
+        self.export_dir = export_dir.name
+
+    def _sheets(self, file_name: str, write) -> List[Tuple[str, List[Any]]]:
+        path = os.path.join(self.export_dir, file_name)
+        write(path)
+        return _describe(IOSTranslation(data_source=FileSource(path)).sheets)
+
+    def test_every_format_gives_the_same_sheets(self):
+        expected = self._sheets("Tab.csv", _write_csv)
+
+        self.assertEqual(expected, [("Tab", [
+            ("en", "English", [
+                ("hello", "hello", "Greeting"),
+                ("", "", ""),
+                ("", "", ""),
+                ("// Section", "// Section", ""),
+                ("bye", "bye", ""),
+                ("thanks", "thanks", "Last row"),
+            ]),
+            ("fr", "Français", [
+                ("hello", "bonjour", "Greeting"),
+                ("", "", ""),
+                ("", "", ""),
+                ("// Section", "", ""),
+                ("bye", "au revoir", ""),
+                ("thanks", "merci & bienvenue", "Last row"),
+            ]),
+        ])])
+
+        for file_name, write in (("Tab.ods", _write_ods), ("Tab.xlsx", _write_xlsx)):
+            with self.subTest(file_name=file_name):
+                self.assertEqual(self._sheets(file_name, write), expected)
+
+    def test_repeated_empty_rows_keep_the_row_indexes(self):
+        path = os.path.join(self.export_dir, "Tab.ods")
+        _write_ods(path)
+
+        # Only the rows repeated after the last non-empty one are dropped
+        self.assertEqual(FileSource(path).fetch_values(["Tab"]), [ROWS])
+
+
+if __name__ == "__main__":
+    unittest.main()
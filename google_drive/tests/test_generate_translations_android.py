@@ -0,0 +1,176 @@
+import os
+import tempfile
+import unittest
+
+from data_source import InMemorySource
+from file_manager import FileManager
+from generate_translations_android import AndroidTranslation
+from generate_translations_ios import IOSTranslation
+from in_memory_drive import InMemoryDrive
+from Models.upload_result import UploadResult
+from tests.fixtures import worksheet
+from typing import Dict, List
+from xcstrings_writer import XCStringsWriter
+
+
+# noinspection PyCompatibility
+class AndroidTranslationTestCase(unittest.TestCase):
+
+    def _generate(self, worksheets: Dict[str, List[List[str]]]) -> Dict[str, str]:
+        """Generates the strings.xml files of a workbook, keyed by resource directory."""
+        with tempfile.TemporaryDirectory() as output_dir:
+            AndroidTranslation(data_source=InMemorySource(worksheets)).generate(
+                output_dir=output_dir,
+                save_to_drive=False
+            )
+
+            files = {}
+            for directory in os.listdir(output_dir):
+                with open(os.path.join(output_dir, directory, "strings.xml"), encoding="utf-8") as file:
+                    files[directory] = file.read()
+            return files
+
+    def _strings(self, worksheets: Dict[str, List[List[str]]], directory: str = "values-fr") -> List[str]:
+        """Generates a workbook and returns the <string> lines of one resource directory."""
+        return [
+            line.strip()
+            for line in self._generate(worksheets)[directory].splitlines()
+            if line.strip().startswith("<string ")
+        ]
+
+
+class EscapingTest(AndroidTranslationTestCase):
+
+    def test_xml_characters_are_escaped(self):
+        self.assertEqual(
+            self._strings({"Tab": worksheet([["", "terms", "Conditions <b>générales</b> & prix"]])}),
+            ['<string name="terms">Conditions &lt;b&gt;générales&lt;/b&gt; &amp; prix</string>']
+        )
+
+    def test_quotes_backslashes_and_new_lines_are_escaped(self):
+        self.assertEqual(
+            self._strings({"Tab": worksheet([["", "quote", "L'\"ami\" \\ du\nvoisin"]])}),
+            ['<string name="quote">L\\\'\\"ami\\" \\\\ du\\nvoisin</string>']
+        )
+
+    def test_leading_resource_reference_characters_are_escaped(self):
+        self.assertEqual(
+            self._strings({"Tab": worksheet([["", "at", "@maison"], ["", "question", "?oui"]])}),
+            ['<string name="at">\\@maison</string>', '<string name="question">\\?oui</string>']
+        )
+
+    def test_object_specifiers_are_written_as_string_specifiers(self):
+        self.assertEqual(
+            self._strings({"Tab": worksheet([["", "greeting", "Bonjour %@, %1$@ a %2$d ans"]])}),
+            ['<string name="greeting">Bonjour %s, %1$s a %2$d ans</string>']
+        )
+
+    def test_comments_are_escaped(self):
+        strings_xml = self._generate({"Tab": worksheet([
+            ["Shown on <b>login</b> -- see design", "login", "Connexion"],
+            ["", "// Section -- one", ""],
+        ])})["values"]
+
+        self.assertIn("<!-- Shown on &lt;b&gt;login&lt;/b&gt; - - see design -->", strings_xml)
+        self.assertIn("<!-- Section - - one -->", strings_xml)
+
+
+class ResourceQualifierTest(AndroidTranslationTestCase):
+
+    def test_language_codes_are_mapped_to_resource_directories(self):
+        header_rows = [
+            ["Comments", "en", "fr", "pt-BR", "zh-Hans", "zh_Hant_TW"],
+            ["", "English", "French", "Portuguese", "Chinese", "Chinese"],
+            ["", "English", "Français", "Português", "简体中文", "繁體中文"],
+        ] + [["", "", "", "", "", ""] for _ in range(3)]
+
+        files = self._generate({"Tab": header_rows + [["", "yes", "oui", "sim", "是", "是"]]})
+
+        self.assertEqual(
+            sorted(files),
+            ["values", "values-b+zh+Hans", "values-b+zh+Hant+TW", "values-fr", "values-pt-rBR"]
+        )
+        self.assertIn('<string name="yes">yes</string>', files["values"])
+        self.assertIn('<string name="yes">sim</string>', files["values-pt-rBR"])
+
+
+class DuplicateKeyTest(AndroidTranslationTestCase):
+
+    def test_last_definition_wins(self):
+        worksheets = {
+            "First": worksheet([["", "hello", "bonjour"], ["", "bye", "au revoir"]]),
+            "Second": worksheet([["", "hello", "salut"]]),
+        }
+
+        # Written once, at the position of its first definition, like the iOS catalog
+        self.assertEqual(
+            self._strings(worksheets),
+            ['<string name="hello">salut</string>', '<string name="bye">au revoir</string>']
+        )
+
+        sheets = IOSTranslation(data_source=InMemorySource(worksheets)).sheets
+        catalog = {localized_key: localizations for localized_key, localizations, _ in XCStringsWriter(sheets).entries()}
+        self.assertEqual(catalog["hello"]["fr"], "salut")
+
+    def test_last_row_of_a_sheet_wins_on_every_platform(self):
+        worksheets = {"Tab": worksheet([
+            ["", "hello", "bonjour"],
+            ["", "bye", "au revoir"],
+            ["", "hello", "salut"],
+            ["", "bye", ""],
+        ])}
+
+        self.assertEqual(self._strings(worksheets), ['<string name="hello">salut</string>'])
+
+        sheets = IOSTranslation(data_source=InMemorySource(worksheets)).sheets
+        self.assertEqual(
+            list(XCStringsWriter(sheets).entries()),
+            [("hello", {"fr": "salut"}, None), ("bye", None, None)]
+        )
+
+    def test_empty_last_definition_leaves_the_key_out(self):
+        self.assertEqual(
+            self._strings({
+                "First": worksheet([["", "hello", "bonjour"]]),
+                "Second": worksheet([["", "hello", ""]]),
+            }),
+            []
+        )
+
+    def test_keys_written_as_the_same_resource_name_are_rejected(self):
+        with self.assertRaises(ValueError) as context:
+            self._generate({"Tab": worksheet([
+                ["", "a.b", "un"],
+                ["", "a-b", "deux"],
+                ["", "c", "trois"],
+            ])})
+
+        self.assertIn("'a.b', 'a-b' -> \"a_b\"", str(context.exception))
+
+
+# noinspection PyCompatibility
+class SaveToDriveTest(unittest.TestCase):
+
+    def setUp(self):
+        for reset in (FileManager._folder_ids.clear, FileManager._folder_path_locks.clear):
+            reset()
+            self.addCleanup(reset)
+        self.addCleanup(setattr, FileManager, "_root_folder_id", None)
+
+    def test_language_folders_are_created_in_a_single_android_folder(self):
+        drive = InMemoryDrive(latency=0.01)
+        rows = [["", "yes", "oui", "ja", "sí", "sì"]]
+
+        upload_results = AndroidTranslation(
+            data_source=InMemorySource({"Tab": worksheet(rows, language_codes=("en", "fr", "de", "es", "it"))}),
+            drive_service_factory=lambda: drive
+        ).generate()
+
+        self.assertEqual([upload_result.status for upload_result in upload_results], [UploadResult.CREATED] * 5)
+        for folder_name in ("Translations", "Android"):
+            folders = drive.files().list(q=f"name = '{folder_name}'").execute()["files"]
+            self.assertEqual(len(folders), 1, folder_name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,234 @@
+import gc
+import os
+import tempfile
+import time
+import unittest
+
+from benchmarks.synthetic_workbook import synthetic_workbook
+from data_source import DataSource, InMemorySource
+from generate_translations_android import AndroidTranslation
+from generate_translations_base import GenerateTranslation
+from generate_translations_ios import IOSTranslation
+from instrumentation import Metrics
+from tests.fixtures import worksheet
+from typing import Dict, List
+from unittest import mock
+
+
+# noinspection PyCompatibility
+class ParseWorksheetTest(unittest.TestCase):
+
+    def _parse(self, worksheets: Dict[str, List[List[str]]]) -> IOSTranslation:
+        return IOSTranslation(data_source=InMemorySource(worksheets))
+
+    def test_keys_values_and_comments_of_every_row(self):
+        sheet = self._parse({"Tab": worksheet([
+            ["First comment", "hello", "bonjour"],
+            ["", "// Section", ""],
+            ["", "bye", "au revoir"],
+            ["Last comment", "thanks", "merci"],
+        ])}).sheets[0]
+
+        self.assertEqual([column.language_code for column in sheet.columns], ["en", "fr"])
+        self.assertEqual([column.language_name for column in sheet.columns], ["English", "Français"])
+
+        french = sheet.columns[1].strings
+        self.assertEqual(
+            [(string.localized_key, string.localized_value, string.comment) for string in french],
+            [
+                ("hello", "bonjour", "First comment"),
+                ("// Section", "", ""),
+                ("bye", "au revoir", ""),
+                # The old boundary check dropped the comment of the last row
+                ("thanks", "merci", "Last comment"),
+            ]
+        )
+
+    def test_every_column_shares_the_keys_and_comments(self):
+        sheet = self._parse({"Tab": worksheet([["Comment", "hello", "bonjour"]])}).sheets[0]
+
+        base_language, french = sheet.columns
+        self.assertIs(base_language.strings[0].localized_key, french.strings[0].localized_key)
+        self.assertEqual(base_language.strings[0].comment, "Comment")
+        self.assertEqual(base_language.strings[0].localized_value, "hello")
+
+    def test_worksheets_without_strings(self):
+        translation = self._parse({
+            "Empty": [],
+            "Comments only": [["Comments"], [""], [""], [""], [""], [""], ["A comment"]],
+            "Header only": worksheet([]),
+        })
+
+        self.assertEqual([sheet.name for sheet in translation.sheets], ["Comments only", "Header only"])
+        self.assertEqual(translation.sheets[0].columns, [])
+        self.assertEqual([column.strings for column in translation.sheets[1].columns], [[], []])
+
+
+# noinspection PyCompatibility
+class AbstractGeneratorTest(unittest.TestCase):
+
+    def test_generator_without_generate_cannot_be_created(self):
+        class IncompleteTranslation(GenerateTranslation):
+            platform = "incomplete"
+
+        for generator_class in (GenerateTranslation, IncompleteTranslation):
+            with self.subTest(generator_class=generator_class.__name__), self.assertRaises(TypeError):
+                generator_class(data_source=InMemorySource({}))
+
+    def test_data_source_without_fetch_values_cannot_be_created(self):
+        class IncompleteSource(DataSource):
+            source_id = "incomplete"
+
+            def worksheet_titles(self) -> List[str]:
+                return []
+
+        with self.assertRaises(TypeError):
+            IncompleteSource()
+
+
+# noinspection PyCompatibility
+class SnapshotCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache_dir = cache_dir.name
+        Metrics.reset()
+
+    def _translation(self, worksheets: Dict[str, List[List[str]]], revision) -> IOSTranslation:
+        return IOSTranslation(
+            data_source=InMemorySource(worksheets, revision=revision),
+            cache_dir=self.cache_dir
+        )
+
+    @staticmethod
+    def _french(translation: IOSTranslation) -> List[str]:
+        return [string.localized_value for string in translation.sheets[0].columns[1].strings]
+
+    def test_unchanged_revision_is_read_from_the_snapshot(self):
+        revision = {"modifiedTime": "1", "version": "1"}
+        self._translation({"Tab": worksheet([["", "hello", "bonjour"]])}, revision).sheets
+
+        # The values changed without the revision changing, only the snapshot is read
+        translation = self._translation({"Tab": worksheet([["", "hello", "salut"]])}, revision)
+
+        self.assertEqual(self._french(translation), ["bonjour"])
+        self.assertEqual(translation.fetch_count, 0)
+        self.assertEqual(Metrics.snapshot()['counters']['snapshot_hits'], 1)
+
+    def test_new_revision_is_fetched_and_stored(self):
+        self._translation({"Tab": worksheet([["", "hello", "bonjour"]])}, {"version": "1"}).sheets
+
+        translation = self._translation({"Tab": worksheet([["", "hello", "salut"]])}, {"version": "2"})
+        self.assertEqual(self._french(translation), ["salut"])
+        self.assertEqual(translation.fetch_count, 1)
+
+        # Stored at the new revision
+        translation = self._translation({"Tab": worksheet([["", "hello", "hallo"]])}, {"version": "2"})
+        self.assertEqual(self._french(translation), ["salut"])
+        self.assertEqual(Metrics.snapshot()['counters']['snapshot_misses'], 2)
+
+    def test_source_without_revision_is_not_cached(self):
+        self._translation({"Tab": worksheet([["", "hello", "bonjour"]])}, None).sheets
+
+        translation = self._translation({"Tab": worksheet([["", "hello", "salut"]])}, None)
+
+        self.assertEqual(self._french(translation), ["salut"])
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+
+# noinspection PyCompatibility
+class FromTranslationTest(unittest.TestCase):
+
+    def test_parsed_worksheets_are_shared(self):
+        translation = IOSTranslation(data_source=InMemorySource({"Tab": worksheet([["", "hello", "bonjour"]])}))
+        sheets = translation.sheets
+        android = AndroidTranslation.from_translation(translation)
+
+        self.assertIsInstance(android, AndroidTranslation)
+        self.assertIs(android.sheets[0], sheets[0])
+
+        # Discarded through either generator, parsed again for both
+        android.invalidate("Tab")
+        self.assertIsNot(translation.sheets[0], sheets[0])
+        self.assertIs(android.sheets[0], translation.sheets[0])
+
+    def test_merge_changes_are_not_shared(self):
+        translation = IOSTranslation(data_source=InMemorySource({"Tab": worksheet([["", "hello", "bonjour"]])}))
+        android = AndroidTranslation.from_translation(translation)
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            translation.generate(output_dir=output_dir, save_to_drive=False, merge=True)
+
+        self.assertIsNotNone(translation.catalog_changes)
+        self.assertIsNone(android.catalog_changes)
+
+
+# noinspection PyCompatibility
+class RefreshChangedTest(unittest.TestCase):
+
+    def test_only_changed_worksheets_are_parsed_again(self):
+        worksheets = {
+            "First": worksheet([["", "hello", "bonjour"]]),
+            "Second": worksheet([["", "bye", "au revoir"]]),
+            "Third": worksheet([["", "thanks", "merci"]]),
+        }
+        translation = IOSTranslation(data_source=InMemorySource(worksheets))
+        first = translation.sheets[0]
+
+        worksheets["Second"] = worksheet([["", "bye", "salut"]])
+        del worksheets["Third"]
+        worksheets["Fourth"] = worksheet([["", "yes", "oui"]])
+
+        with mock.patch.object(translation, "_parse_worksheet", wraps=translation._parse_worksheet) as parse_worksheet:
+            changed_titles = translation.refresh_changed()
+            sheets = translation.sheets
+
+        self.assertEqual(changed_titles, ["Third", "Second", "Fourth"])
+        self.assertEqual([call.kwargs["title"] for call in parse_worksheet.call_args_list], ["Second", "Fourth"])
+        self.assertEqual([sheet.name for sheet in sheets], ["First", "Second", "Fourth"])
+        self.assertIs(sheets[0], first)
+        self.assertEqual(sheets[1].columns[1].strings[0].localized_value, "salut")
+
+
+# noinspection PyCompatibility
+class ParseScalingTest(unittest.TestCase):
+    """Parsing time should grow linearly with the number of cells, rows × languages."""
+
+    # How much slower per cell a 4 times larger worksheet may parse, a quadratic parse would be about 4 times slower
+    _MAX_SLOWDOWN_PER_CELL = 2.0
+
+    @staticmethod
+    def _parse_seconds(keys: int, languages: int) -> float:
+        rows = synthetic_workbook(keys=keys, languages=languages, tabs=1)["Tab 1"]
+        translation = IOSTranslation(data_source=InMemorySource({}))
+
+        # Like timeit, collect garbage between runs only: a full collection during the larger parse skews the ratio
+        best = float("inf")
+        gc.disable()
+        try:
+            for _ in range(5):
+                gc.collect()
+                start_time = time.perf_counter()
+                translation._parse_worksheet(title="Tab 1", raw_cells_data=rows)
+                best = min(best, time.perf_counter() - start_time)
+        finally:
+            gc.enable()
+
+        return best / (keys * languages)
+
+    def test_parse_time_grows_linearly_with_rows(self):
+        small = self._parse_seconds(keys=5_000, languages=3)
+        large = self._parse_seconds(keys=20_000, languages=3)
+
+        self.assertLess(large, small * self._MAX_SLOWDOWN_PER_CELL)
+
+    def test_parse_time_grows_linearly_with_languages(self):
+        small = self._parse_seconds(keys=5_000, languages=3)
+        large = self._parse_seconds(keys=5_000, languages=12)
+
+        self.assertLess(large, small * self._MAX_SLOWDOWN_PER_CELL)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+from file_manager import FileManager
+from generate_translations_main import main
+from instrumentation import Metrics
+from tests.test_file_manager import _FailingDrive
+
+
+# noinspection PyCompatibility
+class MainTestCase(unittest.TestCase):
+    """Runs main() in a temporary working directory, capturing its output."""
+
+    def setUp(self):
+        # The snapshot and folder caches are created in the working directory
+        working_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(working_dir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(working_dir.name)
+        self.addCleanup(setattr, FileManager, "_folder_cache_file", None)
+        Metrics.reset()
+
+    @staticmethod
+    def _write_workbook(path: str):
+        with open(path, "w", newline="", encoding="utf-8") as workbook:
+            csv.writer(workbook).writerows([
+                ["Comments", "en", "fr"],
+                ["", "English", "French"],
+                ["", "English", "Français"],
+                ["", "", ""],
+                ["", "", ""],
+                ["", "", ""],
+                ["", "hello", "bonjour"],
+            ])
+
+    def _main(self, arguments):
+        self.stdout, self.stderr = io.StringIO(), io.StringIO()
+        with redirect_stdout(self.stdout), redirect_stderr(self.stderr):
+            main(arguments)
+        return self.stdout.getvalue(), self.stderr.getvalue()
+
+
+# noinspection PyCompatibility
+class MetricsOutputTest(MainTestCase):
+
+    def test_metrics_have_stdout_to_themselves(self):
+        self._write_workbook("Translations.csv")
+
+        stdout, stderr = self._main([
+            "generate", "--workbook", "Translations.csv", "--no-drive", "--ios-output-dir", "ios", "--metrics", "-"
+        ])
+
+        self.assertIn("File ID:", stderr)
+        self.assertIn("parse", json.loads(stdout)["stages"])
+
+    def test_human_output_stays_on_stdout_with_a_metrics_file(self):
+        self._write_workbook("Translations.csv")
+
+        stdout, _ = self._main([
+            "generate", "--workbook", "Translations.csv", "--no-drive", "--ios-output-dir", "ios",
+            "--metrics", "metrics.json"
+        ])
+
+        self.assertIn("File ID:", stdout)
+        with open("metrics.json") as metrics_file:
+            self.assertIn("parse", json.load(metrics_file)["stages"])
+
+    @mock.patch("generate_translations_main.load_credentials")
+    @mock.patch("batch_build.BatchBuild.run", side_effect=KeyboardInterrupt)
+    def test_interrupted_batch_still_writes_metrics(self, run: mock.Mock, load_credentials: mock.Mock):
+        with open("manifest.json", "w") as manifest:
+            json.dump({"apps": [{"name": "App", "spreadsheet": "Translations"}]}, manifest)
+
+        with self.assertRaises(KeyboardInterrupt):
+            self._main(["batch", "manifest.json", "--metrics", "metrics.json"])
+
+        with open("metrics.json") as metrics_file:
+            self.assertEqual(json.load(metrics_file)["apps"], {})
+
+
+# noinspection PyCompatibility
+class FailedUploadTest(MainTestCase):
+
+    @mock.patch("generate_translations_main.load_credentials")
+    def test_failed_uploads_are_reported_and_fail_the_run(self, load_credentials: mock.Mock):
+        self._write_workbook("Translations.csv")
+        drive = _FailingDrive("strings.xml", ValueError("quota exceeded"))
+        self.addCleanup(FileManager._folder_ids.clear)
+        self.addCleanup(setattr, FileManager, "_root_folder_id", None)
+
+        with mock.patch("generate_translations_base.GoogleServices.drive_service", return_value=drive), \
+                self.assertRaises(SystemExit) as context:
+            self._main(["generate", "--workbook", "Translations.csv", "--platform", "android"])
+
+        self.assertEqual(str(context.exception.code), "2 of 2 files were not saved")
+        self.assertIn("Not saved: strings.xml (quota exceeded)", self.stdout.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
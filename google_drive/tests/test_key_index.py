@@ -0,0 +1,78 @@
+import unittest
+
+from typing import List
+from key_index import KeyIndex, SheetKeys
+
+
+def _scan(sheet_name: str, language_codes: List[str], rows: List[List[str]]) -> SheetKeys:
+    """Scans a worksheet of (comment, key, translations...) rows below the usual 6 header rows."""
+    header_rows = [["Comments"] + language_codes] + [[""] * (len(language_codes) + 1) for _ in range(5)]
+    return KeyIndex.scan(sheet_name, [list(column) for column in zip(*(header_rows + rows))])
+
+
+# noinspection PyCompatibility
+class KeyIndexTest(unittest.TestCase):
+
+    def test_keys_are_located(self):
+        key_index = KeyIndex([_scan("Tab", ["en", "fr"], [
+            ["", "hello", "bonjour"],
+            ["", "// Section", ""],
+            ["", "bye", ""],
+        ])])
+
+        self.assertEqual((len(key_index), "hello" in key_index, "// Section" in key_index), (2, True, False))
+        self.assertEqual((key_index.get("bye").sheet_name, key_index.get("bye").row), ("Tab", 9))
+        self.assertIsNone(key_index.get("missing"))
+
+    def test_duplicates_across_and_within_sheets(self):
+        key_index = KeyIndex([
+            _scan("First", ["en", "fr"], [["", "hello", "bonjour"], ["", "bye", ""], ["", "hello", "salut"]]),
+            _scan("Second", ["en", "fr"], [["", "thanks", "merci"], ["", "hello", ""]]),
+        ])
+
+        self.assertEqual(
+            {localized_key: list(map(repr, locations)) for localized_key, locations in key_index.duplicates.items()},
+            {"hello": ["First row 7", "First row 9", "Second row 8"]}
+        )
+        # The last definition is generated, its empty cells included
+        self.assertEqual(repr(key_index.get("hello")), "Second row 8")
+        self.assertFalse(key_index.has_translation("hello", "fr"))
+
+    def test_rows_with_translations_but_no_key_are_orphans(self):
+        key_index = KeyIndex([_scan("Tab", ["en", "fr", "de"], [
+            ["", "", "", ""],
+            ["Forgotten key", "", "oublié", "vergessen"],
+            ["", "", "// later", ""],
+        ])])
+
+        self.assertEqual(len(key_index), 0)
+        self.assertEqual([(repr(location), key_index.language_codes(location.languages))
+                          for location in key_index.orphans], [("Tab row 8", ["fr", "de"])])
+
+    def test_missing_translations(self):
+        key_index = KeyIndex([_scan("Tab", ["en", "fr", "de"], [
+            ["", "hello", "bonjour", "hallo"],
+            ["", "bye", "", "tschüss"],
+            ["", "thanks", "// merci", ""],
+        ])])
+
+        # Values starting with "//" are comments, they're not translations
+        self.assertEqual(key_index.missing_translations(), {"fr": ["bye", "thanks"], "de": ["thanks"]})
+
+    def test_language_bits_are_remapped_between_sheets(self):
+        key_index = KeyIndex([
+            _scan("First", ["en", "fr", "de"], [["", "hello", "bonjour", "hallo"]]),
+            _scan("Second", ["en", "ja", "fr"], [["", "bye", "さようなら", "au revoir"], ["", "yes", "", "oui"]]),
+        ])
+
+        self.assertEqual(key_index.languages, ["en", "fr", "de", "ja"])
+        self.assertEqual(key_index.language_codes(key_index.get("bye").languages), ["en", "fr", "ja"])
+        self.assertEqual(key_index.language_codes(key_index.get("yes").languages), ["en", "fr"])
+        self.assertTrue(key_index.has_translation("bye", "ja"))
+        self.assertFalse(key_index.has_translation("bye", "de"))
+        self.assertFalse(key_index.has_translation("hello", "ja"))
+        self.assertEqual(key_index.missing_translations(), {"de": ["bye", "yes"], "ja": ["hello", "yes"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
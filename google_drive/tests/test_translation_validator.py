@@ -0,0 +1,74 @@
+import unittest
+
+from typing import List, Tuple
+from Models.localized_column import LocalizedColumn
+from Models.localized_string import LocalizedString
+from Models.sheet import Sheet
+from Models.validation_issue import ValidationIssue
+from translation_validator import TranslationValidator
+
+
+def _sheet(rows: List[Tuple[str, str]]) -> Sheet:
+    """Builds a sheet with an English base column and a French column, one (key, translation) pair per row."""
+    return Sheet(name="Tab", columns=[
+        LocalizedColumn("en", "English", "English",
+                        [LocalizedString(localized_key, localized_key, "") for localized_key, _ in rows]),
+        LocalizedColumn("fr", "French", "Français",
+                        [LocalizedString(localized_key, value, "") for localized_key, value in rows]),
+    ])
+
+
+# noinspection PyCompatibility
+class TranslationValidatorTest(unittest.TestCase):
+
+    @staticmethod
+    def _issues(rows: List[Tuple[str, str]]) -> List[Tuple[str, str, int, str]]:
+        return [
+            (issue.severity, issue.check, issue.row, issue.localized_key)
+            for issue in TranslationValidator().validate([_sheet(rows)])
+        ]
+
+    def test_reordered_positional_specifiers_match(self):
+        self.assertEqual(self._issues([
+            ("%1$@ is %2$d years old", "%2$d ans pour %1$@"),
+            ("%@ has %d apples", "%1$@ a %2$d pommes"),
+        ]), [])
+
+    def test_mismatched_argument_kinds_are_errors(self):
+        self.assertEqual(self._issues([
+            ("%@ has %d apples", "%d a %@ pommes"),
+            ("%d apples", "%ld pommes"),
+            ("%.2f km", "%d km"),
+            ("%@ apples", "pommes"),
+        ]), [
+            (ValidationIssue.ERROR, "placeholders", 7, "%@ has %d apples"),
+            (ValidationIssue.ERROR, "placeholders", 9, "%.2f km"),
+            (ValidationIssue.ERROR, "placeholders", 10, "%@ apples"),
+        ])
+
+    def test_percent_signs_are_not_specifiers(self):
+        self.assertEqual(self._issues([
+            ("100%% sure", "sûr à 100%%"),
+            ("50% off", "-50 %"),
+            ("%d%% done", "%d %% fini"),
+        ]), [])
+
+    def test_long_and_empty_translations_are_warnings(self):
+        # A translation may reach 20 characters, or 3 times the length of the base value
+        self.assertEqual(self._issues([
+            ("Short", "x" * 20),
+            ("Tiny", "x" * 21),
+            ("A twenty characters.", "x" * 61),
+            ("Missing", ""),
+            ("Commented", "// later"),
+            ("// Section", ""),
+        ]), [
+            (ValidationIssue.WARNING, "length", 8, "Tiny"),
+            (ValidationIssue.WARNING, "length", 9, "A twenty characters."),
+            (ValidationIssue.WARNING, "empty", 10, "Missing"),
+            (ValidationIssue.WARNING, "empty", 11, "Commented"),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
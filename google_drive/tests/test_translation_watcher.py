@@ -0,0 +1,121 @@
+import io
+import os
+import socket
+import tempfile
+import unittest
+
+from contextlib import redirect_stdout
+from typing import Any, Dict
+from unittest import mock
+from api_budget import ApiBudget
+from translation_watcher import TranslationWatcher
+
+
+# noinspection PyCompatibility
+class _Request:
+    """A request timing out the given number of times before it returns its response."""
+
+    def __init__(self, response: Dict[str, Any], timeouts: int = 0):
+        self._response = response
+        self._timeouts = timeouts
+
+    def execute(self) -> Dict[str, Any]:
+        if self._timeouts:
+            self._timeouts -= 1
+            raise socket.timeout('timed out')
+        return self._response
+
+
+@mock.patch('file_manager.time.sleep')
+class ChangesRequestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.drive = mock.Mock()
+        patcher = mock.patch.object(ApiBudget, 'spend')
+        self.spend = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _watcher(self, page_token_file: str) -> TranslationWatcher:
+        return TranslationWatcher(runner=mock.Mock(), drive_service=self.drive, page_token_file=page_token_file)
+
+    def test_changes_are_listed_with_retries_and_budget(self, sleep: mock.Mock):
+        self.drive.changes.return_value.list.side_effect = [
+            _Request({'changes': [{'fileId': 'a'}], 'nextPageToken': '2'}, timeouts=1),
+            _Request({'changes': [{'fileId': 'b'}], 'newStartPageToken': '3'}),
+        ]
+
+        changed_file_ids, page_token = self._watcher('unused.txt')._list_changes('1')
+
+        self.assertEqual((changed_file_ids, page_token), (['a', 'b'], '3'))
+        self.assertEqual(sleep.call_count, 1)
+        self.assertEqual(self.spend.call_count, 3)
+
+    def test_start_page_token_is_requested_with_retries_and_budget(self, sleep: mock.Mock):
+        self.drive.changes.return_value.getStartPageToken.return_value = _Request({'startPageToken': '7'}, timeouts=2)
+
+        with tempfile.TemporaryDirectory() as token_dir:
+            page_token_file = os.path.join(token_dir, 'changes_page_token.txt')
+            self.assertEqual(self._watcher(page_token_file)._load_page_token(), '7')
+
+            with open(page_token_file) as token_file:
+                self.assertEqual(token_file.read(), '7')
+
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(self.spend.call_count, 3)
+
+
+@mock.patch('translation_watcher.time.sleep')
+class FailedCycleTest(unittest.TestCase):
+
+    def setUp(self):
+        token_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(token_dir.cleanup)
+        self.page_token_file = os.path.join(token_dir.name, 'changes_page_token.txt')
+        with open(self.page_token_file, 'w') as token_file:
+            token_file.write('1')
+
+        patcher = mock.patch.object(ApiBudget, 'spend')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.drive = mock.Mock()
+        self.runner = mock.Mock(spreadsheet_id='sheet', validation_issues=[], catalog_changes=[])
+        self.runner.generate.return_value = []
+        self.runner.refresh_changed.return_value = []
+
+    def _run(self, cycles: int) -> str:
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            TranslationWatcher(runner=self.runner, drive_service=self.drive,
+                               page_token_file=self.page_token_file).run(cycles=cycles)
+        return stdout.getvalue()
+
+    def test_failed_generation_is_retried_on_the_next_poll(self, _):
+        self.runner.generate.side_effect = [ConnectionError('connection reset'), [], []]
+        self.drive.changes.return_value.list.return_value = _Request({'changes': [], 'newStartPageToken': '1'})
+
+        output = self._run(cycles=2)
+
+        self.assertIn('Cycle failed, retrying on the next poll: ConnectionError: connection reset', output)
+        # Generated again on the first poll even though the spreadsheet didn't change, not on the second
+        self.assertEqual(self.runner.generate.call_count, 2)
+
+    def test_failed_poll_keeps_its_page_token(self, _):
+        self.drive.changes.return_value.list.side_effect = [
+            _Request({'changes': [{'fileId': 'sheet'}], 'newStartPageToken': '2'}),
+            _Request({'changes': [{'fileId': 'sheet'}], 'newStartPageToken': '2'}),
+        ]
+        self.runner.refresh_changed.side_effect = [ValueError('bad worksheet'), ['Tab']]
+
+        output = self._run(cycles=2)
+
+        self.assertIn('Cycle failed, retrying on the next poll: ValueError: bad worksheet', output)
+        self.assertEqual([call.kwargs['pageToken'] for call in self.drive.changes.return_value.list.call_args_list],
+                         ['1', '1'])
+        self.assertEqual(self.runner.generate.call_count, 2)
+        with open(self.page_token_file) as token_file:
+            self.assertEqual(token_file.read(), '2')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+import json
+import unittest
+
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
+from data_source import InMemorySource
+from generate_translations_ios import IOSTranslation
+from Models.catalog_changes import CatalogChanges
+from tests.fixtures import worksheet
+from xcstrings_merger import XCStringsMerger
+from xcstrings_writer import XCStringsWriter
+
+
+# As Xcode saves it: `"key" : value` pairs, sorted keys and empty objects over two lines
+_XCODE_CATALOG = """{
+  "sourceLanguage" : "en",
+  "strings" : {
+    "" : {
+
+    },
+    "hello" : {
+      "localizations" : {
+        "fr" : {
+          "stringUnit" : {
+            "state" : "translated",
+            "value" : "bonjour"
+          }
+        }
+      }
+    }
+  },
+  "version" : "1.0"
+}"""
+
+
+def _string_unit(value: str, state: str = "translated") -> Dict[str, Any]:
+    return {"stringUnit": {"state": state, "value": value}}
+
+
+def _catalog(strings: Dict[str, Any]) -> Dict[str, Any]:
+    return {"sourceLanguage": "en", "strings": strings, "version": "1.0"}
+
+
+# noinspection PyCompatibility
+class XCStringsMergerTest(unittest.TestCase):
+
+    @staticmethod
+    def _merge(
+            rows: List[List[str]],
+            previous_catalog: Optional[Dict[str, Any]],
+            remove_missing_keys: bool = False
+    ) -> Tuple[bytes, CatalogChanges]:
+        worksheets = {"Tab": worksheet(rows, language_codes=("en", "fr", "de"))}
+        sheets = IOSTranslation(data_source=InMemorySource(worksheets)).sheets
+        merger = XCStringsMerger(XCStringsWriter(sheets), previous_catalog, file_name="Localizable.xcstrings",
+                                 remove_missing_keys=remove_missing_keys)
+
+        catalog = BytesIO()
+        merger.write(catalog)
+        return catalog.getvalue(), merger.changes
+
+    def _merged_strings(self, rows: List[List[str]], previous_strings: Dict[str, Any]) -> Dict[str, Any]:
+        content, _ = self._merge(rows, _catalog(previous_strings))
+        return json.loads(content)["strings"]
+
+    def test_unchanged_localization_keeps_its_state(self):
+        content, changes = self._merge(
+            [["", "hello", "bonjour", "hallo"]],
+            _catalog({"hello": {"localizations": {
+                "fr": _string_unit("bonjour", state="needs_review"),
+                "de": _string_unit("hallo"),
+            }}})
+        )
+
+        self.assertEqual(json.loads(content)["strings"]["hello"]["localizations"]["fr"],
+                         _string_unit("bonjour", state="needs_review"))
+        self.assertEqual((changes.unchanged_key_count, changes.has_changes), (1, False))
+
+    def test_changed_value_is_translated_again(self):
+        strings = self._merged_strings(
+            [["", "hello", "salut", "hallo"]],
+            {"hello": {"localizations": {
+                "fr": _string_unit("bonjour", state="needs_review"),
+                "de": _string_unit("hallo", state="needs_review"),
+            }}}
+        )
+
+        self.assertEqual(strings["hello"]["localizations"], {
+            "fr": _string_unit("salut"),
+            "de": _string_unit("hallo", state="needs_review"),
+        })
+
+    def test_variations_are_kept(self):
+        variations = {"variations": {"plural": {
+            "one": _string_unit("%d pomme"),
+            "other": _string_unit("%d pommes"),
+        }}}
+
+        strings = self._merged_strings(
+            [["", "%d apples", "%d pommes", ""]],
+            {"%d apples": {"localizations": {"fr": variations, "de": variations}}}
+        )
+
+        # Neither a value nor an empty cell can replace what Xcode edited
+        self.assertEqual(strings["%d apples"]["localizations"], {"fr": variations, "de": variations})
+
+    def test_empty_cell_removes_the_localization(self):
+        content, changes = self._merge(
+            [["", "hello", "bonjour", ""]],
+            _catalog({"hello": {"localizations": {"fr": _string_unit("bonjour"), "de": _string_unit("hallo")}}})
+        )
+
+        self.assertEqual(json.loads(content)["strings"]["hello"]["localizations"], {"fr": _string_unit("bonjour")})
+        self.assertEqual((changes.changed_keys, changes.localizations_removed), (["hello"], 1))
+
+    def test_keys_missing_from_the_sheets_are_kept(self):
+        previous_strings = {
+            "hello": {"localizations": {"fr": _string_unit("bonjour")}},
+            "codeOnly": {"localizations": {"fr": _string_unit("Code")}},
+            "manual": {"extractionState": "manual"},
+        }
+
+        content, changes = self._merge([["", "hello", "bonjour", "hallo"]], _catalog(previous_strings))
+
+        # Xcode extracts most keys from the code without an extractionState, nothing tells them apart
+        # from a row removed from the sheets
+        strings = json.loads(content)["strings"]
+        self.assertEqual(strings["codeOnly"], previous_strings["codeOnly"])
+        self.assertEqual(strings["manual"], previous_strings["manual"])
+        self.assertEqual((changes.removed_keys, changes.missing_keys), ([], ["codeOnly", "manual"]))
+
+    def test_missing_keys_are_removed_when_asked(self):
+        extracted = {"extractionState": "extracted_with_value", "localizations": {"fr": _string_unit("Code")}}
+
+        content, changes = self._merge(
+            [["", "hello", "bonjour", "hallo"]],
+            _catalog({
+                "hello": {"localizations": {"fr": _string_unit("bonjour")}},
+                "codeOnly": extracted,
+                "manual": {"extractionState": "manual"},
+                "removedRow": {"localizations": {"fr": _string_unit("supprimé")}},
+            }),
+            remove_missing_keys=True
+        )
+
+        # The keys with an extractionState are Xcode's, they're kept even then
+        strings = json.loads(content)["strings"]
+        self.assertEqual(sorted(strings), ["codeOnly", "hello", "manual"])
+        self.assertEqual(strings["codeOnly"], extracted)
+        self.assertEqual(changes.removed_keys, ["removedRow"])
+        self.assertEqual(changes.missing_keys, ["codeOnly", "manual"])
+
+    def test_merge_is_idempotent(self):
+        rows = [["Greeting", "hello", "bonjour", "hallo"], ["", "bye", "au revoir", ""], ["", "new", "nouveau", "neu"]]
+        content, _ = self._merge(rows, _catalog({
+            "bye": {"localizations": {"de": _string_unit("tschüss"), "fr": _string_unit("salut", state="needs_review")}},
+            "codeOnly": {"extractionState": "extracted_with_value"},
+        }))
+
+        merged_again, changes = self._merge(rows, XCStringsMerger.load(content, source="Localizable.xcstrings"))
+
+        self.assertEqual(merged_again, content)
+        self.assertFalse(changes.has_changes)
+
+    def test_output_matches_json_dumps(self):
+        content, _ = self._merge(
+            [["Quote \"here\"", "hello", "bonjour\nà tous", "hallo"], ["", "other", "autre", "andere"]],
+            _catalog({"hello": {"localizations": {"ja": _string_unit("こんにちは")}}})
+        )
+
+        catalog = json.loads(content)
+        self.assertEqual(
+            content.decode(),
+            json.dumps(catalog, ensure_ascii=False, indent=2, sort_keys=True, separators=(",", " : "))
+        )
+
+    def test_xcode_formatted_catalog_is_written_back_unchanged(self):
+        content, changes = self._merge([["", "hello", "bonjour", ""]], XCStringsMerger.load(
+            _XCODE_CATALOG.encode(), source="Localizable.xcstrings"
+        ))
+
+        self.assertEqual(content.decode(), _XCODE_CATALOG)
+        self.assertFalse(changes.has_changes)
+
+if __name__ == "__main__":
+    unittest.main()
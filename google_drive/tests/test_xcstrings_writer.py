@@ -0,0 +1,97 @@
+import json
+import random
+import unittest
+
+from io import BytesIO
+from typing import Any, Dict, List
+from Models.localized_column import LocalizedColumn
+from Models.localized_string import LocalizedString
+from Models.sheet import Sheet
+from xcstrings_writer import XCStringsWriter
+
+_LANGUAGE_CODES = ["en", "fr", "de", "ja", "pt-BR"]
+_VALUES = ["", "", "bonjour", "// later", "%1$@ a %2$d ans", "L'\"ami\" \\ du\nvoisin", "こんにちは", "émoji 🎉", "\t<b>&</b>"]
+_COMMENTS = ["", "", "Greeting", "Quote \"here\"", "Line\nbreak"]
+
+
+def _dictionary_catalog(sheets: List[Sheet]) -> str:
+    """Builds the catalog the way IOSTranslation did before XCStringsWriter: a nested dictionary
+    serialized with `json.dumps`."""
+    dictionary: Dict[str, Any] = {"sourceLanguage": "", "strings": {}}
+
+    for sheet in sheets:
+        for column_index, column_value in enumerate(sheet.columns):
+            if column_index == 0:
+                dictionary["sourceLanguage"] = column_value.language_code
+                for localized_string in column_value.strings:
+                    dictionary["strings"].update({localized_string.localized_key: {}})
+                continue
+
+            for localized_string in column_value.strings:
+                if not localized_string.localized_key or not localized_string.localized_value:
+                    continue
+                if (not localized_string.localized_key.startswith("//") and
+                        localized_string.localized_value.startswith("//")):
+                    continue
+
+                entry = dictionary["strings"][localized_string.localized_key]
+                string_unit = {"stringUnit": {"state": "translated", "value": localized_string.localized_value}}
+                if "localizations" not in entry:
+                    entry.update({"localizations": {column_value.language_code: string_unit}})
+                    continue
+
+                entry["localizations"].update({column_value.language_code: string_unit})
+                if localized_string.comment:
+                    entry.update({"comment": localized_string.comment})
+
+    dictionary["version"] = "1.0"
+    return json.dumps(dictionary, ensure_ascii=False, indent=2)
+
+
+def _random_sheets(seed: int) -> List[Sheet]:
+    """Builds a few sheets of random rows, every key defined once across all of them, except the empty
+    keys of blank rows."""
+    rng = random.Random(seed)
+    key_numbers = iter(range(1_000_000))
+    sheets: List[Sheet] = []
+
+    for sheet_index in range(rng.randint(1, 4)):
+        language_codes = ["en"] + rng.sample(_LANGUAGE_CODES[1:], rng.randint(0, len(_LANGUAGE_CODES) - 1))
+        rows = []
+        for _ in range(rng.randint(0, 30)):
+            kind = rng.random()
+            if kind < 0.1:
+                localized_key = ""
+            elif kind < 0.2:
+                localized_key = f"// Section {next(key_numbers)}"
+            else:
+                localized_key = f"key {next(key_numbers)} {rng.choice(_VALUES[2:])}"
+            rows.append((localized_key, rng.choice(_COMMENTS), [rng.choice(_VALUES) for _ in language_codes[1:]]))
+
+        columns = [LocalizedColumn("en", "English", "English", [
+            LocalizedString(localized_key, localized_key, comment) for localized_key, comment, _ in rows
+        ])]
+        for column_index, language_code in enumerate(language_codes[1:]):
+            columns.append(LocalizedColumn(language_code, language_code, language_code, [
+                LocalizedString(localized_key, values[column_index], comment) for localized_key, comment, values in rows
+            ]))
+        sheets.append(Sheet(name=f"Sheet {sheet_index}", columns=columns))
+
+    return sheets
+
+
+# noinspection PyCompatibility
+class XCStringsWriterTest(unittest.TestCase):
+
+    def test_output_matches_the_dictionary_catalog(self):
+        for seed in range(200):
+            with self.subTest(seed=seed):
+                sheets = _random_sheets(seed)
+                catalog = BytesIO()
+                XCStringsWriter(sheets).write(catalog)
+
+                self.assertEqual(catalog.getvalue().decode(), _dictionary_catalog(sheets))
+
+
+if __name__ == "__main__":
+    unittest.main()
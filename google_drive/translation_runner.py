@@ -0,0 +1,126 @@
+from generate_translations_base import GenerateTranslation
+from instrumentation import Metrics
+from typing import Dict, List, Optional, Type
+from Models.catalog_changes import CatalogChanges
+from Models.upload_result import UploadResult
+from Models.validation_issue import ValidationIssue
+from translation_validator import TranslationValidationError, TranslationValidator
+
+
+# noinspection PyCompatibility
+class TranslationRunner:
+    """
+        A class for generating the translation files of several platforms from a single spreadsheet.
+
+        The spreadsheet is downloaded and parsed once, every platform generator reads the same
+        in-memory Sheet objects. The translations are validated before any file is generated.
+    """
+
+    def __init__(
+            self,
+            translation: GenerateTranslation,
+            platforms: List[Type[GenerateTranslation]],
+            validation: str = "warn",
+            validator: Optional[TranslationValidator] = None,
+            merge: bool = False,
+            remove_missing_keys: bool = False
+    ):
+        """Initializes a new TranslationRunner object.
+
+        Args:
+            translation (GenerateTranslation): The generator that opened the spreadsheet, any platform.
+            platforms List[Type[GenerateTranslation]]: The generator classes of the platforms to generate.
+            validation (str): "error" to generate nothing when a translation fails validation,
+                              "warn" to only report the issues, "off" to skip the validation.
+            validator (TranslationValidator): The validator to use, one with the default limits if None.
+            merge (bool): Whether the files are merged into their previous version, see `GenerateTranslation.generate`.
+            remove_missing_keys (bool): Whether merging removes the keys the spreadsheet doesn't have.
+        """
+        if validation not in TranslationValidator.MODES:
+            raise ValueError(f"validation must be one of {', '.join(TranslationValidator.MODES)}, not '{validation}'")
+
+        self._translation = translation
+        self._validation = validation
+        self._validator = validator or TranslationValidator()
+        self._validation_issues: List[ValidationIssue] = []
+        self._merge = merge
+        self._remove_missing_keys = remove_missing_keys
+        self._generators: List[GenerateTranslation] = [
+            translation if isinstance(translation, platform) else platform.from_translation(translation)
+            for platform in platforms
+        ]
+
+    @property
+    def spreadsheet_id(self) -> str:
+        return self._translation.spreadsheet_id
+
+    @property
+    def generators(self) -> List[GenerateTranslation]:
+        return self._generators
+
+    @property
+    def validation_issues(self) -> List[ValidationIssue]:
+        """Gets the issues found by the validation of the last `generate` call.
+
+        :return List[ValidationIssue]:
+            The issues, empty when the validation is off.
+        """
+        return self._validation_issues
+
+    @property
+    def catalog_changes(self) -> List[CatalogChanges]:
+        """Gets what the last `generate` call changed in the previous files, when merging.
+
+        :return List[CatalogChanges]:
+            The changes of every platform that merged its files.
+        """
+        return [generator.catalog_changes for generator in self._generators if generator.catalog_changes is not None]
+
+    def refresh_changed(self) -> List[str]:
+        """Re-parses the worksheets that changed, see `GenerateTranslation.refresh_changed`.
+
+        :return List[str]:
+            The titles of the worksheets that were added, changed or removed.
+        """
+        return self._translation.refresh_changed()
+
+    def generate(self, output_dirs: Optional[Dict[str, str]] = None, save_to_drive: bool = True) -> List[UploadResult]:
+        """Generates the translation files of every platform.
+
+        :param output_dirs:
+            The local directory the files of each platform are written to, keyed by platform name (e.g. "ios").
+            Platforms without a directory are not written locally.
+
+        :param save_to_drive:
+            Whether the files are saved to Google Drive.
+
+        :return List[UploadResult]:
+            The result of saving every generated file.
+
+        :raises TranslationValidationError:
+            In "error" mode, when a translation fails validation. No file is generated then.
+        """
+        output_dirs = output_dirs or {}
+
+        self._validation_issues = []
+        if self._validation != "off":
+            with Metrics.stage('validate'):
+                self._validation_issues = self._validator.validate(self._translation.sheets)
+
+            if self._validation == "error" and any(
+                    issue.severity == ValidationIssue.ERROR for issue in self._validation_issues
+            ):
+                raise TranslationValidationError(self._validation_issues)
+
+        # The generators share their parsed sheets, only the first one downloads and parses the spreadsheet
+        upload_results: List[UploadResult] = []
+
+        for generator in self._generators:
+            upload_results.extend(generator.generate(
+                output_dir=output_dirs.get(generator.platform),
+                save_to_drive=save_to_drive,
+                merge=self._merge,
+                remove_missing_keys=self._remove_missing_keys
+            ))
+
+        return upload_results
@@ -0,0 +1,232 @@
+import re
+
+from operator import attrgetter
+from typing import Dict, List, Tuple
+from Models.sheet import Sheet
+from Models.validation_issue import ValidationIssue
+
+# A format specifier is reduced to its position and the kind of argument it reads
+Signature = Tuple[Tuple[int, str], ...]
+
+
+# noinspection PyCompatibility
+class TranslationValidationError(ValueError):
+    """Raised when translations fail validation in "error" mode, before any file is generated."""
+
+    def __init__(self, issues: List[ValidationIssue]):
+        self.issues = issues
+        errors = sum(1 for issue in issues if issue.severity == ValidationIssue.ERROR)
+        super().__init__(f'{errors} translations failed validation\n{TranslationValidator.format_report(issues)}')
+
+
+# noinspection PyCompatibility
+class TranslationValidator:
+    """
+        A class for checking every translation of the spreadsheet against its base language value,
+        which is also its key, before the files are generated:
+        - placeholders (error): the format specifiers (%@, %d, %1$@, ...) must read the same arguments,
+          in the same positions, as the base language, otherwise the app may crash formatting the string,
+        - length (warning): the translation is much longer than the base language value,
+        - empty (warning): the key has no translation for the language.
+
+        The specifiers of a string are only parsed the first time the string is seen, the signatures
+        are cached per validator, and strings without a "%" skip the regular expression altogether.
+    """
+
+    MODES = ("error", "warn", "off")
+
+    # printf specifiers as understood by NSString: %[position$][flags][width][.precision][length]conversion.
+    # The space flag is left out, it would read a "%" followed by a word, e.g. "50% off", as a specifier.
+    _FORMAT_SPECIFIER_PATTERN = re.compile(
+        r"%(?:(\d+)\$)?[-+#0']*(?:\d+|\*)?(?:\.(?:\d+|\*))?(?:hh|h|ll|l|q|L|z|t|j)?([@diouxXDOUfFeEgGaAcCsSp%])"
+    )
+
+    # Conversions reading the same kind of argument are interchangeable
+    _ARGUMENT_KINDS = {
+        '@': 'object',
+        'd': 'integer', 'i': 'integer', 'o': 'integer', 'u': 'integer', 'x': 'integer', 'X': 'integer',
+        'D': 'integer', 'O': 'integer', 'U': 'integer', 'c': 'integer', 'C': 'integer',
+        'f': 'double', 'F': 'double', 'e': 'double', 'E': 'double', 'g': 'double', 'G': 'double',
+        'a': 'double', 'A': 'double',
+        's': 'string', 'S': 'string',
+        'p': 'pointer',
+    }
+
+    # Data rows start at index 6 of a worksheet, the 7th row of the spreadsheet
+    _FIRST_ROW_NUMBER: int = 7
+
+    _localized_value = attrgetter('localized_value')
+
+    def __init__(self, max_length_ratio: float = 3.0, min_length_allowance: int = 20):
+        """Initializes a new TranslationValidator object.
+
+        Args:
+            max_length_ratio (float): How many times longer than the base language value a translation may be.
+            min_length_allowance (int): The length any translation may reach, however short the base value,
+                                        since short strings vary the most between languages.
+        """
+        self._max_length_ratio = max_length_ratio
+        self._min_length_allowance = min_length_allowance
+        self._signatures: Dict[str, Signature] = {}
+
+    def validate(self, sheets: List[Sheet]) -> List[ValidationIssue]:
+        """Checks every translation of the given sheets.
+
+        :param sheets:
+            The parsed sheets, the first column of every sheet is its base language.
+
+        :return List[ValidationIssue]:
+            The issues found, in spreadsheet order, worksheet by worksheet and language by language.
+        """
+        issues: List[ValidationIssue] = []
+
+        for sheet in sheets:
+            if not sheet.columns:
+                continue
+
+            keys = list(map(self._localized_value, sheet.columns[0].strings))
+
+            # Only rows with a key are generated, section comments ("//") aren't translated
+            rows = [
+                (row_index, localized_key)
+                for row_index, localized_key in enumerate(keys)
+                if localized_key and not localized_key.startswith("//")
+            ]
+            key_signatures = [self._signature(localized_key) for _, localized_key in rows]
+            length_limits = [
+                max(self._min_length_allowance, int(len(localized_key) * self._max_length_ratio))
+                for _, localized_key in rows
+            ]
+
+            for column in sheet.columns[1:]:
+                values = list(map(self._localized_value, column.strings))
+                issues.extend(self._validate_column(sheet.name, column.language_code, values, rows, key_signatures, length_limits))
+
+        return issues
+
+    def _validate_column(
+            self,
+            sheet_name: str,
+            language_code: str,
+            values: List[str],
+            rows: List[Tuple[int, str]],
+            key_signatures: List[Signature],
+            length_limits: List[int]
+    ) -> List[ValidationIssue]:
+        issues: List[ValidationIssue] = []
+        signatures = self._signatures
+        value_count = len(values)
+
+        for (row_index, localized_key), key_signature, length_limit in zip(rows, key_signatures, length_limits):
+            value = values[row_index] if row_index < value_count else ""
+
+            # Values starting with "//" are comments, they're not generated
+            if not value or value.startswith("//"):
+                issues.append(self._issue(ValidationIssue.WARNING, 'empty', sheet_name, row_index, localized_key,
+                                          language_code, 'no translation'))
+                continue
+
+            signature = signatures.get(value)
+            if signature is None:
+                signature = self._signature(value)
+
+            if signature != key_signature:
+                issues.append(self._issue(
+                    ValidationIssue.ERROR, 'placeholders', sheet_name, row_index, localized_key, language_code,
+                    f'format specifiers {self._describe(signature)} don\'t match {self._describe(key_signature)}'
+                ))
+
+            if len(value) > length_limit:
+                issues.append(self._issue(
+                    ValidationIssue.WARNING, 'length', sheet_name, row_index, localized_key, language_code,
+                    f'{len(value)} characters, more than the {length_limit} allowed'
+                ))
+
+        return issues
+
+    def _signature(self, value: str) -> Signature:
+        """Reduces the format specifiers of a string to the arguments they read.
+
+        :param value:
+            The localized string.
+
+        :return Signature:
+            The position and kind of argument of every specifier, sorted by position. Specifiers without
+            an explicit position are numbered in order, like `String(format:)` does.
+        """
+        signature = self._signatures.get(value)
+        if signature is not None:
+            return signature
+
+        if '%' not in value:
+            signature = ()
+        else:
+            arguments: List[Tuple[int, str]] = []
+            next_position = 1
+            for position, conversion in self._FORMAT_SPECIFIER_PATTERN.findall(value):
+                if conversion == '%':
+                    continue
+                if position:
+                    arguments.append((int(position), self._ARGUMENT_KINDS[conversion]))
+                else:
+                    arguments.append((next_position, self._ARGUMENT_KINDS[conversion]))
+                    next_position += 1
+            signature = tuple(sorted(arguments))
+
+        self._signatures[value] = signature
+        return signature
+
+    @staticmethod
+    def _describe(signature: Signature) -> str:
+        if not signature:
+            return "(none)"
+        return ", ".join(f'{position}:{kind}' for position, kind in signature)
+
+    def _issue(
+            self,
+            severity: str,
+            check: str,
+            sheet_name: str,
+            row_index: int,
+            localized_key: str,
+            language_code: str,
+            message: str
+    ) -> ValidationIssue:
+        return ValidationIssue(
+            severity=severity,
+            check=check,
+            sheet_name=sheet_name,
+            row=row_index + self._FIRST_ROW_NUMBER,
+            localized_key=localized_key,
+            language_code=language_code,
+            message=message
+        )
+
+    @staticmethod
+    def format_report(issues: List[ValidationIssue], max_listed: int = 10) -> str:
+        """Formats validation issues, grouped by check.
+
+        :param issues:
+            The issues to report.
+
+        :param max_listed:
+            The maximum number of issues listed per check, the others are only counted.
+
+        :return str:
+            The report, one issue per line.
+        """
+        if not issues:
+            return 'All translations passed validation'
+
+        issues_by_check: Dict[str, List[ValidationIssue]] = {}
+        for issue in issues:
+            issues_by_check.setdefault(issue.check, []).append(issue)
+
+        lines: List[str] = []
+        for check, check_issues in issues_by_check.items():
+            lines.append(f'{check} ({check_issues[0].severity}): {len(check_issues)}')
+            lines.extend(f'  {issue!r}' for issue in check_issues[:max_listed])
+            if len(check_issues) > max_listed:
+                lines.append(f'  ... and {len(check_issues) - max_listed} more')
+
+        return "\n".join(lines)
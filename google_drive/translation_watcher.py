@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import os
+import time
+
+from file_manager import FileManager
+from translation_runner import TranslationRunner
+from translation_validator import TranslationValidationError, TranslationValidator
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from Models.upload_result import UploadResult
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import build
+
+
+# noinspection PyCompatibility
+class TranslationWatcher:
+    """
+        A class for regenerating translation files whenever their spreadsheet is edited.
+
+        The Drive Changes API is polled with a page token that is saved between runs. When the
+        spreadsheet shows up in the changes, only the worksheets whose content changed are parsed
+        again, every other Sheet object stays in memory between cycles.
+
+        A cycle that fails, e.g. on a network error, is reported and doesn't stop the watcher: the page
+        token isn't advanced and the files are generated again on the next poll.
+    """
+
+    def __init__(
+            self,
+            runner: TranslationRunner,
+            drive_service: build,
+            page_token_file: str = "changes_page_token.txt",
+            interval: float = 10.0,
+            output_dirs: Optional[Dict[str, str]] = None,
+            save_to_drive: bool = True
+    ):
+        """Initializes a new TranslationWatcher object.
+
+        Args:
+            runner (TranslationRunner): The runner of the platforms whose translation files are kept up-to-date.
+            drive_service (build): An instance of the Google Drive API service object.
+            page_token_file (str): The file the Changes API page token is saved to between runs.
+            interval (float): The number of seconds to wait between two polls.
+            output_dirs Dict[str, str]: The local directory the files of each platform are written to, if any.
+            save_to_drive (bool): Whether the translation files are saved to Google Drive.
+        """
+        self._runner = runner
+        self._drive_service = drive_service
+        self._page_token_file = page_token_file
+        self._interval = interval
+        self._output_dirs = output_dirs
+        self._save_to_drive = save_to_drive
+        # Whether a cycle failed since the files were last generated, the next poll generates them even without a change
+        self._is_outdated = False
+
+    def run(self, cycles: Optional[int] = None):
+        """Generates the translation files once, then regenerates them after every change to the spreadsheet.
+
+        :param cycles:
+            The number of polls to make before returning, polls forever when None.
+        """
+        # Make sure the changes are tracked from before the first generation
+        page_token = self._load_page_token()
+        try:
+            self._print_results(self._generate())
+        except Exception as error:
+            self._report_failure(error)
+
+        cycle = 0
+        while cycles is None or cycle < cycles:
+            time.sleep(self._interval)
+            cycle += 1
+
+            try:
+                page_token = self.poll(page_token)
+            except Exception as error:
+                self._report_failure(error)
+
+    def poll(self, page_token: str) -> str:
+        """Checks the Changes API once and regenerates the translation files if any worksheet changed.
+
+        :param page_token:
+            The page token to list the changes from.
+
+        :return str:
+            The page token to use for the next poll.
+
+        :raises Exception:
+            Whatever listing the changes or generating the files raised, the page token isn't saved then.
+        """
+        changed_file_ids, next_page_token = self._list_changes(page_token)
+
+        if self._runner.spreadsheet_id in changed_file_ids or self._is_outdated:
+            changed_titles = self._runner.refresh_changed()
+            if changed_titles:
+                print(f'Changed worksheets: {", ".join(changed_titles)}')
+            if changed_titles or self._is_outdated:
+                self._print_results(self._generate())
+
+        self._save_page_token(next_page_token)
+        return next_page_token
+
+    def _list_changes(self, page_token: str) -> Tuple[List[str], str]:
+        """Lists the IDs of the files changed since the given page token.
+
+        :param page_token:
+            The page token to list the changes from.
+
+        :return Tuple[List[str], str]:
+            The IDs of the changed files and the page token to continue from on the next poll.
+        """
+        changed_file_ids: List[str] = []
+
+        while True:
+            results = FileManager.execute(self._drive_service.changes().list(
+                pageToken=page_token,
+                spaces='drive',
+                fields='nextPageToken, newStartPageToken, changes(fileId)'
+            ))
+
+            changed_file_ids.extend(change.get('fileId') for change in results.get('changes', []))
+
+            if 'newStartPageToken' in results:
+                return changed_file_ids, results['newStartPageToken']
+
+            page_token = results['nextPageToken']
+
+    def _generate(self) -> List[UploadResult]:
+        try:
+            upload_results = self._runner.generate(output_dirs=self._output_dirs, save_to_drive=self._save_to_drive)
+        except TranslationValidationError as error:
+            # Keep watching, the files are generated again once the spreadsheet is fixed
+            print(f'Not generated: {error}')
+            self._is_outdated = False
+            return []
+        self._is_outdated = False
+
+        if self._runner.validation_issues:
+            print(TranslationValidator.format_report(self._runner.validation_issues))
+
+        for catalog_changes in self._runner.catalog_changes:
+            print(catalog_changes.report())
+
+        return upload_results
+
+    def _report_failure(self, error: Exception):
+        # Worksheets re-parsed before the failure no longer show up as changed, generate the files regardless
+        self._is_outdated = True
+        print(f'Cycle failed, retrying on the next poll: {type(error).__name__}: {error}')
+
+    @staticmethod
+    def _print_results(upload_results: List[UploadResult]):
+        for upload_result in upload_results:
+            if upload_result.status == UploadResult.FAILED:
+                # Not saved this time, the next change to the spreadsheet saves it again
+                print(f'Not saved: {upload_result.file_name} ({upload_result.error})')
+            else:
+                print(f'File ID: {upload_result.file_id} ({upload_result.status})')
+
+    def _load_page_token(self) -> str:
+        if os.path.exists(self._page_token_file):
+            with open(self._page_token_file) as token_file:
+                page_token = token_file.read().strip()
+            if page_token:
+                return page_token
+
+        page_token = FileManager.execute(self._drive_service.changes().getStartPageToken())['startPageToken']
+        self._save_page_token(page_token)
+        return page_token
+
+    def _save_page_token(self, page_token: str):
+        with open(self._page_token_file, 'w') as token_file:
+            token_file.write(page_token)
@@ -0,0 +1,287 @@
+import json
+
+from json.encoder import encode_basestring
+from typing import Any, BinaryIO, Dict, Optional, Set, Tuple
+from Models.catalog_changes import CatalogChanges
+from xcstrings_writer import XCStringsWriter
+
+
+# noinspection PyCompatibility
+class XCStringsMerger:
+    """
+        A class for merging the sheets into an existing XCStrings file, instead of writing it from scratch.
+
+        Only the localizations whose value differs from the previous catalog are rewritten, with the
+        "translated" state. Everything else is kept as it is: the state of unchanged localizations
+        (e.g. "needs_review"), plural variations and substitutions, `extractionState` and any other
+        field Xcode added, and the languages the sheets don't have a column for.
+
+        Keys the sheets don't have are kept as they are and reported as missing: the catalog doesn't tell
+        the keys written from an earlier version of the sheets apart from the ones Xcode extracted from the
+        code, which usually have no `extractionState`. With `remove_missing_keys` they're removed like a full
+        generation would, except the ones with an `extractionState`, which Xcode extracted or were added in
+        its editor. Localizations are only removed when their language column is empty and they hold a
+        single value the sheets could have written, so variations edited in Xcode survive an empty cell.
+
+        The catalog is written the way Xcode writes it, so that a merge that changes a few entries only
+        changes a few lines of the file, and saving it from Xcode afterwards changes none: keys sorted,
+        `"key" : value` pairs and empty objects spread over two lines. Apart from those empty objects, the output
+        is the same, byte for byte, as `json.dumps(catalog, ensure_ascii=False, indent=2, sort_keys=True,
+        separators=(',', ' : '))`, written one key at a time like XCStringsWriter does, without going through
+        the much slower pure-Python encoder `json` falls back to when indenting.
+    """
+
+    def __init__(
+            self,
+            sheets_writer: XCStringsWriter,
+            previous_catalog: Optional[Dict[str, Any]],
+            file_name: str,
+            remove_missing_keys: bool = False
+    ):
+        """Initializes a new XCStringsMerger object, merging the sheets into the previous catalog.
+
+        Args:
+            sheets_writer (XCStringsWriter): The writer of the sheets, whose entries are merged.
+            previous_catalog (Dict[str, Any]): The parsed previous XCStrings file, None if there is none,
+                                               in which case every key is added.
+            file_name (str): The name of the catalog, reported with its changes.
+            remove_missing_keys (bool): Whether the keys the sheets don't have are removed, other than the ones
+                                        with an `extractionState`, instead of being kept.
+        """
+        self._changes = CatalogChanges(file_name=file_name)
+        self._remove_missing_keys = remove_missing_keys
+        self._catalog = self._merge(sheets_writer, previous_catalog or {})
+
+    @property
+    def changes(self) -> CatalogChanges:
+        """Gets what the merge changed in the previous catalog.
+
+        :return CatalogChanges:
+            The keys added, changed and removed.
+        """
+        return self._changes
+
+    def write(self, stream: BinaryIO):
+        """Writes the merged XCStrings document, encoded in UTF-8, to a binary stream.
+
+        :param stream:
+            The stream to write to, e.g. a file opened in binary mode or a BytesIO.
+        """
+        stream.write(b'{')
+
+        separator = '\n'
+        for field in sorted(self._catalog):
+            if field != 'strings':
+                stream.write(f'{separator}  {self._dumps(field)} : {self._format(self._catalog[field], "  ")}'.encode())
+                separator = ',\n'
+                continue
+
+            strings: Dict[str, Any] = self._catalog[field]
+            if not strings:
+                stream.write(f'{separator}  "strings" : {self._format(strings, "  ")}'.encode())
+            else:
+                entry_separator = '{\n'
+                stream.write(f'{separator}  "strings" : '.encode())
+                for localized_key in sorted(strings):
+                    entry = self._format(strings[localized_key], "    ")
+                    stream.write(f'{entry_separator}    {encode_basestring(localized_key)} : {entry}'.encode())
+                    entry_separator = ',\n'
+                stream.write(b'\n  }')
+            separator = ',\n'
+
+        stream.write(b'\n}' if self._catalog else b'\n\n}')
+
+    @staticmethod
+    def load(content: bytes, source: str) -> Dict[str, Any]:
+        """Parses a previous XCStrings file.
+
+        :param content:
+            The content of the file, encoded in UTF-8.
+
+        :param source:
+            Where the file comes from, for the error message.
+
+        :return Dict[str, Any]:
+            The parsed catalog.
+
+        :raises ValueError:
+            If the file isn't a valid XCStrings document.
+        """
+        try:
+            catalog = json.loads(content)
+        except ValueError as error:
+            raise ValueError(f'{source} is not a valid string catalog: {error}') from error
+
+        if not isinstance(catalog, dict) or not isinstance(catalog.get('strings', {}), dict):
+            raise ValueError(f'{source} is not a valid string catalog: "strings" is missing')
+
+        return catalog
+
+    def _merge(self, sheets_writer: XCStringsWriter, previous_catalog: Dict[str, Any]) -> Dict[str, Any]:
+        previous_strings: Dict[str, Any] = previous_catalog.get('strings', {})
+        language_codes = sheets_writer.language_codes
+        strings: Dict[str, Any] = {}
+
+        for localized_key, localizations, comment in sheets_writer.entries():
+            previous_entry = previous_strings.get(localized_key)
+
+            if previous_entry is None:
+                strings[localized_key] = self._new_entry(localizations, comment)
+                self._changes.add_key(localized_key, len(localizations or {}))
+                continue
+
+            entry, added, changed, removed = self._merge_entry(previous_entry, localizations, comment, language_codes)
+            strings[localized_key] = entry
+
+            if entry == previous_entry:
+                self._changes.keep_key()
+            else:
+                self._changes.change_key(localized_key, added, changed, removed)
+
+        for localized_key, previous_entry in previous_strings.items():
+            if localized_key in strings:
+                continue
+
+            # Keys Xcode extracted from the code or added in its editor aren't the sheets' to remove
+            if self._remove_missing_keys and 'extractionState' not in previous_entry:
+                self._changes.remove_key(localized_key)
+            else:
+                strings[localized_key] = previous_entry
+                self._changes.keep_missing_key(localized_key)
+
+        # Keep the other top level fields of the previous catalog
+        catalog = dict(previous_catalog)
+        catalog['sourceLanguage'] = sheets_writer.source_language
+        catalog['strings'] = strings
+        catalog.setdefault('version', '1.0')
+
+        return catalog
+
+    @classmethod
+    def _new_entry(cls, localizations: Optional[Dict[str, str]], comment: Optional[str]) -> Dict[str, Any]:
+        entry: Dict[str, Any] = {}
+
+        if localizations:
+            entry['localizations'] = {
+                language_code: cls._string_unit(localized_value)
+                for language_code, localized_value in localizations.items()
+            }
+        if comment:
+            entry['comment'] = comment
+
+        return entry
+
+    @classmethod
+    def _merge_entry(
+            cls,
+            previous_entry: Dict[str, Any],
+            localizations: Optional[Dict[str, str]],
+            comment: Optional[str],
+            language_codes: Set[str]
+    ) -> Tuple[Dict[str, Any], int, int, int]:
+        """Merges the localized values of a key into its previous entry.
+
+        :param previous_entry:
+            The entry of the key in the previous catalog.
+
+        :param localizations:
+            The localized values of the key in the sheets keyed by language code, None if it has none.
+
+        :param comment:
+            The comment of the key in the sheets, the previous comment is kept when None.
+
+        :param language_codes:
+            The languages translated by the sheets.
+
+        :return Tuple[Dict[str, Any], int, int, int]:
+            The merged entry, and the number of localizations added, changed and removed.
+        """
+        localizations = localizations or {}
+        previous_localizations: Dict[str, Any] = previous_entry.get('localizations', {})
+        merged_localizations: Dict[str, Any] = {}
+        added = changed = removed = 0
+
+        for language_code, previous_localization in previous_localizations.items():
+            string_unit = previous_localization.get('stringUnit')
+            localized_value = localizations.get(language_code)
+
+            if localized_value is None:
+                # Only drop the values the sheets could have written, and only for their languages
+                if language_code in language_codes and string_unit is not None and len(previous_localization) == 1:
+                    removed += 1
+                    continue
+                merged_localizations[language_code] = previous_localization
+            elif string_unit is None:
+                # Variations can't be written from a single cell, they're left to Xcode
+                merged_localizations[language_code] = previous_localization
+            elif string_unit.get('value') == localized_value:
+                merged_localizations[language_code] = previous_localization
+            else:
+                merged_localizations[language_code] = dict(previous_localization, **cls._string_unit(localized_value))
+                changed += 1
+
+        for language_code, localized_value in localizations.items():
+            if language_code not in previous_localizations:
+                merged_localizations[language_code] = cls._string_unit(localized_value)
+                added += 1
+
+        # Keep the fields Xcode added, e.g. extractionState
+        entry = dict(previous_entry)
+        if merged_localizations:
+            entry['localizations'] = merged_localizations
+        else:
+            entry.pop('localizations', None)
+        if comment:
+            entry['comment'] = comment
+
+        return entry, added, changed, removed
+
+    @classmethod
+    def _format(cls, value: Any, indent: str) -> str:
+        """Formats a JSON value like Xcode does, see the class description.
+
+        :param value:
+            The value to format.
+
+        :param indent:
+            The indentation of the line the value starts on.
+
+        :return str:
+            The JSON of the value, its nested lines indented from `indent`.
+        """
+        if isinstance(value, str):
+            return encode_basestring(value)
+
+        if isinstance(value, dict):
+            if not value:
+                return f'{{\n\n{indent}}}'
+            inner_indent = indent + '  '
+            # Strings are encoded inline, they're most of the values of a catalog
+            items = ',\n'.join(
+                f'{inner_indent}{encode_basestring(key)} : '
+                f'{encode_basestring(item) if type(item) is str else cls._format(item, inner_indent)}'
+                for key, item in sorted(value.items())
+            )
+            return f'{{\n{items}\n{indent}}}'
+
+        if isinstance(value, list):
+            if not value:
+                return '[]'
+            inner_indent = indent + '  '
+            items = ',\n'.join(f'{inner_indent}{cls._format(item, inner_indent)}' for item in value)
+            return f'[\n{items}\n{indent}]'
+
+        return cls._dumps(value)
+
+    @staticmethod
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False)
+
+    @staticmethod
+    def _string_unit(localized_value: str) -> Dict[str, Any]:
+        return {
+            "stringUnit": {
+                "state": "translated",
+                "value": localized_value
+            }
+        }
@@ -0,0 +1,171 @@
+import json
+
+from typing import BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+from Models.sheet import Sheet
+
+
+# noinspection PyCompatibility
+class XCStringsWriter:
+    """
+        A class for writing an XCStrings file straight into a binary stream.
+
+        The sheets are first reduced to one small entry per key (its localizations and comment),
+        then the JSON document is written one key at a time, so the nested dictionary of the whole
+        catalog and its serialized string never have to be held in memory at once.
+
+        The output is the same, byte for byte, as `json.dumps(catalog, ensure_ascii=False, indent=2)`.
+    """
+
+    def __init__(self, sheets: List[Sheet]):
+        """Initializes a new XCStringsWriter object.
+
+        Args:
+            sheets List[Sheet]: The sheets to write, the first column of every sheet is its source language.
+        """
+        self._source_language = ""
+        # Localized values keyed by language code, or None before the first localization, and the comment of every key
+        self._localizations: Dict[str, Optional[Dict[str, str]]] = {}
+        self._comments: Dict[str, str] = {}
+        # Every translated language, the source language excluded
+        self._language_codes: Set[str] = set()
+
+        for sheet in sheets:
+            self._add_sheet(sheet)
+
+    @property
+    def keys(self) -> List[str]:
+        """Gets the keys of the catalog, in the order they are written.
+
+        :return List[str]:
+            The localized keys.
+        """
+        return list(self._localizations)
+
+    @property
+    def source_language(self) -> str:
+        """Gets the language code of the source language, the first column of the last sheet.
+
+        :return str:
+            The source language code.
+        """
+        return self._source_language
+
+    @property
+    def language_codes(self) -> Set[str]:
+        """Gets the codes of the languages translated by the sheets, the source language excluded.
+
+        :return Set[str]:
+            The language codes.
+        """
+        return self._language_codes
+
+    def entries(self) -> Iterator[Tuple[str, Optional[Dict[str, str]], Optional[str]]]:
+        """Iterates over the entries of the catalog, in the order they are written.
+
+        :return Iterator[Tuple[str, Optional[Dict[str, str]], Optional[str]]]:
+            The key, the localized values keyed by language code (None if it has none) and the comment of every entry.
+        """
+        for localized_key, localizations in self._localizations.items():
+            yield localized_key, localizations, self._comments.get(localized_key) or None
+
+    def write(self, stream: BinaryIO):
+        """Writes the XCStrings document, encoded in UTF-8, to a binary stream.
+
+        :param stream:
+            The stream to write to, e.g. a file opened in binary mode or a BytesIO.
+        """
+        stream.write(f'{{\n  "sourceLanguage": {self._dumps(self._source_language)},\n  "strings": '.encode())
+
+        if self._localizations:
+            separator = '{\n'
+            for localized_key, localizations in self._localizations.items():
+                stream.write(f'{separator}    {self._dumps(localized_key)}: {self._entry(localized_key, localizations)}'.encode())
+                separator = ',\n'
+            stream.write(b'\n  }')
+        else:
+            stream.write(b'{}')
+
+        stream.write(b',\n  "version": "1.0"\n}')
+
+    def _add_sheet(self, sheet: Sheet):
+        # Row of the last definition of every key, the only one written when a key is defined more than once
+        last_rows: Dict[str, int] = {}
+
+        for column_index, column_value in enumerate(sheet.columns):
+
+            # First language on the columns list will be considered the default or source language
+            if column_index == 0:
+                self._source_language = column_value.language_code
+
+                # Keys defined again by a later sheet start over, but keep their original position
+                for row_index, localized_string in enumerate(column_value.strings):
+                    self._localizations[localized_string.localized_key] = None
+                    self._comments.pop(localized_string.localized_key, None)
+                    last_rows[localized_string.localized_key] = row_index
+                continue
+
+            self._language_codes.add(column_value.language_code)
+
+            for row_index, localized_string in enumerate(column_value.strings):
+                localized_key = localized_string.localized_key
+
+                # Check if key and value is not empty
+                if not localized_key or not localized_string.localized_value:
+                    continue
+
+                # Earlier definitions of the key in the same sheet are ignored, even where the last one is empty
+                if last_rows[localized_key] != row_index:
+                    continue
+
+                # Check if value is not a comment
+                if not localized_key.startswith("//") and localized_string.localized_value.startswith("//"):
+                    continue
+
+                localizations = self._localizations[localized_key]
+
+                # The first localization of a key is added without its comment
+                if localizations is None:
+                    self._localizations[localized_key] = {column_value.language_code: localized_string.localized_value}
+                    continue
+
+                localizations[column_value.language_code] = localized_string.localized_value
+
+                # Append Comments on Localization String (if there's any)
+                if localized_string.comment:
+                    self._comments[localized_key] = localized_string.comment
+
+    def _entry(self, localized_key: str, localizations: Optional[Dict[str, str]]) -> str:
+        """Formats the value of a single key of the "strings" object, indented at its depth in the document.
+
+        :param localized_key:
+            The key of the entry.
+
+        :param localizations:
+            The localized values of the key keyed by language code, or None if it has none.
+
+        :return str:
+            The JSON of the entry.
+        """
+        if localizations is None:
+            return '{}'
+
+        units = ',\n'.join(
+            f'        {self._dumps(language_code)}: {{\n'
+            f'          "stringUnit": {{\n'
+            f'            "state": "translated",\n'
+            f'            "value": {self._dumps(localized_value)}\n'
+            f'          }}\n'
+            f'        }}'
+            for language_code, localized_value in localizations.items()
+        )
+        entry = f'{{\n      "localizations": {{\n{units}\n      }}'
+
+        comment = self._comments.get(localized_key)
+        if comment:
+            entry += f',\n      "comment": {self._dumps(comment)}'
+
+        return entry + '\n    }'
+
+    @staticmethod
+    def _dumps(value: str) -> str:
+        return json.dumps(value, ensure_ascii=False)